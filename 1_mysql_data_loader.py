@@ -1,26 +1,39 @@
 """
-1단계: JSON 파일에서 데이터 추출
+1단계: JSON 파일 또는 MySQL에서 데이터 추출
 작성일: 2025-01-20
 수정일: 2025-01-20 (JSON 파일 직접 로드 방식으로 변경)
+수정일: 2025-12-10 (MySQL 직접 추출 추가: --mysql)
 
 주요 기능:
 - data/ 폴더의 JSON 파일 로드
+- --mysql: CAFE24_DB_CONFIG의 MySQL에서 바로 읽기 (서버 측 커서, 설정 컬럼만, 테이블 병렬)
 - Document 객체로 변환
-- extracted_data.json 파일로 저장
+- extracted_data.json 파일로 저장 (선택사항, .jsonl/.parquet 확장자면 해당 형식)
+- 끝까지 읽은 테이블 / 건너뛴 테이블을 <결과 파일>.sources.json에 기록
+  (2단계는 끝까지 읽었는데 행이 없는 테이블의 벡터만 삭제, 건너뛴 테이블이 있으면 종료 코드 1)
+
+2단계는 이 파일 없이도 실행할 수 있습니다:
+    python 2_embedding_generator.py --from-source
+(행 → Document → 청크 → 임베딩이 generator로 이어져서 전체를 메모리에 올리지 않음)
 """
 
+import argparse
 import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 from datetime import datetime
 from langchain_core.documents import Document
+from record_io import iter_records, resolve_data_path, write_records
+import mysql_source
 import os
 
 # 설정 파일 임포트
 try:
     from config import (
+        CAFE24_DB_CONFIG,
         DATA_EXTRACTION_CONFIG,
-        LOGGING_CONFIG
+        LOGGING_CONFIG,
+        MYSQL_EXTRACTION_CONFIG
     )
 except ImportError:
     print("[오류] config.py 파일이 없습니다!")
@@ -38,14 +51,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 추출 결과 옆에 저장하는 테이블 열거 결과 파일 (<결과 파일>.sources.json)
+SOURCE_REPORT_SUFFIX = ".sources.json"
+
 
 class JSONDataLoader:
     """JSON 파일에서 데이터를 추출하는 클래스"""
     
     def __init__(self):
         """초기화"""
+        self.reset_source_report()
         logger.info("[완료] JSON 데이터 로더 초기화 완료")
     
+    def reset_source_report(self):
+        """
+        테이블 열거 결과 초기화
+        
+        enumerated_sources: 끝까지 읽은 테이블 (메타데이터 source 값, 행이 없어도 포함)
+        skipped_sources: 파일/테이블/컬럼이 없어 건너뛴 테이블 (설정 키)
+        iter_extracted_documents를 끝까지 읽은 뒤에 채워집니다.
+        """
+        self.enumerated_sources: List[str] = []
+        self.skipped_sources: List[str] = []
+    
+    def source_report(self) -> Dict[str, List[str]]:
+        return {"enumerated": list(self.enumerated_sources), "skipped": list(self.skipped_sources)}
+    
+    def finish_source(self, table_key: str, table_name: str, rows: int, documents: int):
+        """테이블 하나를 끝까지 읽은 결과 기록 (행은 있는데 Document가 없으면 건너뛴 것으로 봄)"""
+        if rows and not documents:
+            logger.error(f"[오류] {table_key}: 행 {rows}개에서 Document를 만들지 못했습니다 "
+                         f"(text_columns 확인)")
+            self.skipped_sources.append(table_key)
+        else:
+            self.enumerated_sources.append(table_name)
+    
     def load_json_file(self, file_path: str) -> List[Dict[str, Any]]:
         """
         JSON 파일 로드
@@ -57,21 +97,14 @@ class JSONDataLoader:
             데이터 리스트
         """
         try:
+            file_path = resolve_data_path(file_path)
             if not os.path.exists(file_path):
                 logger.error(f"[오류] 파일을 찾을 수 없습니다: {file_path}")
                 return []
             
-            with open(file_path, "r", encoding="utf-8") as f:
-                json_data = json.load(f)
-            
             # phpMyAdmin JSON 형식 처리
             # 구조: [header, database, table_with_data]
-            data = []
-            
-            for item in json_data:
-                if item.get("type") == "table" and "data" in item:
-                    data = item["data"]
-                    break
+            data = list(self.iter_json_rows(file_path))
             
             if not data:
                 logger.warning(f"[경고] {file_path}에서 데이터를 찾을 수 없습니다.")
@@ -84,6 +117,15 @@ class JSONDataLoader:
             logger.error(f"[오류] JSON 파일 로드 실패: {str(e)}")
             return []
     
+    def iter_json_rows(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        JSON 파일의 첫 번째 테이블 행을 하나씩 반환 (스트리밍)
+        
+        파일 전체를 메모리에 올리지 않으므로 대용량 내보내기 파일에 사용합니다.
+        JSON Lines / Parquet 파일이면 각 레코드를 행으로 반환합니다.
+        """
+        return iter_records(resolve_data_path(file_path), table_rows_only=True)
+    
     def convert_to_documents(
         self, 
         data: List[Dict[str, Any]], 
@@ -103,9 +145,19 @@ class JSONDataLoader:
         Returns:
             Document 객체 리스트
         """
-        documents = []
-        
-        for row in data:
+        documents = list(self.iter_documents(data, text_columns, metadata_columns, table_name))
+        logger.info(f"[완료] {len(documents)}개 Document 객체 생성 완료")
+        return documents
+    
+    def iter_documents(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        text_columns: List[str],
+        metadata_columns: List[str],
+        table_name: str
+    ) -> Iterator[Document]:
+        """행을 하나씩 Document로 변환 (convert_to_documents의 generator 버전)"""
+        for row in rows:
             try:
                 # 텍스트 내용 구성
                 text_parts = []
@@ -137,84 +189,248 @@ class JSONDataLoader:
                             metadata[col] = value
                 
                 # Document 생성
-                doc = Document(
+                yield Document(
                     page_content=page_content,
                     metadata=metadata
                 )
-                documents.append(doc)
                 
             except Exception as e:
                 logger.warning(f"[경고] 행 변환 실패: {str(e)}")
                 continue
-        
-        logger.info(f"[완료] {len(documents)}개 Document 객체 생성 완료")
-        return documents
-
-
-def main():
-    """메인 실행 함수"""
-    logger.info("="*50)
-    logger.info("[시작] JSON 데이터 추출 시작")
-    logger.info("="*50)
-    
-    # JSON 데이터 로더 초기화
-    loader = JSONDataLoader()
     
-    # 모든 테이블에서 데이터 추출
-    all_documents = []
-    
-    try:
-        for table_key, table_config in DATA_EXTRACTION_CONFIG.items():
-            logger.info(f"\n[처리] 테이블 처리 중: {table_key}")
-            
-            # JSON 파일 경로 확인
+    def iter_extracted_documents(
+        self,
+        extraction_config: Dict[str, Dict[str, Any]] = DATA_EXTRACTION_CONFIG
+    ) -> Iterator[Document]:
+        """
+        설정된 모든 테이블의 Document를 하나씩 반환
+        
+        JSON 파일을 스트리밍으로 읽으므로 메모리에는 현재 행만 올라옵니다.
+        파일이 없는 테이블은 건너뛰고 skipped_sources에 기록합니다.
+        """
+        self.reset_source_report()
+        for table_key, table_config in extraction_config.items():
             json_file = table_config.get("json_file")
             if not json_file:
                 logger.error(f"[오류] {table_key}에 json_file 경로가 없습니다.")
+                self.skipped_sources.append(table_key)
                 continue
-            
-            # 데이터 로드
-            raw_data = loader.load_json_file(json_file)
-            
-            if not raw_data:
-                logger.warning(f"[경고] {table_key}에서 데이터를 가져오지 못했습니다.")
+            json_file = resolve_data_path(json_file)
+            if not os.path.exists(json_file):
+                logger.error(f"[오류] 파일을 찾을 수 없습니다: {json_file}")
+                self.skipped_sources.append(table_key)
                 continue
             
-            logger.info(f"[결과] 로드된 데이터: {len(raw_data)}개 행")
-            logger.info(f"[정보] 텍스트 컬럼: {table_config['text_columns']}")
-            
-            # Document 변환
-            documents = loader.convert_to_documents(
-                data=raw_data,
+            logger.info(f"[처리] 테이블 처리 중: {table_key} ({json_file})")
+            counts = {"rows": 0, "documents": 0}
+            for doc in self.iter_documents(
+                count_rows(self.iter_json_rows(json_file), counts),
                 text_columns=table_config["text_columns"],
                 metadata_columns=table_config["metadata_columns"],
                 table_name=table_config["table"]
-            )
-            
-            all_documents.extend(documents)
-            logger.info(f"[완료] {table_key}: {len(documents)}개 Document 생성")
+            ):
+                counts["documents"] += 1
+                yield doc
+            self.finish_source(table_key, table_config["table"], counts["rows"], counts["documents"])
+
+
+class MySQLDataLoader(JSONDataLoader):
+    """
+    MySQL에서 데이터를 바로 추출하는 클래스 (JSONDataLoader와 같은 Document 형식)
+    
+    DATA_EXTRACTION_CONFIG의 table마다 text_columns + metadata_columns만 SELECT하고,
+    서버 측 커서에서 chunk_size행씩 받아서 Document로 바꿉니다.
+    메모리에는 테이블마다 최대 chunk 몇 개만 올라옵니다 (mysql_source 참고).
+    """
+    
+    def __init__(
+        self,
+        db_config: Dict[str, Any] = CAFE24_DB_CONFIG,
+        chunk_size: int = MYSQL_EXTRACTION_CONFIG["chunk_size"],
+        parallel_tables: int = MYSQL_EXTRACTION_CONFIG["parallel_tables"]
+    ):
+        """
+        초기화
         
-        # 결과 저장 (JSON 형태로)
-        output_file = "extracted_data.json"
-        with open(output_file, "w", encoding="utf-8") as f:
-            documents_dict = [
-                {
-                    "page_content": doc.page_content,
-                    "metadata": doc.metadata
-                }
-                for doc in all_documents
-            ]
-            json.dump(documents_dict, f, ensure_ascii=False, indent=2)
+        Args:
+            db_config: MySQL 접속 정보
+            chunk_size: 서버 측 커서에서 한 번에 받는 행 수
+            parallel_tables: 동시에 읽을 테이블 수 (테이블마다 연결 하나)
+        """
+        self.reset_source_report()
+        missing = [key for key in ("host", "user", "database") if not db_config.get(key)]
+        if missing:
+            raise ValueError(f"MySQL 접속 정보가 없습니다: {', '.join(missing)} (.env의 CAFE24_DB_* 확인)")
+        self.db_config = db_config
+        self.chunk_size = chunk_size
+        self.parallel_tables = parallel_tables
+        logger.info(f"[완료] MySQL 데이터 로더 초기화 완료 ({db_config['host']}/{db_config['database']})")
+    
+    def plan_queries(
+        self,
+        extraction_config: Dict[str, Dict[str, Any]] = DATA_EXTRACTION_CONFIG
+    ) -> List["mysql_source.TableQuery"]:
+        """테이블마다 읽을 컬럼 결정 (없는 테이블, text_columns가 하나도 없는 테이블은 건너뜀)"""
+        connection = mysql_source.connect(self.db_config)
+        try:
+            queries = []
+            for table_key, table_config in extraction_config.items():
+                query = mysql_source.plan_query(
+                    connection,
+                    key=table_key,
+                    table=table_config["table"],
+                    wanted_columns=table_config["text_columns"] + table_config["metadata_columns"]
+                )
+                if query and not any(column in query.columns for column in table_config["text_columns"]):
+                    logger.error(f"[오류] {table_config['table']}에 text_columns가 하나도 없습니다 ({table_key})")
+                    query = None
+                if query:
+                    queries.append(query)
+                else:
+                    self.skipped_sources.append(table_key)
+            return queries
+        finally:
+            connection.close()
+    
+    def iter_extracted_documents(
+        self,
+        extraction_config: Dict[str, Dict[str, Any]] = DATA_EXTRACTION_CONFIG
+    ) -> Iterator[Document]:
+        """
+        설정된 모든 테이블의 Document를 하나씩 반환
+        
+        여러 테이블은 각자의 연결에서 동시에 읽고 chunk 단위로 번갈아 반환합니다.
+        순서는 실행마다 같습니다 (기본 키 순서, 중복 제거의 두 번 읽기에 필요).
+        """
+        self.reset_source_report()
+        queries = self.plan_queries(extraction_config)
+        counts = {query.key: {"rows": 0, "documents": 0} for query in queries}
+        for query in queries:
+            logger.info(f"[처리] 테이블 처리 중: {query.key} (MySQL {query.table}, 컬럼 {len(query.columns)}개)")
+        
+        rows_read = 0
+        for query, rows in mysql_source.iter_table_chunks(
+            self.db_config,
+            queries,
+            chunk_size=self.chunk_size,
+            workers=self.parallel_tables,
+            net_write_timeout=MYSQL_EXTRACTION_CONFIG["net_write_timeout"]
+        ):
+            table_config = extraction_config[query.key]
+            for doc in self.iter_documents(
+                rows,
+                text_columns=table_config["text_columns"],
+                metadata_columns=table_config["metadata_columns"],
+                table_name=table_config["table"]
+            ):
+                counts[query.key]["documents"] += 1
+                yield doc
+            counts[query.key]["rows"] += len(rows)
+            rows_read += len(rows)
+        for query in queries:
+            self.finish_source(query.key, extraction_config[query.key]["table"],
+                               counts[query.key]["rows"], counts[query.key]["documents"])
+        logger.info(f"[완료] MySQL에서 {rows_read}개 행 읽기 완료")
+
+
+def count_rows(rows: Iterable[Dict[str, Any]], counts: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    for row in rows:
+        counts["rows"] += 1
+        yield row
+
+
+def source_report_path(output_file: str) -> str:
+    return output_file + SOURCE_REPORT_SUFFIX
+
+
+def write_source_report(output_file: str, report: Dict[str, List[str]]):
+    """추출 결과 옆에 테이블 열거 결과 저장 (2단계의 사라진 테이블 삭제 판단용)"""
+    path = source_report_path(output_file)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_source_report(output_file: str) -> Dict[str, List[str]]:
+    """write_source_report 결과 (없거나 읽을 수 없으면 빈 dict)"""
+    try:
+        with open(source_report_path(output_file), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_documents(documents: Iterable[Document], output_file: str) -> int:
+    """
+    Document를 하나씩 저장 (전체를 메모리에 올리지 않음)
+    
+    형식은 확장자로 결정: .json(한 줄에 하나인 배열) / .jsonl / .parquet
+    
+    Returns:
+        저장한 Document 수
+    """
+    return write_records(
+        output_file,
+        ({"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents)
+    )
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="JSON / MySQL 데이터 추출")
+    parser.add_argument("--output", default="extracted_data.json",
+                        help="추출 결과 저장 경로 (.json / .jsonl / .parquet)")
+    parser.add_argument("--mysql", action="store_true",
+                        help="JSON 파일 대신 MySQL(CAFE24_DB_CONFIG)에서 바로 추출")
+    parser.add_argument("--fetch-size", type=int, default=MYSQL_EXTRACTION_CONFIG["chunk_size"],
+                        help="--mysql: 서버 측 커서에서 한 번에 받는 행 수")
+    parser.add_argument("--parallel-tables", type=int, default=MYSQL_EXTRACTION_CONFIG["parallel_tables"],
+                        help="--mysql: 동시에 읽을 테이블 수")
+    parser.add_argument("--table", action="append", choices=list(DATA_EXTRACTION_CONFIG),
+                        help="이 테이블만 추출 (여러 번 지정 가능, 기본: 전체)")
+    args = parser.parse_args()
+    extraction_config = {key: DATA_EXTRACTION_CONFIG[key] for key in (args.table or DATA_EXTRACTION_CONFIG)}
+    
+    source_name = "MySQL" if args.mysql else "JSON"
+    logger.info("="*50)
+    logger.info(f"[시작] {source_name} 데이터 추출 시작")
+    logger.info("="*50)
+    
+    # 데이터 로더 초기화
+    if args.mysql:
+        try:
+            loader = MySQLDataLoader(chunk_size=args.fetch_size, parallel_tables=args.parallel_tables)
+        except ValueError as e:
+            logger.error(f"[오류] {str(e)}")
+            return 1
+    else:
+        loader = JSONDataLoader()
+    
+    # 미리보기용으로 처음 2개만 보관
+    preview: List[Document] = []
+    
+    def keep_preview(documents: Iterable[Document]) -> Iterator[Document]:
+        for doc in documents:
+            if len(preview) < 2:
+                preview.append(doc)
+            yield doc
+    
+    try:
+        # 모든 테이블에서 데이터를 추출하면서 바로 저장 (JSON 형태로)
+        output_file = args.output
+        total = write_documents(keep_preview(loader.iter_extracted_documents(extraction_config)), output_file)
+        write_source_report(output_file, loader.source_report())
         
-        logger.info(f"\n[완료] 총 {len(all_documents)}개 Document 추출 완료")
+        logger.info(f"\n[완료] 총 {total}개 Document 추출 완료")
         logger.info(f"[저장] 결과 저장: {output_file}")
         
         # 추출된 내용 미리보기
-        if all_documents:
+        if preview:
             logger.info("\n" + "="*50)
             logger.info("[미리보기] 추출된 데이터 미리보기 (첫 2개)")
             logger.info("="*50)
-            for i, doc in enumerate(all_documents[:2]):
+            for i, doc in enumerate(preview):
                 logger.info(f"\n[Document {i+1}]")
                 logger.info(f"내용:\n{doc.page_content}")
                 logger.info(f"메타데이터: {doc.metadata}")
@@ -223,6 +439,12 @@ def main():
         logger.error(f"[오류] 오류 발생: {str(e)}")
         import traceback
         traceback.print_exc()
+        return 1
+    
+    if loader.skipped_sources:
+        # 다음 단계(임베딩)가 건너뛴 테이블을 사라진 것으로 처리하지 않도록 실패로 종료
+        logger.error(f"[오류] 건너뛴 테이블이 있습니다: {', '.join(loader.skipped_sources)}")
+        return 1
     
     logger.info("\n" + "="*50)
     logger.info("[완료] 데이터 추출 완료")
@@ -231,4 +453,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -3,21 +3,34 @@
 작성일: 2025-01-20
 
 주요 기능:
-- JSON에서 Document 로드
-- 텍스트 분할 (Chunking)
+- JSON에서 Document 로드 (또는 --from-source로 data/ 원본, --from-mysql로 MySQL에서 바로 추출)
+- 유사 중복 문서 제거 (MinHash/LSH, 출처 병합, dedup.py)
+- 텍스트 분할 (Chunking - 토큰 기준, 표 행은 행 단위 / 문서는 제목·문단 단위, chunking.py)
 - Cohere 임베딩 생성
 - Supabase 벡터 DB 저장
+
+원본 행 → Document → 청크 → 임베딩 배치가 generator로 이어지므로
+전체 문서/청크 목록을 메모리에 만들지 않고, 첫 배치부터 바로 임베딩을 시작합니다.
 """
 
+import argparse
+import importlib
 import json
 import logging
-from typing import List
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores.supabase import SupabaseVectorStore
 from supabase import create_client
 from tqdm import tqdm
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from embedding_pipeline import EmbeddingIngestor, IngestionReport, get_token_counter
+from bulk_loader import BulkVectorLoader
+from chunking import TokenChunker
+from dedup import Deduplicator, DedupPlan
+from ingest_checkpoint import IngestionCheckpoint
+from index_sync import SyncPlan, VectorIndexSync, iter_chunk_ids, skip_duplicate_ids
+from record_io import iter_records, resolve_data_path
 
 # 설정 파일 임포트
 try:
@@ -26,6 +39,10 @@ try:
         SUPABASE_URL,
         SUPABASE_SERVICE_ROLE_KEY,
         EMBEDDING_CONFIG,
+        CHUNKING_CONFIG,
+        DEDUP_CONFIG,
+        EMBEDDING_CACHE_CONFIG,
+        BULK_LOAD_CONFIG,
         SUPABASE_TABLES,
         LOGGING_CONFIG
     )
@@ -45,30 +62,70 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# --from-mysql + 중복 제거: MySQL에서 한 번 읽은 결과 (두 번 읽기용)
+MYSQL_SNAPSHOT_FILE = "mysql_snapshot.jsonl"
+
+
+def _size(items: Iterable) -> Optional[int]:
+    """리스트면 길이, generator면 None (진행 표시용)"""
+    return len(items) if hasattr(items, "__len__") else None
+
+
+def count_items(items: Iterable, counts: Dict[str, int], key: str) -> Iterator:
+    """generator를 그대로 흘려보내면서 개수 세기"""
+    for item in items:
+        counts[key] += 1
+        yield item
+
 
 class EmbeddingGenerator:
     """임베딩 생성 및 벡터 DB 저장 클래스"""
     
-    def __init__(self):
-        """초기화"""
+    def __init__(self, offline: bool = False):
+        """
+        초기화
+        
+        Args:
+            offline: True면 임베딩 API를 호출하지 않고 로컬 캐시만 사용
+        """
         # OpenAI 임베딩 모델
-        self.embeddings = OpenAIEmbeddings(
+        self.embeddings = None if offline else OpenAIEmbeddings(
             model=EMBEDDING_CONFIG["model"],
             openai_api_key=OPENAI_API_KEY
         )
         
+        # iter_source_documents에서 마지막으로 사용한 1단계 로더 (테이블 열거 결과 확인용)
+        self.source_loader = None
+        
+        # 로컬 임베딩 캐시 (이미 임베딩한 텍스트는 API 호출 생략)
+        self.embedding_cache = None
+        if EMBEDDING_CACHE_CONFIG["enabled"] or offline:
+            self.embedding_cache = EmbeddingCache(
+                EMBEDDING_CACHE_CONFIG["path"],
+                max_bytes=EMBEDDING_CACHE_CONFIG["max_bytes"]
+            )
+            self.embeddings = CachedEmbeddings(
+                self.embeddings,
+                self.embedding_cache,
+                model=EMBEDDING_CONFIG["model"],
+                dimension=EMBEDDING_CACHE_CONFIG["dimension"],
+                offline=offline
+            )
+        
         # Supabase 클라이언트
         self.supabase_client = create_client(
             SUPABASE_URL,
             SUPABASE_SERVICE_ROLE_KEY
         )
         
-        # 텍스트 분할기
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            separators=["\n\n", "\n", ".", " ", ""],
-            chunk_size=EMBEDDING_CONFIG["chunk_size"],
-            chunk_overlap=EMBEDDING_CONFIG["chunk_overlap"],
-            length_function=len
+        # 텍스트 분할기 (임베딩 모델 토큰 기준)
+        self.chunker = TokenChunker(
+            count_tokens=get_token_counter(EMBEDDING_CONFIG["model"]),
+            chunk_tokens=CHUNKING_CONFIG["chunk_tokens"],
+            overlap_tokens=CHUNKING_CONFIG["overlap_tokens"],
+            row_max_tokens=CHUNKING_CONFIG["row_max_tokens"],
+            source_strategies=CHUNKING_CONFIG["source_strategies"],
+            default_strategy=CHUNKING_CONFIG["default_strategy"]
         )
         
         logger.info("[완료] 임베딩 생성기 초기화 완료")
@@ -84,17 +141,7 @@ class EmbeddingGenerator:
             Document 객체 리스트
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            documents = [
-                Document(
-                    page_content=item["page_content"],
-                    metadata=item["metadata"]
-                )
-                for item in data
-            ]
-            
+            documents = list(self.iter_documents_from_json(file_path))
             logger.info(f"[완료] {len(documents)}개 Document 로드 완료: {file_path}")
             return documents
             
@@ -102,6 +149,36 @@ class EmbeddingGenerator:
             logger.error(f"[오류] Document 로드 실패: {str(e)}")
             return []
     
+    def iter_documents_from_json(self, file_path: str) -> Iterator[Document]:
+        """JSON / JSON Lines / Parquet 파일의 Document를 하나씩 반환 (스트리밍, 형식 자동 감지)"""
+        for item in iter_records(resolve_data_path(file_path)):
+            yield Document(
+                page_content=item["page_content"],
+                metadata=item["metadata"]
+            )
+    
+    def iter_source_documents(self, mysql: bool = False) -> Iterator[Document]:
+        """1단계 JSON 파일 없이 data/ 원본(mysql=True면 MySQL)에서 바로 Document 추출"""
+        loader_module = importlib.import_module("1_mysql_data_loader")
+        loader = loader_module.MySQLDataLoader() if mysql else loader_module.JSONDataLoader()
+        # 끝까지 읽은 뒤 loader.enumerated_sources로 행이 없는 테이블 판단
+        self.source_loader = loader
+        return loader.iter_extracted_documents()
+    
+    def plan_dedup(self, documents: Iterable[Document]) -> DedupPlan:
+        """
+        유사 중복 묶음 결정 (문서를 한 번 다 읽음)
+        
+        같은 순서의 문서를 plan.apply()에 다시 넘기면 대표 문서만 나옵니다.
+        """
+        deduplicator = Deduplicator(
+            threshold=DEDUP_CONFIG["threshold"],
+            num_perm=DEDUP_CONFIG["num_perm"],
+            min_chars=DEDUP_CONFIG["min_chars"],
+            prefer_sources=DEDUP_CONFIG["prefer_sources"]
+        )
+        return deduplicator.plan(documents)
+    
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
         긴 문서를 청크로 분할
@@ -113,9 +190,9 @@ class EmbeddingGenerator:
             분할된 Document 리스트
         """
         try:
-            logger.info(f"[분할] 문서 분할 시작 (청크 크기: {EMBEDDING_CONFIG['chunk_size']})")
+            logger.info(f"[분할] 문서 분할 시작 (청크 크기: {CHUNKING_CONFIG['chunk_tokens']}토큰)")
             
-            chunks = self.text_splitter.split_documents(documents)
+            chunks = list(self.iter_chunks(documents))
             
             logger.info(f"[완료] {len(documents)}개 문서 -> {len(chunks)}개 청크로 분할")
             return chunks
@@ -124,88 +201,293 @@ class EmbeddingGenerator:
             logger.error(f"[오류] 문서 분할 실패: {str(e)}")
             return documents
     
-    def save_to_supabase(self, documents: List[Document]) -> bool:
+    def iter_chunks(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """문서별로 분할해서 청크 번호 기록 (index_sync의 결정적 ID에 사용)"""
+        for doc in documents:
+            for chunk_index, chunk in enumerate(self.chunker.split(doc)):
+                chunk.metadata["chunk_index"] = chunk_index
+                yield chunk
+    
+    def save_to_supabase(self, documents: Iterable[Document],
+                         checkpoint: Optional[IngestionCheckpoint] = None) -> bool:
         """
         Supabase 벡터 DB에 저장
         
+        토큰 수 기준으로 묶은 배치를 임베딩/저장 단계로 나눠 동시에 처리합니다.
+        (embedding_pipeline.EmbeddingIngestor 참고)
+        
         Args:
-            documents: 저장할 Document 리스트
+            documents: 저장할 Document (리스트 또는 generator)
+            checkpoint: 배치 결과를 기록할 체크포인트 (없으면 기록 안 함)
             
         Returns:
-            성공 여부
+            성공 여부 (실패한 배치가 하나도 없을 때 True)
         """
         try:
-            logger.info(f"[저장] Supabase에 {len(documents)}개 문서 저장 시작...")
-            
-            # 배치 처리로 저장
-            batch_size = EMBEDDING_CONFIG["batch_size"]
-            total_batches = (len(documents) + batch_size - 1) // batch_size
-            
-            for i in tqdm(range(0, len(documents), batch_size), desc="임베딩 생성 및 저장"):
-                batch = documents[i:i + batch_size]
-                
-                try:
-                    # SupabaseVectorStore에 저장
-                    SupabaseVectorStore.from_documents(
-                        documents=batch,
-                        embedding=self.embeddings,
-                        client=self.supabase_client,
-                        table_name=SUPABASE_TABLES["embeddings"],
-                        query_name=SUPABASE_TABLES["match_function"]
-                    )
-                    
-                    logger.info(f"[완료] 배치 {i//batch_size + 1}/{total_batches} 저장 완료")
-                    
-                except Exception as batch_error:
-                    logger.error(f"[경고] 배치 {i//batch_size + 1} 저장 실패: {str(batch_error)}")
-                    continue
+            logger.info("[저장] Supabase 저장 시작...")
+            
+            ingestor = EmbeddingIngestor(
+                embeddings=self.embeddings,
+                supabase_client=self.supabase_client,
+                table_name=SUPABASE_TABLES["embeddings"],
+                config=EMBEDDING_CONFIG,
+                on_batch_done=checkpoint.on_batch_done if checkpoint else None
+            )
+            
+            with tqdm(total=_size(documents), desc="임베딩 생성 및 저장") as progress_bar:
+                report = ingestor.run(documents, progress=progress_bar.update)
+            
+            logger.info(
+                f"[결과] 배치 {report.succeeded_batches}/{report.batches}개 성공, "
+                f"{report.stored_rows}개 행 저장, {report.tokens} 토큰, "
+                f"{report.elapsed:.1f}초 ({report.rows_per_second:.1f}행/초), "
+                f"레이트 리밋 {report.rate_limited}회"
+            )
+            if self.embedding_cache:
+                logger.info(f"[캐시] 임베딩 캐시 적중 {self.embedding_cache.hits}개 / "
+                            f"미적중 {self.embedding_cache.misses}개")
+            for failed in report.failed_batches:
+                logger.error(f"[경고] 실패한 배치 {failed['batch'] + 1} "
+                             f"(문서 {failed['start']}~{failed['start'] + failed['size'] - 1}): {failed['error']}")
             
             logger.info("[완료] Supabase 저장 완료")
-            return True
+            return not report.failed_batches
             
         except Exception as e:
             logger.error(f"[오류] Supabase 저장 실패: {str(e)}")
             import traceback
             traceback.print_exc()
             return False
+    
+    def bulk_load(self, documents: Iterable[Document]) -> bool:
+        """
+        전체 재구성: 모든 청크를 임베딩해서 COPY BINARY로 새 테이블에 적재 후 교체
+        
+        Args:
+            documents: 저장할 Document (전체, 리스트 또는 generator)
+            
+        Returns:
+            성공 여부 (실패하면 기존 테이블 유지)
+        """
+        if not BULK_LOAD_CONFIG["db_url"]:
+            logger.error("[오류] SUPABASE_DB_URL 환경 변수가 필요합니다 (Postgres 직접 연결 주소).")
+            return False
+        
+        try:
+            logger.info("[저장] 대량 적재 시작")
+            
+            ingestor = EmbeddingIngestor(
+                embeddings=self.embeddings,
+                supabase_client=self.supabase_client,
+                table_name=SUPABASE_TABLES["embeddings"],
+                config=EMBEDDING_CONFIG
+            )
+            loader = BulkVectorLoader(
+                BULK_LOAD_CONFIG["db_url"],
+                SUPABASE_TABLES["embeddings"],
+                dimension=EMBEDDING_CACHE_CONFIG["dimension"],
+                ivfflat_lists=BULK_LOAD_CONFIG["ivfflat_lists"],
+                maintenance_work_mem=BULK_LOAD_CONFIG["maintenance_work_mem"]
+            )
+            
+            embed_report = IngestionReport()
+            # 같은 chunk_id가 두 번 나오면 적재 후 기본 키 생성에서 전체가 실패하므로 임베딩 전에 건너뜀
+            skipped = {"duplicates": 0}
+            unique = skip_duplicate_ids(documents, skipped)
+            with tqdm(total=_size(documents), desc="임베딩 생성 및 COPY 적재") as progress_bar:
+                report = loader.load(ingestor.iter_rows(unique, embed_report, progress=progress_bar.update))
+            
+            if skipped["duplicates"]:
+                logger.warning(f"[경고] chunk_id가 같은 중복 청크 {skipped['duplicates']}개를 건너뛰었습니다 "
+                               f"(같은 원본 키 + 같은 내용)")
+            logger.info(
+                f"[결과] {report.rows}개 행 적재, COPY {report.copy_seconds:.1f}초 "
+                f"({report.rows_per_second:.1f}행/초), 인덱스 {report.index_seconds:.1f}초, "
+                f"교체 {report.swap_seconds:.2f}초, 레이트 리밋 {embed_report.rate_limited}회"
+            )
+            if self.embedding_cache:
+                logger.info(f"[캐시] 임베딩 캐시 적중 {self.embedding_cache.hits}개 / "
+                            f"미적중 {self.embedding_cache.misses}개")
+            return True
+            
+        except Exception as e:
+            logger.error(f"[오류] 대량 적재 실패 (기존 테이블 유지): {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+def write_dedup_report(dedup_plan: Optional[DedupPlan]) -> Optional[Dict]:
+    """중복 제거 보고서 저장 + 요약 로그 (중복 제거를 건너뛰었으면 None)"""
+    if dedup_plan is None:
+        return None
+    summary = dedup_plan.report.to_dict()
+    with open(DEDUP_CONFIG["report_file"], "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+    logger.info(f"[중복] 문서 {summary['documents_in']}개 → {summary['documents_out']}개 "
+                f"(중복 {summary['duplicates_removed']}개, 묶음 {summary['clusters']}개): "
+                f"임베딩/저장 행 {summary['embeddings_saved']}개, 토큰 {summary['tokens_saved']:,}개 절약 "
+                f"→ {DEDUP_CONFIG['report_file']}")
+    return summary
 
 
 def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="임베딩 생성 및 Supabase 저장")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="변경 여부와 상관없이 모든 청크를 다시 임베딩")
+    parser.add_argument("--no-delete", action="store_true",
+                        help="원본에서 사라진 청크의 기존 행을 삭제하지 않음")
+    parser.add_argument("--offline", action="store_true",
+                        help="임베딩 API 없이 로컬 캐시만 사용 (--full-refresh와 함께 쓰면 캐시로 인덱스 재구성)")
+    parser.add_argument("--bulk-load", action="store_true",
+                        help="전체 재구성: Postgres COPY로 새 테이블에 적재 후 교체 (SUPABASE_DB_URL 필요)")
+    parser.add_argument("--input", nargs="+", default=["extracted_data.json"],
+                        help="1단계 결과 파일, 여러 개면 순서대로 이어서 읽음 "
+                             "(.json / .jsonl / .parquet, --from-source / --from-mysql이면 사용 안 함)")
+    parser.add_argument("--from-source", action="store_true",
+                        help="1단계 JSON 파일 없이 data/ 원본에서 바로 추출해서 임베딩")
+    parser.add_argument("--from-mysql", action="store_true",
+                        help="1단계 JSON 파일 없이 MySQL(CAFE24_DB_CONFIG)에서 바로 추출해서 임베딩")
+    parser.add_argument("--resume", action="store_true",
+                        help="지난 실행의 체크포인트에서 이어하기 (저장 완료된 청크는 건너뜀)")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="유사 중복 문서 제거를 건너뜀 (원본을 한 번만 읽음)")
+    args = parser.parse_args()
+    
     logger.info("="*50)
     logger.info("[시작] 임베딩 생성 및 저장 시작")
     logger.info("="*50)
     
     # 임베딩 생성기 초기화
-    generator = EmbeddingGenerator()
+    generator = EmbeddingGenerator(offline=args.offline)
+    
+    # 원본 → Document → 청크 (모두 generator, 임베딩 단계가 읽는 만큼만 진행)
+    counts = {"documents": 0, "chunks": 0}
+    missing_inputs = [path for path in args.input if not os.path.exists(resolve_data_path(path))]
+    if not (args.from_source or args.from_mysql) and missing_inputs:
+        logger.error(f"[오류] Document를 로드할 수 없습니다: {', '.join(missing_inputs)} 파일이 없습니다.")
+        logger.info("[참고] python 1_mysql_data_loader.py 실행 또는 --from-source / --from-mysql 사용")
+        return 1
     
-    # 1단계에서 생성한 JSON 파일 로드
-    input_file = "extracted_data.json"
-    documents = generator.load_documents_from_json(input_file)
+    dedup_enabled = DEDUP_CONFIG["enabled"] and not args.no_dedup
+    input_files = args.input
+    if args.from_mysql and dedup_enabled:
+        # 중복 제거는 같은 순서로 두 번 읽어야 하는데, 그 사이 DB가 바뀌면 위치가 어긋남
+        # → MySQL은 한 번만 읽어서 파일로 저장하고 그 파일을 두 번 읽음
+        loader_module = importlib.import_module("1_mysql_data_loader")
+        input_files = [MYSQL_SNAPSHOT_FILE]
+        total = loader_module.write_documents(generator.iter_source_documents(mysql=True), MYSQL_SNAPSHOT_FILE)
+        loader_module.write_source_report(MYSQL_SNAPSHOT_FILE, generator.source_loader.source_report())
+        logger.info(f"[완료] MySQL에서 Document {total}개 읽기 완료 → {MYSQL_SNAPSHOT_FILE}")
     
-    if not documents:
+    def read_documents() -> Iterator[Document]:
+        if args.from_source:
+            return generator.iter_source_documents()
+        if args.from_mysql and not dedup_enabled:
+            return generator.iter_source_documents(mysql=True)
+        return (doc for path in input_files for doc in generator.iter_documents_from_json(path))
+    
+    # 유사 중복 제거: 한 번 읽어서 묶음 결정 → 다시 읽으면서 대표 문서만 통과
+    documents = read_documents()
+    dedup_plan = None
+    if dedup_enabled:
+        dedup_plan = generator.plan_dedup(read_documents())
+        documents = dedup_plan.apply(
+            documents,
+            count_chunks=lambda doc: len(generator.chunker.split(doc)),
+            count_tokens=generator.chunker.count_tokens
+        )
+    
+    chunks = count_items(
+        iter_chunk_ids(generator.iter_chunks(count_items(documents, counts, "documents"))),
+        counts, "chunks"
+    )
+    
+    # 전체 재구성 (비교/삭제 없이 테이블 교체)
+    if args.bulk_load:
+        if args.resume:
+            logger.warning("[경고] --bulk-load는 한 번에 교체하므로 --resume을 사용하지 않습니다.")
+        loaded = generator.bulk_load(chunks)
+        if loaded:
+            logger.info(f"[완료] 대량 적재 완료: 문서 {counts['documents']}개 → 청크 {counts['chunks']}개 "
+                        f"→ {SUPABASE_TABLES['embeddings']} 테이블")
+        else:
+            logger.error("[오류] 대량 적재 실패")
+        write_dedup_report(dedup_plan)
+        return 0 if loaded else 1
+    
+    # 이미 저장된 청크와 비교하면서 새로 추가/변경된 청크만 임베딩
+    index_sync = VectorIndexSync(generator.supabase_client, SUPABASE_TABLES["embeddings"])
+    plan = SyncPlan()
+    def enumerated_sources() -> Optional[List[str]]:
+        """1단계가 끝까지 읽은 테이블 (건너뛴 테이블은 제외 → 행이 없어도 삭제하지 않음)"""
+        if args.from_source or (args.from_mysql and not dedup_enabled):
+            return generator.source_loader.enumerated_sources
+        loader_module = importlib.import_module("1_mysql_data_loader")
+        sources: List[str] = []
+        for path in input_files:
+            report = loader_module.read_source_report(path)
+            if "enumerated" not in report:
+                logger.info(f"[참고] {path}의 테이블 열거 결과가 없어 행이 없는 테이블의 벡터는 삭제하지 않습니다.")
+                return None
+            sources.extend(report["enumerated"])
+        return sources
+    
+    to_embed = index_sync.iter_changed(chunks, plan, full_refresh=args.full_refresh,
+                                       enumerated_sources=None if args.no_delete else enumerated_sources)
+    
+    # 배치마다 결과 기록 (--resume이면 지난 실행에서 저장된 청크는 건너뜀)
+    checkpoint = IngestionCheckpoint(EMBEDDING_CONFIG["checkpoint_file"], resume=args.resume)
+    
+    # Supabase에 저장 (같은 ID는 덮어쓰기)
+    try:
+        success = generator.save_to_supabase(checkpoint.pending(to_embed), checkpoint=checkpoint)
+    finally:
+        checkpoint.close()
+    
+    if not counts["documents"]:
         logger.error("[오류] Document를 로드할 수 없습니다.")
-        return
+        return 1
     
-    # 문서 분할
-    chunks = generator.split_documents(documents)
+    # 모든 저장이 성공했을 때만 사라진 청크 삭제 (실패 시 기존 데이터 유지)
+    deleted = 0
+    if success and plan.stale_ids and not args.no_delete:
+        deleted = index_sync.delete_ids(plan.stale_ids)
+        logger.info(f"[삭제] 원본에서 사라지거나 변경된 청크 {deleted}개 삭제")
     
-    # Supabase에 저장
-    success = generator.save_to_supabase(chunks)
+    # 저장된 것 / 저장되지 않은 것 보고서
+    dedup_summary = write_dedup_report(dedup_plan)
+    report = checkpoint.write_report(
+        EMBEDDING_CONFIG["report_file"],
+        success=success,
+        documents=counts["documents"],
+        chunks=counts["chunks"],
+        changed=plan.changed,
+        unchanged=plan.unchanged,
+        deleted=deleted,
+        dedup=dedup_summary
+    )
+    logger.info(f"[보고서] 저장 {report['indexed']['total']}개 "
+                f"(체크포인트에서 건너뜀 {report['indexed']['skipped_from_checkpoint']}개), "
+                f"저장 안 됨 {len(report['not_indexed'])}개 → {EMBEDDING_CONFIG['report_file']}")
+    if report["not_indexed"]:
+        logger.info("[참고] 실패한 청크만 다시 처리하려면: python 2_embedding_generator.py --resume")
     
     if success:
         logger.info("\n" + "="*50)
         logger.info("[완료] 임베딩 생성 및 저장 완료")
         logger.info("="*50)
         logger.info(f"[결과] 처리 결과:")
-        logger.info(f"   - 원본 문서 수: {len(documents)}")
-        logger.info(f"   - 분할된 청크 수: {len(chunks)}")
+        logger.info(f"   - 원본 문서 수: {counts['documents']}")
+        logger.info(f"   - 분할된 청크 수: {counts['chunks']}")
+        logger.info(f"   - 새로 임베딩: {plan.changed}개 / 변경 없음: {plan.unchanged}개 / 삭제: {deleted}개")
         logger.info(f"   - 저장 위치: {SUPABASE_TABLES['embeddings']} 테이블")
         logger.info("\n[다음] 다음 단계: python 3_chatbot_app.py 실행")
     else:
         logger.error("[오류] 임베딩 저장 실패")
+    return 0 if success else 1
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
 
@@ -12,14 +12,22 @@ from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
 import logging
 import os
-from typing import List, Dict, Any
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_community.retrievers import BM25Retriever
 from langchain_core.messages import HumanMessage
 from supabase import create_client
 from database_helper import DatabaseHelper, MySQLDatabaseHelper
-import re
+from intent_engine import IntentEngine
+from entity_gazetteer import GazetteerCache
+from intent_router import IntentRouter
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from hybrid_search import HybridRetriever
 
 # 설정 파일 임포트
 try:
@@ -31,7 +39,9 @@ try:
         CHATBOT_CONFIG,
         EMBEDDING_CONFIG,
         LOGGING_CONFIG,
-        DATA_EXTRACTION_CONFIG
+        DATA_EXTRACTION_CONFIG,
+        INTENT_ROUTER_CONFIG,
+        ANSWER_POLICY_CONFIG
     )
     
     # MySQL 설정 (선택사항)
@@ -40,6 +50,16 @@ try:
     except ImportError:
         CAFE24_DB_CONFIG = None
         USE_MYSQL_CONNECTION = False
+    
+    try:
+        from config import USE_COMPACT_ROW_CACHE
+    except ImportError:
+        USE_COMPACT_ROW_CACHE = False
+    
+    try:
+        from config import EMBEDDING_CACHE_CONFIG
+    except ImportError:
+        EMBEDDING_CACHE_CONFIG = {"enabled": False}
         
 except ImportError:
     print("[오류] config.py 파일이 없습니다!")
@@ -71,11 +91,22 @@ class SupabaseVectorRetriever:
         self.table_name = table_name
         self.query_name = query_name
     
-    def similarity_search(self, query: str, k: int = 5) -> List[Document]:
-        """유사도 검색"""
+    def embed_query(self, query: str) -> List[float]:
+        """질문 임베딩 생성 (의도 라우터와 벡터 검색에서 같이 사용)"""
+        return self.embeddings.embed_query(query)
+    
+    def similarity_search(self, query: str, k: int = 5,
+                          query_embedding: Optional[List[float]] = None) -> List[Document]:
+        """유사도 검색 (query_embedding을 주면 임베딩을 다시 만들지 않음)"""
+        return [doc for doc, _ in self.similarity_search_with_scores(query, k, query_embedding)]
+    
+    def similarity_search_with_scores(self, query: str, k: int = 5,
+                                      query_embedding: Optional[List[float]] = None) -> List[Tuple[Document, float]]:
+        """유사도 검색 + 코사인 유사도 (하이브리드 검색의 점수 결합에 사용)"""
         try:
             # 쿼리 임베딩 생성
-            query_embedding = self.embeddings.embed_query(query)
+            if query_embedding is None:
+                query_embedding = self.embed_query(query)
             
             # Supabase RPC 함수 호출
             response = self.supabase_client.rpc(
@@ -95,7 +126,7 @@ class SupabaseVectorRetriever:
                         page_content=item.get("content", ""),
                         metadata=item.get("metadata", {})
                     )
-                    documents.append(doc)
+                    documents.append((doc, item.get("similarity")))
             
             logger.info(f"[완료] 벡터 검색 완료: {len(documents)}개 결과")
             return documents
@@ -105,67 +136,6 @@ class SupabaseVectorRetriever:
             return []
 
 
-class HybridRetriever:
-    """하이브리드 검색기 (벡터 검색 + BM25 키워드 검색)"""
-    
-    def __init__(self, vector_retriever, bm25_retriever, vector_weight=0.7, bm25_weight=0.3):
-        self.vector_retriever = vector_retriever
-        self.bm25_retriever = bm25_retriever
-        self.vector_weight = vector_weight
-        self.bm25_weight = bm25_weight
-    
-    def invoke(self, query: str, k: int = 5) -> List[Document]:
-        """하이브리드 검색 수행"""
-        try:
-            # 벡터 검색
-            vector_docs = self.vector_retriever.similarity_search(query, k=k)
-            
-            # BM25 검색
-            bm25_docs = self.bm25_retriever.invoke(query)
-            
-            # 점수 기반 결합
-            doc_scores = {}
-            
-            # 벡터 검색 결과 점수 부여
-            for i, doc in enumerate(vector_docs):
-                content_hash = hash(doc.page_content)
-                score = (k - i) * self.vector_weight
-                doc_scores[content_hash] = {
-                    "doc": doc,
-                    "score": score
-                }
-            
-            # BM25 검색 결과 점수 부여
-            for i, doc in enumerate(bm25_docs):
-                content_hash = hash(doc.page_content)
-                score = (k - i) * self.bm25_weight
-                
-                if content_hash in doc_scores:
-                    doc_scores[content_hash]["score"] += score
-                else:
-                    doc_scores[content_hash] = {
-                        "doc": doc,
-                        "score": score
-                    }
-            
-            # 점수 순으로 정렬
-            sorted_docs = sorted(
-                doc_scores.values(),
-                key=lambda x: x["score"],
-                reverse=True
-            )
-            
-            # 상위 k개 반환
-            result = [item["doc"] for item in sorted_docs[:k]]
-            
-            logger.info(f"[완료] 하이브리드 검색 완료: {len(result)}개 결과")
-            return result
-            
-        except Exception as e:
-            logger.error(f"[오류] 검색 오류: {str(e)}")
-            return []
-
-
 # ==============================================
 # 2. 전역 리소스 초기화
 # ==============================================
@@ -174,10 +144,12 @@ class HybridRetriever:
 retriever = None
 llm = None
 db_helper = None
+gazetteer_cache = None
+intent_router = None
 
 def initialize_resources():
     """검색기 및 LLM 초기화"""
-    global retriever, llm, db_helper
+    global retriever, llm, db_helper, gazetteer_cache, intent_router
     
     try:
         logger.info("[시작] 리소스 초기화 중...")
@@ -191,13 +163,19 @@ def initialize_resources():
             except Exception as mysql_error:
                 logger.error(f"[오류] MySQL 연결 실패: {str(mysql_error)}")
                 logger.info("[대체] JSON 파일 모드로 전환...")
-                db_helper = DatabaseHelper(DATA_EXTRACTION_CONFIG)
+                db_helper = DatabaseHelper(DATA_EXTRACTION_CONFIG, compact=USE_COMPACT_ROW_CACHE)
         else:
             logger.info("[정보] JSON 파일 모드 사용")
-            db_helper = DatabaseHelper(DATA_EXTRACTION_CONFIG)
+            db_helper = DatabaseHelper(DATA_EXTRACTION_CONFIG, compact=USE_COMPACT_ROW_CACHE)
         
         logger.info("[완료] 데이터베이스 헬퍼 초기화")
         
+        # 실제 제품명/아이 이름 사전 (첫 질문 때 만들고 주기적으로 갱신)
+        gazetteer_cache = GazetteerCache(
+            loader=db_helper.get_entity_names,
+            refresh_seconds=CHATBOT_CONFIG["gazetteer_refresh_seconds"]
+        )
+        
         # Supabase 클라이언트
         supabase_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
         
@@ -207,6 +185,15 @@ def initialize_resources():
             openai_api_key=OPENAI_API_KEY
         )
         
+        # 같은 질문은 로컬 캐시의 임베딩 재사용
+        if EMBEDDING_CACHE_CONFIG["enabled"]:
+            embeddings = CachedEmbeddings(
+                embeddings,
+                EmbeddingCache(EMBEDDING_CACHE_CONFIG["path"], max_bytes=EMBEDDING_CACHE_CONFIG["max_bytes"]),
+                model=EMBEDDING_CONFIG["model"],
+                dimension=EMBEDDING_CACHE_CONFIG["dimension"]
+            )
+        
         # 벡터 검색기
         vector_retriever = SupabaseVectorRetriever(
             supabase_client=supabase_client,
@@ -241,9 +228,23 @@ def initialize_resources():
             vector_retriever=vector_retriever,
             bm25_retriever=bm25_retriever,
             vector_weight=CHATBOT_CONFIG["vector_weight"],
-            bm25_weight=CHATBOT_CONFIG["bm25_weight"]
+            bm25_weight=CHATBOT_CONFIG["bm25_weight"],
+            fusion=CHATBOT_CONFIG["fusion_method"],
+            rrf_k=CHATBOT_CONFIG["rrf_k"]
         )
         
+        # 임베딩 기반 의도 보정 (중심 벡터 파일이 있을 때만)
+        try:
+            intent_router = IntentRouter.load(
+                INTENT_ROUTER_CONFIG["centroids_file"],
+                expected_model=EMBEDDING_CONFIG["model"],
+                min_similarity=INTENT_ROUTER_CONFIG["min_similarity"],
+                min_margin=INTENT_ROUTER_CONFIG["min_margin"]
+            )
+        except Exception as router_error:
+            logger.warning(f"[경고] 의도 라우터 로드 실패 (키워드 규칙만 사용): {str(router_error)}")
+            intent_router = None
+        
         # GPT 모델
         llm = ChatOpenAI(
             model_name=CHATBOT_CONFIG["llm_model"],
@@ -264,119 +265,64 @@ def initialize_resources():
 # 3. 질문 의도 파악 및 DB 검색
 # ==============================================
 
+# 키워드 오토마톤/정규식은 시작 시 한 번만 컴파일
+intent_engine = IntentEngine(cache_size=CHATBOT_CONFIG["intent_cache_size"])
+
+
 def extract_person_name(query: str) -> str:
     """질문에서 이름 추출"""
-    # "김민수는", "최예은이", "박지훈" 등 패턴 매칭
-    name_patterns = [
-        r'([가-힣]{2,4})(?:는|은|이|가|의|을|를)',  # 조사가 붙은 이름
-        r'([가-힣]{2,4})\s*어[디느]',  # "김민수 어디" 형태
-    ]
-    
-    for pattern in name_patterns:
-        match = re.search(pattern, query)
-        if match:
-            return match.group(1)
-    
-    # 단순히 한글 이름만 있는 경우
-    words = query.split()
-    for word in words:
-        if re.match(r'^[가-힣]{2,4}$', word):
-            return word
-    
-    return ""
+    return intent_engine.extract_person_name(query)
 
 def check_query_intent(query: str) -> Dict[str, Any]:
     """
-    질문 의도 파악
+    질문 의도 파악 (규칙은 intent_engine.IntentEngine 참고)
     
     Returns:
         {
             "needs_db": bool,  # DB 검색 필요 여부
             "intent": str,     # "child_info", "recent_activity", "product_info" 등
-            "params": dict     # 검색 파라미터
+            "params": dict,    # 검색 파라미터
+            "exact_entity": bool  # 엔티티 사전과 정확히 일치한 경우에만 포함
         }
     """
-    query_lower = query.lower()
-    
-    # 이름 추출
-    name = extract_person_name(query)
-    
-    # 제품/상품 관련 질문 (우선순위 높음, 패턴 확장)
-    product_keywords = ['제품', '상품', '농산물', '판매', '가격', '얼마', '재고', '사고 싶', '구매', '주문', '신제품', '새로운', '최신', '뭐야', '뭐', '무엇', '출하', '배송', '언제', '날짜']
-    if any(keyword in query for keyword in product_keywords):
-        # 제품명 추출 시도 (간단한 방법)
-        for word in query.split():
-            if len(word) >= 2 and not any(k in word for k in product_keywords):
-                return {
-                    "needs_db": True,
-                    "intent": "product_info",
-                    "params": {"name": word}
-                }
-    
-    # 제품명이 직접 언급된 경우 (고추, 딸기, 포도 등)
-    common_products = ['고추', '딸기', '포도', '사과', '바나나', '블루베리', '콩', '당근', '망골드', '수박', '참외', '오이', '토마토', '감자']
-    for product in common_products:
-        if product in query:
-            return {
-                "needs_db": True,
-                "intent": "product_info",
-                "params": {"name": product}
-            }
-    
-    # 특정 아이 정보 질문 (패턴 확장)
-    if name and any(keyword in query for keyword in ['반', '어느', '어디', '누구', '언제', '몇', '알려', '대해', '정보', '소개']):
-        return {
-            "needs_db": True,
-            "intent": "child_info",
-            "params": {"name": name}
-        }
-    
-    # 이름만 있는 경우도 검색 (예: "박지훈?" 또는 "박지훈 뭐야?")
-    if name and len(query.strip().split()) <= 3:  # 짧은 질문
-        return {
-            "needs_db": True,
-            "intent": "child_info",
-            "params": {"name": name}
-        }
-    
-    # 최신 활동 질문
-    if any(keyword in query for keyword in ['최근', '최신', '새로운', '오늘', '어제']):
-        if any(keyword in query for keyword in ['활동', '사진', '업로드']):
-            return {
-                "needs_db": True,
-                "intent": "recent_activity",
-                "params": {"limit": 5}
-            }
-    
-    # 전체 목록 질문
-    if '명단' in query or '목록' in query or '전체' in query:
-        # 제품 목록 요청인지 확인
-        if any(keyword in query for keyword in ['제품', '상품', '농산물', '판매']):
-            return {
-                "needs_db": True,
-                "intent": "list_all_products",
-                "params": {}
-            }
-        # 아이 명단 요청
-        return {
-            "needs_db": True,
-            "intent": "list_all",
-            "params": {}
-        }
+    if gazetteer_cache is not None:
+        try:
+            intent_engine.set_gazetteer(gazetteer_cache.get())
+        except Exception as e:
+            logger.warning(f"[경고] 엔티티 사전 갱신 실패 (키워드 규칙만 사용): {str(e)}")
     
-    # 기본: RAG만 사용
-    return {
-        "needs_db": False,
-        "intent": "general",
-        "params": {}
-    }
-
-def search_database(intent: str, params: Dict[str, Any]) -> str:
+    return intent_engine.check_query_intent(query)
+
+def _format_counts(title: str, counts: Dict[str, int], unit: str) -> str:
+    """집계 결과를 텍스트로 포맷"""
+    lines = [f"[실시간 DB 검색 결과]\n{title} (총 {sum(counts.values())}{unit}):\n"]
+    lines.extend(f"- {label}: {count}{unit}" for label, count in counts.items())
+    return "\n".join(lines) + "\n"
+
+
+def _page_header(title: str, shown: int, count: int, total: int, unit: str) -> str:
+    """목록 페이지 제목 - 이번 페이지 범위와 전체 개수 (페이지 크기를 전체로 오해하지 않도록)"""
+    page_range = f"{shown + 1}~{shown + count}번째" if count else "추가 항목 없음"
+    if total:
+        return f"[실시간 DB 검색 결과]\n{title} (총 {total}{unit} 중 {page_range}):\n"
+    return f"[실시간 DB 검색 결과]\n{title} ({page_range}):\n"
+
+
+def search_database(intent: str, params: Dict[str, Any]) -> Dict[str, Any]:
     """
     데이터베이스에서 실시간 정보 검색
     
+    목록 의도(list_all, list_all_products)는 한 번에 전체를 가져오지 않고
+    CHATBOT_CONFIG["list_page_size"] 단위로 나눠서 조회합니다.
+    params에 "cursor"가 있으면 해당 위치부터("shown": 앞 페이지까지 보여준 개수),
+    "mode": "summary"이면 집계만 반환합니다.
+    
     Returns:
-        검색 결과 텍스트
+        {
+            "text": str,            # 검색 결과 텍스트
+            "more": dict | None,    # 다음 페이지 요청 정보 ({"intent", "cursor", "shown"})
+            "found": bool           # 조회 결과 행이 있었는지 (없거나 오류면 생략)
+        }
     """
     try:
         if intent == "product_info":
@@ -384,82 +330,279 @@ def search_database(intent: str, params: Dict[str, Any]) -> str:
             products = db_helper.search_products(name=name)
             
             if not products:
-                return f"'{name}' 제품을 찾을 수 없습니다."
+                return {"text": f"'{name}' 제품을 찾을 수 없습니다.", "more": None}
             
             if len(products) == 1:
-                return f"[실시간 DB 검색 결과]\n{db_helper.format_product_info(products[0])}"
-            else:
-                result = f"[실시간 DB 검색 결과]\n'{name}'으로 {len(products)}개 제품이 검색되었습니다:\n\n"
-                for product in products:
-                    result += db_helper.format_product_info(product) + "\n\n"
-                return result
+                return {"text": f"[실시간 DB 검색 결과]\n{db_helper.format_product_info(products[0])}", "more": None, "found": True}
+            
+            parts = [f"[실시간 DB 검색 결과]\n'{name}'으로 {len(products)}개 제품이 검색되었습니다:\n"]
+            parts.extend(db_helper.format_product_info(product) + "\n" for product in products)
+            return {"text": "\n".join(parts), "more": None, "found": True}
         
         elif intent == "child_info":
             name = params.get("name", "")
             children = db_helper.search_children(name=name)
             
             if not children:
-                return f"{name}에 대한 정보를 찾을 수 없습니다."
+                return {"text": f"{name}에 대한 정보를 찾을 수 없습니다.", "more": None}
             
             if len(children) == 1:
-                return f"[실시간 DB 검색 결과]\n{db_helper.format_child_info(children[0])}"
-            else:
-                result = f"[실시간 DB 검색 결과]\n'{name}'으로 {len(children)}명이 검색되었습니다:\n\n"
-                for child in children:
-                    result += db_helper.format_child_info(child) + "\n\n"
-                return result
+                return {"text": f"[실시간 DB 검색 결과]\n{db_helper.format_child_info(children[0])}", "more": None, "found": True}
+            
+            parts = [f"[실시간 DB 검색 결과]\n'{name}'으로 {len(children)}명이 검색되었습니다:\n"]
+            parts.extend(db_helper.format_child_info(child) + "\n" for child in children)
+            return {"text": "\n".join(parts), "more": None, "found": True}
         
         elif intent == "recent_activity":
             limit = params.get("limit", 5)
             photos = db_helper.get_latest_activity_photos(limit=limit)
             
             if not photos:
-                return "최근 활동 사진이 없습니다."
+                return {"text": "최근 활동 사진이 없습니다.", "more": None}
             
-            result = f"[실시간 DB 검색 결과]\n최근 활동 사진 {len(photos)}개:\n\n"
-            for i, photo in enumerate(photos, 1):
-                result += f"{i}. {db_helper.format_activity_photo_info(photo)}\n\n"
-            return result
+            parts = [f"[실시간 DB 검색 결과]\n최근 활동 사진 {len(photos)}개:\n"]
+            parts.extend(
+                f"{i}. {db_helper.format_activity_photo_info(photo)}\n"
+                for i, photo in enumerate(photos, 1)
+            )
+            return {"text": "\n".join(parts), "more": None, "found": True}
         
         elif intent == "list_all":
-            children = db_helper.get_all_children()
-            result = f"[실시간 DB 검색 결과]\n전체 아이 목록 ({len(children)}명):\n\n"
-            for child in children:
-                result += f"- {child.get('name', '알 수 없음')} ({child.get('class_name', '알 수 없음')})\n"
-            return result
+            if params.get("mode") == "summary":
+                counts = db_helper.summarize_children()
+                return {"text": _format_counts("반별 아이 수", counts, "명"), "more": None, "found": bool(counts)}
+            
+            cursor = params.get("cursor", 0)
+            children, next_cursor = db_helper.get_children_page(
+                cursor=cursor, limit=CHATBOT_CONFIG["list_page_size"]
+            )
+            shown = params.get("shown", 0)
+            header = "전체 아이 목록" if not cursor else "아이 목록 (이어서)"
+            total = sum(db_helper.summarize_children().values())
+            lines = [_page_header(header, shown, len(children), total, "명")]
+            lines.extend(
+                f"- {child.get('name', '알 수 없음')} ({child.get('class_name', '알 수 없음')})"
+                for child in children
+            )
+            if next_cursor is not None:
+                lines.append("\n(더 있습니다. '더 보기'로 다음 목록을 확인할 수 있습니다.)")
+            return {
+                "text": "\n".join(lines) + "\n",
+                "more": ({"intent": intent, "cursor": next_cursor, "shown": shown + len(children)}
+                         if next_cursor is not None else None),
+                "found": bool(children)
+            }
         
         elif intent == "list_all_products":
-            products = db_helper.get_all_products()
-            result = f"[실시간 DB 검색 결과]\n전체 제품 목록 ({len(products)}개):\n\n"
-            for product in products:
-                result += f"- {product.get('name', '알 수 없음')} ({product.get('price', 'N/A')}원, 재고: {product.get('stock_quantity', 'N/A')}개)\n"
-            return result
+            if params.get("mode") == "summary":
+                counts = db_helper.summarize_products()
+                return {"text": _format_counts("상태별 제품 수", counts, "개"), "more": None, "found": bool(counts)}
+            
+            cursor = params.get("cursor", 0)
+            products, next_cursor = db_helper.get_products_page(
+                cursor=cursor, limit=CHATBOT_CONFIG["list_page_size"]
+            )
+            shown = params.get("shown", 0)
+            header = "판매중 제품 목록" if not cursor else "판매중 제품 목록 (이어서)"
+            total = db_helper.summarize_products().get("판매중", 0)
+            lines = [_page_header(header, shown, len(products), total, "개")]
+            lines.extend(
+                f"- {product.get('name', '알 수 없음')} ({product.get('price', 'N/A')}원, 재고: {product.get('stock_quantity', 'N/A')}개)"
+                for product in products
+            )
+            if next_cursor is not None:
+                lines.append("\n(더 있습니다. '더 보기'로 다음 목록을 확인할 수 있습니다.)")
+            return {
+                "text": "\n".join(lines) + "\n",
+                "more": ({"intent": intent, "cursor": next_cursor, "shown": shown + len(products)}
+                         if next_cursor is not None else None),
+                "found": bool(products)
+            }
         
-        return ""
+        return {"text": "", "more": None}
         
     except Exception as e:
         logger.error(f"[오류] DB 검색 실패: {str(e)}")
-        return f"데이터베이스 검색 중 오류가 발생했습니다: {str(e)}"
+        return {"text": f"데이터베이스 검색 중 오류가 발생했습니다: {str(e)}", "more": None}
 
 
 # ==============================================
 # 4. RAG 챗봇 함수 (하이브리드)
 # ==============================================
 
-def generate_answer(query: str) -> Dict[str, Any]:
-    """하이브리드 RAG + 실시간 DB 검색 기반 답변 생성"""
+DB_RESULT_HEADER = "[실시간 DB 검색 결과]\n"
+
+# DB 결과만으로 답하는 의도별 답변 머리말
+FAST_ANSWER_TEMPLATES = {
+    "child_info": "요청하신 아이 정보입니다.\n\n{body}",
+    "list_all": "아이 명단입니다.\n\n{body}",
+    "list_all_products": "제품 목록입니다.\n\n{body}",
+    "recent_activity": "최근 활동 사진 정보입니다.\n\n{body}",
+    "product_info": "요청하신 제품 정보입니다.\n\n{body}",
+}
+
+# 백그라운드 LLM 다듬기 작업 (polish_id → Future)
+polish_executor = ThreadPoolExecutor(max_workers=ANSWER_POLICY_CONFIG["polish_workers"])
+polish_results: "OrderedDict[str, Any]" = OrderedDict()
+polish_lock = threading.Lock()
+
+
+def build_prompt(query: str, context: str) -> str:
+    """LLM 답변 프롬프트 구성"""
+    return f"""당신은 친절하고 전문적인 AI 어시스턴트입니다.
+아래 제공된 정보를 바탕으로 사용자의 질문에 정확하고 상세하게 답변해주세요.
+
+제공된 정보:
+{context}
+
+사용자 질문: {query}
+
+답변 지침:
+1. 최신 데이터베이스 정보가 있다면 이를 우선적으로 사용하세요
+2. 제공된 정보를 바탕으로 정확하게 답변하세요
+3. 명확하고 구조화된 형태로 답변하세요
+4. 필요시 단계별로 설명하세요
+5. 정보가 불충분한 경우 솔직히 말씀해주세요
+6. 목록이 일부만 제공된 경우 나머지는 '더 보기'로 확인할 수 있다고 안내하세요
+
+답변:"""
+
+
+def use_fast_path(intent_info: Dict[str, Any], db_found: bool) -> bool:
+    """
+    DB 결과만으로 답변할지 판단 (ANSWER_POLICY_CONFIG)
+    
+    - 의도가 fast_path_intents에 있고
+    - DB 조회 결과가 있으며
+    - require_exact_entity 의도면 엔티티 사전과 정확히 일치한 경우
+    - require_confirmation 의도면 분명한 표현이거나 임베딩 라우터가 같은 의도로 판단한 경우
+    """
+    intent = intent_info["intent"]
+    if intent not in ANSWER_POLICY_CONFIG["fast_path_intents"] or not db_found:
+        return False
+    if intent in ANSWER_POLICY_CONFIG["require_exact_entity"] and not intent_info.get("exact_entity"):
+        return False
+    if intent in ANSWER_POLICY_CONFIG["require_confirmation"] and not _confirmed(intent_info):
+        return False
+    return True
+
+
+def _confirmed(intent_info: Dict[str, Any]) -> bool:
+    return bool(intent_info.get("strict_match") or intent_info.get("router_agreed")
+                or intent_info.get("routed_by") == "embedding")
+
+
+def skips_router(intent_info: Dict[str, Any]) -> bool:
+    """
+    키워드 의도가 이미 바로 답변 대상이면 임베딩 의도 보정 생략
+    
+    정확한 엔티티가 필요 없고 분명한 표현으로 확인된 fast path 의도("전체 아이 명단" 등)는
+    DB 결과로 바로 답하므로 질문 임베딩(OpenAI 호출)을 만들지 않습니다. "전체", "최근" 같은
+    키워드 하나로만 분류된 질문은 라우터로 보정/확인합니다. DB 결과가 없어 RAG로 넘어가면
+    벡터 검색에서 임베딩을 만듭니다.
+    """
+    intent = intent_info["intent"]
+    if (intent not in ANSWER_POLICY_CONFIG["fast_path_intents"]
+            or intent in ANSWER_POLICY_CONFIG["require_exact_entity"]):
+        return False
+    return intent not in ANSWER_POLICY_CONFIG["require_confirmation"] or _confirmed(intent_info)
+
+
+def render_fast_answer(intent: str, db_result: str) -> str:
+    """DB 검색 결과 텍스트로 템플릿 답변 생성"""
+    body = db_result[len(DB_RESULT_HEADER):] if db_result.startswith(DB_RESULT_HEADER) else db_result
+    template = FAST_ANSWER_TEMPLATES.get(intent, "{body}")
+    return template.format(body=body.strip())
+
+
+def submit_polish(query: str, db_result: str) -> str:
+    """템플릿 답변을 LLM으로 다듬는 작업을 백그라운드로 시작하고 polish_id 반환"""
+    polish_id = uuid.uuid4().hex
+    context = f"[최신 데이터베이스 정보]\n{db_result}"
+    future = polish_executor.submit(
+        lambda: llm.invoke([HumanMessage(content=build_prompt(query, context))]).content
+    )
+    
+    with polish_lock:
+        polish_results[polish_id] = future
+        while len(polish_results) > ANSWER_POLICY_CONFIG["polish_results_max"]:
+            polish_results.popitem(last=False)
+    
+    return polish_id
+
+
+def generate_answer(query: str, more: Optional[Dict[str, Any]] = None,
+                    polish: bool = False) -> Dict[str, Any]:
+    """
+    하이브리드 RAG + 실시간 DB 검색 기반 답변 생성
+    
+    Args:
+        query: 사용자 질문
+        more: 이전 응답의 "more" 값 (목록 다음 페이지 요청 시)
+        polish: DB 결과로 바로 답한 경우 LLM으로 다듬은 답변도 백그라운드로 생성
+    """
     try:
-        # 1. 질문 의도 파악
-        intent_info = check_query_intent(query)
+        # 1. 질문 의도 파악 (목록 이어보기면 이전 의도와 커서를 그대로 사용)
+        if more and more.get("intent") in ("list_all", "list_all_products"):
+            intent_info = {
+                "needs_db": True,
+                "intent": more["intent"],
+                "params": {"cursor": more.get("cursor", 0), "shown": more.get("shown", 0)},
+                "strict_match": True  # 이전 목록의 다음 페이지 요청
+            }
+        else:
+            intent_info = check_query_intent(query)
+        
+        # 질문 임베딩은 한 번만 만들어서 의도 보정과 벡터 검색에 같이 사용
+        query_embedding = None
+        if (intent_router is not None and not intent_info.get("exact_entity") and not more
+                and not skips_router(intent_info)):
+            try:
+                query_embedding = retriever.vector_retriever.embed_query(query)
+                intent_info = intent_router.route(
+                    intent_info, query_embedding,
+                    name_extractor=lambda: extract_person_name(query)
+                )
+            except Exception as e:
+                logger.warning(f"[경고] 임베딩 의도 보정 실패 (키워드 결과 사용): {str(e)}")
         
         # 2. 실시간 DB 검색 (필요한 경우)
         db_result = ""
+        db_found = False
+        next_page = None
         if intent_info["needs_db"]:
-            db_result = search_database(intent_info["intent"], intent_info["params"])
+            db_search = search_database(intent_info["intent"], intent_info["params"])
+            db_result = db_search["text"]
+            db_found = db_search.get("found", False)
+            next_page = db_search["more"]
             logger.info(f"[검색] 실시간 DB 검색 수행: {intent_info['intent']}")
         
-        # 3. RAG 벡터 검색 (항상 수행)
-        docs = retriever.invoke(query, k=CHATBOT_CONFIG["search_results_count"])
+        # DB 결과만으로 충분한 질문은 벡터 검색/LLM 없이 바로 답변
+        if use_fast_path(intent_info, db_found):
+            logger.info(f"[정보] DB 결과로 바로 답변: {intent_info['intent']}")
+            result = {
+                "answer": render_fast_answer(intent_info["intent"], db_result),
+                "sources": [{
+                    "content": "실시간 데이터베이스 검색 결과",
+                    "metadata": {"type": "real-time", "intent": intent_info["intent"]}
+                }],
+                "more": next_page,
+                "fast_path": True
+            }
+            if polish and ANSWER_POLICY_CONFIG["allow_background_polish"]:
+                result["polish_id"] = submit_polish(query, db_result)
+            return result
+        
+        # 3. RAG 벡터 검색 (실제 제품명/아이 이름으로 조회한 단순 질문이면 생략)
+        if intent_info.get("exact_entity") and db_found:
+            docs = []
+            logger.info("[정보] 엔티티 정확 일치 - 벡터 검색 생략")
+        else:
+            docs = retriever.invoke(
+                query,
+                k=CHATBOT_CONFIG["search_results_count"],
+                query_embedding=query_embedding
+            )
         
         # 4. 컨텍스트 구성 (DB 결과 + RAG 결과)
         context_parts = []
@@ -479,28 +622,14 @@ def generate_answer(query: str) -> Dict[str, Any]:
         if not context_parts:
             return {
                 "answer": "죄송합니다. 관련 정보를 찾을 수 없습니다.",
-                "sources": []
+                "sources": [],
+                "more": None
             }
         
         context = "\n\n==========\n\n".join(context_parts)
         
         # 5. 프롬프트 구성
-        prompt = f"""당신은 친절하고 전문적인 AI 어시스턴트입니다.
-아래 제공된 정보를 바탕으로 사용자의 질문에 정확하고 상세하게 답변해주세요.
-
-제공된 정보:
-{context}
-
-사용자 질문: {query}
-
-답변 지침:
-1. 최신 데이터베이스 정보가 있다면 이를 우선적으로 사용하세요
-2. 제공된 정보를 바탕으로 정확하게 답변하세요
-3. 명확하고 구조화된 형태로 답변하세요
-4. 필요시 단계별로 설명하세요
-5. 정보가 불충분한 경우 솔직히 말씀해주세요
-
-답변:"""
+        prompt = build_prompt(query, context)
         
         # LLM 호출
         response = llm.invoke([HumanMessage(content=prompt)])
@@ -526,14 +655,16 @@ def generate_answer(query: str) -> Dict[str, Any]:
         
         return {
             "answer": answer,
-            "sources": sources
+            "sources": sources,
+            "more": next_page
         }
         
     except Exception as e:
         logger.error(f"[오류] 답변 생성 오류: {str(e)}")
         return {
             "answer": f"죄송합니다. 오류가 발생했습니다: {str(e)}",
-            "sources": []
+            "sources": [],
+            "more": None
         }
 
 
@@ -549,10 +680,21 @@ def index():
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
-    """챗봇 API 엔드포인트"""
+    """
+    챗봇 API 엔드포인트
+    
+    요청: {"message": str, "more": {"intent": str, "cursor": int, "shown": int}(선택), "polish": bool(선택)}
+    응답의 "more"가 null이 아니면 그 값을 그대로 다시 보내 다음 목록을 받을 수 있습니다.
+    DB 결과로 바로 답한 경우("fast_path": true) "polish"를 요청했다면 "polish_id"가 포함되며,
+    /api/chat/polish/<polish_id>로 LLM이 다듬은 답변을 조회할 수 있습니다.
+    """
     try:
         data = request.get_json()
         user_message = data.get('message', '')
+        more = data.get('more')
+        
+        if more and not user_message:
+            user_message = "더 보기"
         
         if not user_message:
             return jsonify({
@@ -560,12 +702,18 @@ def chat():
             }), 400
         
         # RAG 답변 생성
-        result = generate_answer(user_message)
+        result = generate_answer(user_message, more=more, polish=bool(data.get('polish')))
         
-        return jsonify({
+        response = {
             "answer": result["answer"],
-            "sources": result["sources"]
-        })
+            "sources": result["sources"],
+            "more": result.get("more"),
+            "fast_path": result.get("fast_path", False)
+        }
+        if result.get("polish_id"):
+            response["polish_id"] = result["polish_id"]
+        
+        return jsonify(response)
         
     except Exception as e:
         logger.error(f"[오류] API 오류: {str(e)}")
@@ -574,6 +722,25 @@ def chat():
         }), 500
 
 
+@app.route('/api/chat/polish/<polish_id>', methods=['GET'])
+def chat_polish(polish_id):
+    """백그라운드로 다듬은 답변 조회"""
+    with polish_lock:
+        future = polish_results.get(polish_id)
+    
+    if future is None:
+        return jsonify({"error": "다듬은 답변을 찾을 수 없습니다."}), 404
+    
+    if not future.done():
+        return jsonify({"status": "pending"})
+    
+    try:
+        return jsonify({"status": "done", "answer": future.result()})
+    except Exception as e:
+        logger.error(f"[오류] 답변 다듬기 실패: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """헬스 체크"""
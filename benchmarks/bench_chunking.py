@@ -0,0 +1,136 @@
+"""
+청크 분할 벤치마크: 기존 글자 수 분할기 vs 토큰 기준 분할기 (chunking.TokenChunker)
+
+문서(제목 + 문단, 한국어/영어 섞임)와 표 행("컬럼: 값")을 섞은 말뭉치를 만들어서
+- 기존: RecursiveCharacterTextSplitter(chunk_size=500, length_function=len)
+- 새 방식: TokenChunker(512토큰, 표 행은 행 단위)
+의 처리량(MB/초)과 청크 수, 청크당 토큰 수 분포(p50 / p95 / 최대, 한도 초과 비율)를 비교합니다.
+
+토큰 수는 embedding_pipeline.get_token_counter (tiktoken, 없으면 글자 수 근사)로 셉니다.
+
+사용법:
+    python benchmarks/bench_chunking.py --mb 100
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document
+
+from chunking import TokenChunker
+from embedding_pipeline import get_token_counter
+
+MODEL = "text-embedding-3-small"
+
+KO_SENTENCES = [
+    "주문하신 상품은 평일 기준 2~3일 안에 배송됩니다.",
+    "제주 및 도서 산간 지역은 추가로 1~2일이 더 걸릴 수 있습니다.",
+    "반품은 상품을 받으신 날로부터 7일 이내에 신청하실 수 있습니다.",
+    "단순 변심에 의한 반품은 왕복 배송비가 부과됩니다.",
+    "제품에 하자가 있는 경우 무료로 교환 또는 환불해 드립니다.",
+    "고객센터 운영 시간은 평일 오전 9시부터 오후 6시까지입니다.",
+    "적립금은 구매 확정 후 3일 이내에 지급됩니다.",
+    "회원 등급은 최근 6개월 구매 금액을 기준으로 매월 1일에 갱신됩니다.",
+]
+EN_SENTENCES = [
+    "Orders placed before 3 PM are shipped on the same business day.",
+    "Tracking numbers are sent by email once the parcel leaves the warehouse.",
+    "Gift cards cannot be exchanged for cash or used to buy other gift cards.",
+    "Please keep the original packaging until the return has been processed.",
+]
+HEADINGS = ["배송 안내", "반품 및 교환", "결제 방법", "회원 혜택", "Shipping Policy", "자주 묻는 질문"]
+
+
+def make_corpus(target_bytes: int, seed: int = 42) -> List[Document]:
+    """문서 페이지 70% / 표 행 30% (바이트 기준) 말뭉치"""
+    rng = random.Random(seed)
+    documents = []
+    total = 0
+    row_id = 0
+    while total < target_bytes:
+        if rng.random() < 0.3:
+            row_id += 1
+            text = "\n".join([
+                f"id: {row_id}",
+                f"name: 상품 {row_id % 5000}",
+                f"description: {rng.choice(KO_SENTENCES)} {rng.choice(EN_SENTENCES)}",
+                f"price: {rng.randint(1, 500) * 100}",
+            ])
+            doc = Document(page_content=text, metadata={"source": "products", "_source_type": "json"})
+        else:
+            sections = []
+            for number in range(1, rng.randint(2, 6)):
+                paragraphs = []
+                for _ in range(rng.randint(1, 4)):
+                    sentences = [rng.choice(KO_SENTENCES if rng.random() < 0.75 else EN_SENTENCES)
+                                 for _ in range(rng.randint(2, 12))]
+                    paragraphs.append(" ".join(sentences))
+                sections.append(f"{number}. {rng.choice(HEADINGS)}\n" + "\n\n".join(paragraphs))
+            text = "\n\n".join(sections)
+            doc = Document(page_content=text, metadata={"source": "guide.pdf", "_source_type": "pdf"})
+        documents.append(doc)
+        total += len(text.encode("utf-8"))
+    return documents
+
+
+def percentile(values: List[int], q: float) -> int:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0
+
+
+def run(label: str, split, documents: List[Document], corpus_mb: float, count_tokens, limit: int):
+    started = time.perf_counter()
+    chunks = [chunk for doc in documents for chunk in split(doc)]
+    elapsed = time.perf_counter() - started
+
+    # 토큰 분포는 최대 5만 개 표본으로
+    sample = chunks if len(chunks) <= 50000 else random.Random(0).sample(chunks, 50000)
+    tokens = [count_tokens(chunk.page_content) for chunk in sample]
+    over = sum(1 for value in tokens if value > limit)
+    print(f"  {label:<26} {elapsed:7.1f}초  {corpus_mb / elapsed:6.2f} MB/초  청크 {len(chunks):>9,}개  "
+          f"토큰 p50 {percentile(tokens, 0.5):>4} / p95 {percentile(tokens, 0.95):>4} / "
+          f"최대 {max(tokens, default=0):>5}  {limit}토큰 초과 {over / max(len(tokens), 1):6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청크 분할 벤치마크")
+    parser.add_argument("--mb", type=float, default=100, help="말뭉치 크기 (MB, UTF-8 기준)")
+    parser.add_argument("--chunk-tokens", type=int, default=512)
+    args = parser.parse_args()
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    count_tokens = get_token_counter(MODEL)
+    counter_name = "글자 수 근사 (tiktoken 없음)" if count_tokens is len else "tiktoken"
+
+    print(f"말뭉치 생성 중... ({args.mb:.0f} MB)")
+    documents = make_corpus(int(args.mb * 1024 * 1024))
+    print(f"Document {len(documents):,}개, 토큰 계산: {counter_name}\n")
+
+    legacy = RecursiveCharacterTextSplitter(
+        separators=["\n\n", "\n", ".", " ", ""],
+        chunk_size=500,
+        chunk_overlap=50,
+        length_function=len
+    )
+    chunker = TokenChunker(
+        count_tokens=count_tokens,
+        chunk_tokens=args.chunk_tokens,
+        overlap_tokens=50,
+        source_strategies={"json": "row", "pdf": "document"}
+    )
+
+    run("기존 (500글자)", lambda doc: legacy.split_documents([doc]), documents, args.mb,
+        count_tokens, args.chunk_tokens)
+    run(f"TokenChunker ({args.chunk_tokens}토큰)", chunker.split, documents, args.mb,
+        count_tokens, args.chunk_tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+행 캐시 메모리 비교: dict 리스트 vs CompactTable
+
+DatabaseHelper.data_cache에 들어가는 형태 그대로
+- 기존: List[Dict[str, str]]
+- 압축: compact_rows.CompactTable
+를 만들고 tracemalloc으로 사용 메모리와 조회 속도를 비교합니다.
+
+사용법:
+    python benchmarks/bench_compact_rows.py --rows 100000
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compact_rows import CompactTable
+
+CLASS_NAMES = ["기쁨반", "사랑반", "희망반", "행복반", "소망반", "믿음반"]
+
+
+def iter_child_rows(count: int):
+    """phpMyAdmin 내보내기와 같은 아이 행 생성 (json.loads를 거쳐 값마다 새 문자열 객체)"""
+    for i in range(count):
+        yield json.loads(json.dumps({
+            "id": str(i + 1),
+            "name": f"아이{i:06d}",
+            "class_name": CLASS_NAMES[i % len(CLASS_NAMES)],
+            "gender": "남자" if i % 2 else "여자",
+            "birth_date": f"2019-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "notes": None if i % 4 else "알레르기 있음",
+            "created_at": "2025-01-20 10:00:00",
+        }, ensure_ascii=False))
+
+
+def measure(label: str, build, rows: int):
+    gc.collect()
+    tracemalloc.start()
+    data = build(rows)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # 조회 비용: search_children과 같은 전체 스캔
+    start = time.perf_counter()
+    matched = sum(1 for row in data if "기쁨" in str(row.get("class_name", "")))
+    scan = time.perf_counter() - start
+
+    print(f"{label:<20} {current / 1024 / 1024:8.1f} MB  "
+          f"{current / rows:7.0f} B/행  전체 스캔 {scan * 1000:7.1f} ms ({matched:,}건)")
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="data_cache 메모리 비교")
+    parser.add_argument("--rows", type=int, default=100000, help="행 수")
+    args = parser.parse_args()
+
+    print(f"행 수: {args.rows:,}")
+    print("-" * 80)
+    dict_rows = measure("dict 리스트 (기존)", lambda n: list(iter_child_rows(n)), args.rows)
+    del dict_rows
+    compact = measure("CompactTable", lambda n: CompactTable(iter_child_rows(n)), args.rows)
+
+    # 기존 포맷 함수가 기대하는 dict 동작 확인
+    row = compact[0]
+    assert row.get("name") == "아이000000" and row["class_name"] == "기쁨반"
+    assert row.get("missing", "기본값") == "기본값"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+의도 분석 마이크로 벤치마크: 기존 any(keyword in query) 방식 vs IntentEngine
+
+키워드 목록과 제품명 목록을 지정 배수(기본 10배)로 늘린 상태에서
+질문 1건당 처리 시간을 비교합니다.
+
+사용법:
+    python benchmarks/bench_intent_engine.py --scale 10
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from intent_engine import COMMON_PRODUCTS, KEYWORD_SETS, IntentEngine
+
+QUERIES = [
+    "포도는 얼마인가요?",
+    "박지훈은 어느 반인가요?",
+    "전체 아이 명단 보여줘",
+    "판매중인 상품 목록",
+    "최근 활동 사진 있어?",
+    "농장 소개해주세요",
+    "운영 시간이 어떻게 되나요",
+    "김민수 어디 있어",
+    "블루베리 출하 예정일 알려주세요",
+    "전체 아이 몇 명이야",
+]
+
+
+def scale_list(words, scale: int, rng: random.Random):
+    """원래 키워드에 질문에 등장하지 않는 가짜 키워드를 섞어서 scale배로 늘림"""
+    extra = []
+    for _ in range(len(words) * (scale - 1)):
+        extra.append("".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(2, 4))))
+    return list(words) + extra
+
+
+def naive_intent(query, keyword_sets, products):
+    """기존 check_query_intent와 같은 방식 (호출마다 목록 순회/정규식 컴파일)"""
+    name = ""
+    for pattern in [r'([가-힣]{2,4})(?:는|은|이|가|의|을|를)', r'([가-힣]{2,4})\s*어[디느]']:
+        match = re.search(pattern, query)
+        if match:
+            name = match.group(1)
+            break
+
+    product_keywords = list(keyword_sets["product"])
+    if any(keyword in query for keyword in product_keywords):
+        for word in query.split():
+            if len(word) >= 2 and not any(k in word for k in product_keywords):
+                return "product_info"
+    for product in list(products):
+        if product in query:
+            return "product_info"
+    if name and any(keyword in query for keyword in list(keyword_sets["child"])):
+        return "child_info"
+    if any(keyword in query for keyword in list(keyword_sets["recent"])):
+        if any(keyword in query for keyword in list(keyword_sets["activity"])):
+            return "recent_activity"
+    if any(keyword in query for keyword in list(keyword_sets["list"])):
+        return "list_all"
+    return "general"
+
+
+def bench(label: str, func, queries, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    elapsed = time.perf_counter() - start
+    per_query = elapsed / (repeat * len(queries)) * 1_000_000
+    print(f"{label:<32} {per_query:8.2f} µs/질문")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="의도 분석 마이크로 벤치마크")
+    parser.add_argument("--scale", type=int, default=10, help="키워드 목록 배수")
+    parser.add_argument("--repeat", type=int, default=2000, help="질문 세트 반복 횟수")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    keyword_sets = {label: scale_list(words, args.scale, rng) for label, words in KEYWORD_SETS.items()}
+    products = scale_list(COMMON_PRODUCTS, args.scale, rng)
+    total_keywords = sum(len(words) for words in keyword_sets.values()) + len(products)
+    print(f"키워드 {total_keywords}개 (배수 {args.scale}), 질문 {len(QUERIES)}종 × {args.repeat}회")
+    print("-" * 60)
+
+    bench("기존 방식 (any + re.search)", lambda q: naive_intent(q, keyword_sets, products),
+          QUERIES, args.repeat)
+
+    engine = IntentEngine(keyword_sets=keyword_sets, product_names=products, cache_size=0)
+    bench("IntentEngine (캐시 없음)", engine.check_query_intent, QUERIES, args.repeat)
+
+    cached = IntentEngine(keyword_sets=keyword_sets, product_names=products, cache_size=256)
+    bench("IntentEngine (LRU 캐시)", cached.check_query_intent, QUERIES, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+JSON 로더 벤치마크: json.load 방식 vs 스트리밍 방식
+
+phpMyAdmin 형식의 임시 JSON 파일을 만들고
+- 기존 방식 (json.load 후 "type": "table" 항목 검색)
+- 스트리밍 방식 (json_stream.iter_table_rows)
+의 처리 시간과 최대 메모리(tracemalloc)를 비교합니다.
+
+사용법:
+    python benchmarks/bench_json_stream.py --rows 200000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from json_stream import iter_table_rows
+
+
+def make_export(path: str, rows: int):
+    """phpMyAdmin 내보내기와 같은 구조의 파일 생성 (행 단위로 써서 생성 자체는 가볍게)"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('[\n{"type":"header","version":"5.2.1","comment":"Export to JSON plugin for PHPMyAdmin"},\n')
+        f.write('{"type":"database","name":"bench"},\n')
+        f.write('{"type":"table","name":"products","database":"bench","data":\n[\n')
+        for i in range(rows):
+            row = {
+                "id": str(i),
+                "name": f"출하예정(2025-12-07)_상품{i}",
+                "price": str(10000 + i % 500),
+                "stock_quantity": str(i % 97),
+                "status": "판매중" if i % 3 else "품절",
+                "description": "신선한 농산물입니다. " * 4,
+            }
+            f.write(("," if i else "") + json.dumps(row, ensure_ascii=False) + "\n")
+        f.write("]\n}\n]\n")
+
+
+def load_with_json_load(path: str) -> int:
+    """기존 로더 방식"""
+    with open(path, "r", encoding="utf-8") as f:
+        json_data = json.load(f)
+    data = []
+    for item in json_data:
+        if item.get("type") == "table" and "data" in item:
+            data = item["data"]
+            break
+    return len(data)
+
+
+def load_streaming_list(path: str) -> int:
+    """스트리밍 파서로 읽어서 리스트로 보관 (DatabaseHelper.load_data 방식)"""
+    return len(list(iter_table_rows(path, first_table_only=True)))
+
+
+def load_streaming_iter(path: str) -> int:
+    """스트리밍 파서로 한 행씩만 처리 (보관하지 않음)"""
+    return sum(1 for _ in iter_table_rows(path, first_table_only=True))
+
+
+def measure(label: str, func, path: str):
+    # 시간은 tracemalloc 없이, 메모리는 별도 실행으로 측정 (tracemalloc 오버헤드 제외)
+    start = time.perf_counter()
+    count = func(path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} {count:>10,}행  {elapsed:8.2f}초  "
+          f"{count / elapsed:>12,.0f}행/초  최대 메모리 {peak / 1024 / 1024:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 로더 메모리/처리량 벤치마크")
+    parser.add_argument("--rows", type=int, default=100000, help="생성할 행 수")
+    parser.add_argument("--file", help="기존 phpMyAdmin JSON 파일 사용 (지정 시 생성 생략)")
+    args = parser.parse_args()
+
+    path = args.file
+    cleanup = False
+    if not path:
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        make_export(path, args.rows)
+        cleanup = True
+
+    try:
+        print(f"파일: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+        print("-" * 90)
+        measure("json.load (기존)", load_with_json_load, path)
+        measure("스트리밍 → list", load_streaming_list, path)
+        measure("스트리밍 (보관 안 함)", load_streaming_iter, path)
+    finally:
+        if cleanup:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+PDF 추출 벤치마크: 추출 엔진별 / 작업자 수별 초당 페이지 수
+
+텍스트가 가득 찬 임시 PDF를 직접 만들어서 (외부 라이브러리 없이)
+- 기존 방식 (PyPDF2로 열어서 순차 추출, 페이지 목록 누적)
+- pdf_extract.iter_pdf_pages (설치된 엔진별, 작업자 1개 / N개)
+의 처리 시간과 초당 페이지 수를 비교합니다.
+
+사용법:
+    python benchmarks/bench_pdf_extract.py --pages 1000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_extract import BACKENDS, available_backends, iter_pdf_pages
+
+
+def make_pdf(path: str, pages: int, lines_per_page: int = 60):
+    """Helvetica 텍스트만 있는 PDF 생성 (페이지마다 lines_per_page줄)"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages (페이지 객체 번호를 알고 나서 채움)
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = [
+            f"({page + 1:05d}-{line:02d} Delivery schedule, product code P{(page * 7 + line) % 997:03d}, "
+            f"quantity {(page + line) % 50} boxes, status confirmed) '"
+            for line in range(lines_per_page)
+        ]
+        stream = ("BT /F1 9 Tf 11 TL 40 810 Td\n" + "\n".join(lines) + "\nET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def bench_legacy(path: str):
+    """기존 file_processor_v2.process_pdf_file 방식"""
+    import PyPDF2
+
+    documents = []
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for page_num, page in enumerate(reader.pages):
+            text = page.extract_text()
+            if text.strip():
+                documents.append({"page": page_num + 1, "content": text.strip()})
+    return len(documents), sum(len(doc["content"]) for doc in documents)
+
+
+def bench_stream(path: str, backend_name: str, workers: int):
+    pages = 0
+    chars = 0
+    for _, text in iter_pdf_pages(path, backend=BACKENDS[backend_name](), workers=workers):
+        pages += 1
+        chars += len(text.strip())
+    return pages, chars
+
+
+def run(label: str, func, total_pages: int):
+    started = time.perf_counter()
+    pages, chars = func()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<32} {elapsed:7.2f}초  {total_pages / elapsed:8.1f}페이지/초  "
+          f"(페이지 {pages}, 글자 {chars:,})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 추출 벤치마크")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    if not backends:
+        print("PDF 추출 엔진이 없습니다. pip install pypdfium2 PyPDF2")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        make_pdf(path, args.pages)
+        print(f"PDF {args.pages}페이지, {os.path.getsize(path) / 1024 / 1024:.1f} MB, "
+              f"엔진: {', '.join(backends)}, 작업자 {args.workers}개\n")
+
+        if "pypdf2" in backends:
+            run("기존 (PyPDF2, 목록 누적)", lambda: bench_legacy(path), args.pages)
+        for name in backends:
+            run(f"{name} 순차", lambda: bench_stream(path, name, 1), args.pages)
+            if args.workers > 1:
+                run(f"{name} 작업자 {args.workers}개", lambda: bench_stream(path, name, args.workers), args.pages)
+
+
+if __name__ == "__main__":
+    main()
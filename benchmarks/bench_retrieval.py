@@ -0,0 +1,377 @@
+"""
+검색 품질 / 지연 시간 벤치마크: k, 결합 가중치, 결합 방식, 검색기(BM25 / 벡터 / 하이브리드)
+
+정답 세트(질문 → 관련 청크)로 설정마다 recall@k, MRR, 질문당 컨텍스트 토큰 수와
+검색 지연 시간(p50 / p99)을 계산하고, recall을 유지하는 가장 작은 k를 추천합니다
+(k가 하나 늘 때마다 프롬프트에 청크 하나만큼 토큰이 더 들어감).
+
+1. 스냅숏 만들기 (한 번만, 이후 비교는 네트워크 없이)
+    python benchmarks/bench_retrieval.py snapshot --golden benchmarks/golden_queries.json
+        Supabase 임베딩 테이블(내용 + 메타데이터 + 임베딩)을 내려받고,
+        질문 임베딩은 로컬 임베딩 캐시를 거쳐 만듦 (캐시에 없을 때만 API 호출)
+    python benchmarks/bench_retrieval.py snapshot --from-cache --input extracted_data.json --golden ...
+        Supabase / API 없이: 1단계 결과를 2단계와 같은 방식(중복 제거 → 청크 분할)으로 나누고
+        임베딩 캐시에 있는 임베딩만 사용
+
+2. 비교 (오프라인)
+    python benchmarks/bench_retrieval.py run --golden benchmarks/golden_queries.json
+
+정답 세트 형식 (benchmarks/golden_queries.example.json 참고):
+    [{"query": "질문", "relevant": ["processed_data:12", ...]}, ...]
+    relevant는 청크의 chunk_id, source_key("출처:행:청크 번호"), 또는 행 전체("출처:행")
+
+지연 시간은 로컬 계산 시간입니다 (벡터 검색은 스냅숏에 대한 정확한 코사인 검색,
+실제 서비스의 Supabase 왕복 시간은 포함하지 않음). 설정끼리 비교하는 용도로 사용하세요.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.documents import Document
+
+from hybrid_search import FUSION_METHODS, HybridRetriever, Scored, bm25_search
+
+SNAPSHOT_DIR = "benchmarks/retrieval_snapshot"
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("검색 벤치마크에는 numpy가 필요합니다. pip install numpy")
+    return numpy
+
+
+def load_golden(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+    for item in golden:
+        if not item.get("query") or not item.get("relevant"):
+            raise ValueError(f"정답 세트 항목에 query / relevant가 필요합니다: {item}")
+    return golden
+
+
+# ==============================================
+# 스냅숏
+# ==============================================
+
+def save_snapshot(snapshot_dir: str, documents: List[Document], vectors: List[List[float]],
+                  query_vectors: Dict[str, List[float]]):
+    np = _require_numpy()
+    path = Path(snapshot_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / "chunks.jsonl", "w", encoding="utf-8") as f:
+        for doc in documents:
+            f.write(json.dumps({"content": doc.page_content, "metadata": doc.metadata},
+                               ensure_ascii=False, default=str) + "\n")
+    np.save(path / "embeddings.npy", np.asarray(vectors, dtype=np.float32))
+    with open(path / "queries.json", "w", encoding="utf-8") as f:
+        json.dump(query_vectors, f, ensure_ascii=False)
+    print(f"💾 스냅숏 저장: {path} (청크 {len(documents):,}개, 질문 {len(query_vectors)}개)")
+
+
+def load_snapshot(snapshot_dir: str):
+    np = _require_numpy()
+    path = Path(snapshot_dir)
+    documents = []
+    with open(path / "chunks.jsonl", "r", encoding="utf-8") as f:
+        for line in f:
+            item = json.loads(line)
+            documents.append(Document(page_content=item["content"], metadata=item["metadata"]))
+    vectors = np.load(path / "embeddings.npy")
+    with open(path / "queries.json", "r", encoding="utf-8") as f:
+        query_vectors = json.load(f)
+    return documents, vectors, query_vectors
+
+
+def iter_supabase_rows(page_size: int = 1000) -> Iterator[Tuple[Document, List[float]]]:
+    from supabase import create_client
+
+    from config import SUPABASE_SERVICE_ROLE_KEY, SUPABASE_TABLES, SUPABASE_URL
+
+    client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    offset = 0
+    while True:
+        rows = (
+            client.table(SUPABASE_TABLES["embeddings"])
+            .select("content,metadata,embedding")
+            .order("id")
+            .range(offset, offset + page_size - 1)
+            .execute()
+        ).data or []
+        for row in rows:
+            # pgvector는 "[0.1, ...]" 문자열로 옴
+            embedding = row["embedding"]
+            if isinstance(embedding, str):
+                embedding = json.loads(embedding)
+            yield Document(page_content=row["content"], metadata=row.get("metadata") or {}), embedding
+        if len(rows) < page_size:
+            return
+        offset += page_size
+
+
+def iter_cached_chunks(input_path: str, cache) -> Iterator[Tuple[Document, Optional[List[float]]]]:
+    """1단계 결과 → (2단계와 같은) 중복 제거 → 청크 → 캐시의 임베딩 (없으면 None)"""
+    from chunking import TokenChunker
+    from config import CHUNKING_CONFIG, DEDUP_CONFIG, EMBEDDING_CACHE_CONFIG, EMBEDDING_CONFIG
+    from dedup import Deduplicator
+    from embedding_pipeline import get_token_counter
+    from index_sync import iter_chunk_ids
+    from record_io import iter_records, resolve_data_path
+
+    def documents() -> Iterator[Document]:
+        for item in iter_records(resolve_data_path(input_path)):
+            yield Document(page_content=item["page_content"], metadata=item["metadata"])
+
+    chunker = TokenChunker(
+        count_tokens=get_token_counter(EMBEDDING_CONFIG["model"]),
+        chunk_tokens=CHUNKING_CONFIG["chunk_tokens"],
+        overlap_tokens=CHUNKING_CONFIG["overlap_tokens"],
+        row_max_tokens=CHUNKING_CONFIG["row_max_tokens"],
+        source_strategies=CHUNKING_CONFIG["source_strategies"],
+        default_strategy=CHUNKING_CONFIG["default_strategy"]
+    )
+    docs: Iterator[Document] = documents()
+    if DEDUP_CONFIG["enabled"]:
+        deduplicator = Deduplicator(
+            threshold=DEDUP_CONFIG["threshold"],
+            num_perm=DEDUP_CONFIG["num_perm"],
+            min_chars=DEDUP_CONFIG["min_chars"],
+            prefer_sources=DEDUP_CONFIG["prefer_sources"]
+        )
+        docs = deduplicator.plan(documents()).apply(docs)
+
+    def chunks() -> Iterator[Document]:
+        for doc in docs:
+            for chunk_index, chunk in enumerate(chunker.split(doc)):
+                chunk.metadata["chunk_index"] = chunk_index
+                yield chunk
+
+    batch: List[Document] = []
+    for chunk in iter_chunk_ids(chunks()):
+        batch.append(chunk)
+        if len(batch) >= 500:
+            yield from zip(batch, cache.get_many(EMBEDDING_CONFIG["model"], EMBEDDING_CACHE_CONFIG["dimension"],
+                                                 [doc.page_content for doc in batch]))
+            batch = []
+    if batch:
+        yield from zip(batch, cache.get_many(EMBEDDING_CONFIG["model"], EMBEDDING_CACHE_CONFIG["dimension"],
+                                             [doc.page_content for doc in batch]))
+
+
+def snapshot(args):
+    from config import EMBEDDING_CACHE_CONFIG, EMBEDDING_CONFIG, OPENAI_API_KEY
+    from embedding_cache import CacheMissError, CachedEmbeddings, EmbeddingCache
+
+    golden = load_golden(args.golden)
+    cache = EmbeddingCache(EMBEDDING_CACHE_CONFIG["path"])
+
+    documents, vectors = [], []
+    missing = 0
+    rows = iter_cached_chunks(args.input, cache) if args.from_cache else iter_supabase_rows()
+    for doc, vector in rows:
+        if vector is None:
+            missing += 1
+            continue
+        documents.append(doc)
+        vectors.append(vector)
+    if missing:
+        print(f"⚠️ 임베딩 캐시에 없는 청크 {missing:,}개는 제외했습니다 (2단계를 캐시 사용으로 실행하면 채워짐)")
+
+    embeddings = None
+    if not args.from_cache:
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(model=EMBEDDING_CONFIG["model"], openai_api_key=OPENAI_API_KEY)
+    query_embeddings = CachedEmbeddings(embeddings, cache, model=EMBEDDING_CONFIG["model"],
+                                        dimension=EMBEDDING_CACHE_CONFIG["dimension"],
+                                        offline=args.from_cache)
+    query_vectors = {}
+    for item in golden:
+        try:
+            query_vectors[item["query"]] = query_embeddings.embed_query(item["query"])
+        except CacheMissError:
+            print(f"⚠️ 임베딩 캐시에 없는 질문 (제외): {item['query']}")
+    save_snapshot(args.snapshot, documents, vectors, query_vectors)
+
+
+# ==============================================
+# 검색기
+# ==============================================
+
+class SnapshotVectorRetriever:
+    """스냅숏 임베딩에 대한 정확한 코사인 유사도 검색 (match_mysql_embeddings와 같은 순서)"""
+
+    def __init__(self, documents: List[Document], vectors, query_vectors: Dict[str, List[float]]):
+        np = _require_numpy()
+        self.np = np
+        self.documents = documents
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.where(norms == 0, 1, norms)
+        self.query_vectors = query_vectors
+
+    def similarity_search_with_scores(self, query: str, k: int = 5,
+                                      query_embedding: Optional[List[float]] = None) -> List[Scored]:
+        np = self.np
+        vector = np.asarray(query_embedding if query_embedding is not None else self.query_vectors[query],
+                            dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1)
+        similarities = self.vectors @ vector
+        k = min(k, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        return [(self.documents[i], float(similarities[i])) for i in top]
+
+    def similarity_search(self, query: str, k: int = 5,
+                          query_embedding: Optional[List[float]] = None) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_scores(query, k, query_embedding)]
+
+
+def is_relevant(metadata: Dict[str, Any], relevant_id: str) -> bool:
+    source_key = str(metadata.get("source_key", ""))
+    return relevant_id in (metadata.get("chunk_id"), source_key) or source_key.startswith(relevant_id + ":")
+
+
+def score_result(documents: Sequence[Document], relevant: Sequence[str]) -> Tuple[float, float]:
+    """(recall, reciprocal rank)"""
+    found = {relevant_id for doc in documents for relevant_id in relevant if is_relevant(doc.metadata, relevant_id)}
+    reciprocal_rank = 0.0
+    for rank, doc in enumerate(documents, 1):
+        if any(is_relevant(doc.metadata, relevant_id) for relevant_id in relevant):
+            reciprocal_rank = 1.0 / rank
+            break
+    return len(found) / len(relevant), reciprocal_rank
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+# ==============================================
+# 비교
+# ==============================================
+
+def run(args):
+    from embedding_pipeline import get_token_counter
+    from langchain_community.retrievers import BM25Retriever
+
+    from config import EMBEDDING_CONFIG, RETRIEVAL_CONFIG
+
+    documents, vectors, query_vectors = load_snapshot(args.snapshot)
+    golden = [item for item in load_golden(args.golden) if item["query"] in query_vectors]
+    if not golden:
+        print("❌ 스냅숏에 임베딩이 있는 질문이 없습니다. snapshot을 다시 만드세요.")
+        return
+    count_tokens = get_token_counter(EMBEDDING_CONFIG["model"])
+    chunk_tokens = {doc.page_content: count_tokens(doc.page_content) for doc in documents}
+
+    vector_retriever = SnapshotVectorRetriever(documents, vectors, query_vectors)
+    bm25_retriever = BM25Retriever.from_documents(documents=documents, k=max(args.k))
+    print(f"청크 {len(documents):,}개 / 질문 {len(golden)}개 / k {args.k} / 반복 {args.repeat}회\n")
+
+    searches = [("bm25", None, None, lambda query, k: [doc for doc, _ in bm25_search(bm25_retriever, query, k)]),
+                ("vector", None, None, lambda query, k: vector_retriever.similarity_search(query, k))]
+    for method in args.fusion:
+        for weight in args.weights:
+            hybrid = HybridRetriever(vector_retriever, bm25_retriever, vector_weight=weight,
+                                     bm25_weight=1 - weight, fusion=method, rrf_k=args.rrf_k)
+            searches.append(("hybrid", method, weight, hybrid.search))
+
+    results = []
+    print(f"{'검색기':<8}{'결합':<7}{'벡터 가중치':>10}{'k':>4}{'recall@k':>10}{'MRR':>8}"
+          f"{'컨텍스트 토큰':>13}{'p50 ms':>9}{'p99 ms':>9}")
+    for backend, method, weight, search in searches:
+        for k in args.k:
+            recalls, reciprocal_ranks, latencies, tokens = [], [], [], []
+            for item in golden:
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    retrieved = search(item["query"], k)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                recall, reciprocal_rank = score_result(retrieved, item["relevant"])
+                recalls.append(recall)
+                reciprocal_ranks.append(reciprocal_rank)
+                tokens.append(sum(chunk_tokens.get(doc.page_content, 0) for doc in retrieved))
+            row = {
+                "backend": backend, "fusion": method, "vector_weight": weight, "k": k,
+                "recall": statistics.mean(recalls), "mrr": statistics.mean(reciprocal_ranks),
+                "context_tokens": statistics.mean(tokens),
+                "p50_ms": percentile(latencies, 0.5), "p99_ms": percentile(latencies, 0.99),
+            }
+            results.append(row)
+            print(f"{backend:<8}{method or '-':<7}{'-' if weight is None else f'{weight:.2f}':>10}{k:>4}"
+                  f"{row['recall']:>10.3f}{row['mrr']:>8.3f}{row['context_tokens']:>13,.0f}"
+                  f"{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}")
+
+    # 가장 큰 k에서 recall이 가장 높은 설정 → 그 설정에서 recall을 유지하는 가장 작은 k
+    max_k = max(args.k)
+    best = max((row for row in results if row["k"] == max_k), key=lambda row: (row["recall"], row["mrr"]))
+    same_setting = [row for row in results if (row["backend"], row["fusion"], row["vector_weight"]) ==
+                    (best["backend"], best["fusion"], best["vector_weight"])]
+    recommended = min((row for row in same_setting if row["recall"] >= best["recall"] - args.tolerance),
+                      key=lambda row: row["k"])
+    current = next((row for row in results if row["backend"] == "hybrid"
+                    and row["fusion"] == RETRIEVAL_CONFIG["fusion"]
+                    and row["vector_weight"] == RETRIEVAL_CONFIG["hybrid_weight"]
+                    and row["k"] == RETRIEVAL_CONFIG["k"]), None)
+
+    print("\n" + "=" * 60)
+    if current:
+        print(f"📌 현재 설정 ({current['fusion']}, 벡터 {current['vector_weight']}, k={current['k']}): "
+              f"recall {current['recall']:.3f} / MRR {current['mrr']:.3f} / "
+              f"컨텍스트 {current['context_tokens']:,.0f}토큰")
+    setting = recommended["backend"]
+    if recommended["fusion"]:
+        setting += f" {recommended['fusion']}, 벡터 {recommended['vector_weight']}"
+    print(f"✅ 추천: {setting}, k={recommended['k']} - recall {recommended['recall']:.3f} "
+          f"(k={max_k} 최고 {best['recall']:.3f}에서 {args.tolerance} 이내), MRR {recommended['mrr']:.3f}, "
+          f"컨텍스트 {recommended['context_tokens']:,.0f}토큰")
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"queries": len(golden), "chunks": len(documents), "results": results,
+                       "recommended": recommended}, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 품질 / 지연 시간 벤치마크")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="오프라인 비교용 스냅숏 만들기")
+    snapshot_parser.add_argument("--golden", required=True, help="정답 세트 JSON")
+    snapshot_parser.add_argument("--snapshot", default=SNAPSHOT_DIR)
+    snapshot_parser.add_argument("--from-cache", action="store_true",
+                                 help="Supabase / API 없이 1단계 결과 + 임베딩 캐시로 만들기")
+    snapshot_parser.add_argument("--input", default="extracted_data.json", help="--from-cache: 1단계 결과 파일")
+
+    run_parser = subparsers.add_parser("run", help="설정별 비교 (오프라인)")
+    run_parser.add_argument("--golden", required=True, help="정답 세트 JSON")
+    run_parser.add_argument("--snapshot", default=SNAPSHOT_DIR)
+    run_parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 8, 10])
+    run_parser.add_argument("--weights", type=float, nargs="+", default=[0.3, 0.5, 0.7, 0.9],
+                            help="하이브리드 벡터 가중치 (BM25 = 1 - 벡터)")
+    run_parser.add_argument("--fusion", nargs="+", default=list(FUSION_METHODS), choices=FUSION_METHODS)
+    run_parser.add_argument("--rrf-k", type=int, default=60)
+    run_parser.add_argument("--repeat", type=int, default=3, help="지연 시간 측정용 질문당 반복 횟수")
+    run_parser.add_argument("--tolerance", type=float, default=0.01,
+                            help="추천 k: 최고 recall에서 이만큼 낮은 것까지 허용")
+    run_parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        snapshot(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+임베딩 테이블 대량 적재 (Postgres COPY BINARY)
+작성일: 2025-12-02
+
+주요 기능:
+- REST API(PostgREST) 대신 Postgres에 직접 연결해서 COPY BINARY로 적재
+- 새 스테이징 테이블에 적재 → 인덱스 생성 → 한 트랜잭션에서 기존 테이블과 교체
+- 벡터 인덱스(ivfflat)는 적재가 끝난 뒤 한 번에 생성 (행마다 인덱스 갱신 안 함)
+- 초당 적재 행 수 보고 (REST 경로의 EmbeddingIngestor 결과와 비교용)
+
+전체 재구성 전용입니다. 교체 중 오류가 나면 기존 테이블은 그대로 유지됩니다.
+직접 연결 주소(SUPABASE_DB_URL)와 psycopg(3.x)가 필요합니다.
+"""
+
+import json
+import logging
+import re
+import struct
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 적재할 컬럼 (created_at은 기본값 사용)
+COPY_COLUMNS = ("id", "content", "metadata", "embedding")
+
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_COPY_TRAILER = struct.pack("!h", -1)
+_FIELD_COUNT = struct.pack("!h", len(COPY_COLUMNS))
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+# ==============================================
+# 1. COPY BINARY 인코딩
+# ==============================================
+
+def _field(data: bytes) -> bytes:
+    return struct.pack("!i", len(data)) + data
+
+
+def encode_vector(vector: List[float]) -> bytes:
+    """pgvector 바이너리 형식: int16 차원 + int16 예약(0) + float4 배열 (big-endian)"""
+    return struct.pack(f"!hh{len(vector)}f", len(vector), 0, *vector)
+
+
+def encode_row(row: Dict[str, Any]) -> bytes:
+    """EmbeddingIngestor.build_rows 형식의 행 하나를 COPY BINARY 튜플로 변환"""
+    metadata = json.dumps(row.get("metadata") or {}, ensure_ascii=False)
+    return b"".join((
+        _FIELD_COUNT,
+        _field(uuid.UUID(str(row["id"])).bytes),
+        _field(row["content"].encode("utf-8")),
+        _field(b"\x01" + metadata.encode("utf-8")),  # jsonb 바이너리 버전 1
+        _field(encode_vector(row["embedding"])),
+    ))
+
+
+# ==============================================
+# 2. 대량 적재
+# ==============================================
+
+@dataclass
+class BulkLoadReport:
+    rows: int = 0
+    bytes: int = 0
+    copy_seconds: float = 0.0
+    index_seconds: float = 0.0
+    swap_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """COPY 단계 기준 초당 적재 행 수 (임베딩 대기 시간 포함)"""
+        return self.rows / self.copy_seconds if self.copy_seconds else 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return self.copy_seconds + self.index_seconds + self.swap_seconds
+
+
+class BulkVectorLoader:
+    """
+    스테이징 테이블 COPY 적재 후 기존 임베딩 테이블과 교체
+
+    Args:
+        db_url: Postgres 직접 연결 주소 (Supabase: Project Settings → Database)
+        table_name: 교체할 임베딩 테이블
+        dimension: 벡터 차원
+        ivfflat_lists: ivfflat lists 값 (None이면 행 수 기준으로 계산)
+        flush_bytes: COPY 스트림에 한 번에 보내는 크기
+    """
+
+    def __init__(self, db_url: str, table_name: str, dimension: int = 1536,
+                 ivfflat_lists: Optional[int] = None, maintenance_work_mem: Optional[str] = None,
+                 flush_bytes: int = 1 << 20):
+        if not _IDENTIFIER.match(table_name):
+            raise ValueError(f"잘못된 테이블 이름: {table_name}")
+        self.db_url = db_url
+        self.table_name = table_name
+        self.staging_name = f"{table_name}_staging"
+        self.dimension = dimension
+        self.ivfflat_lists = ivfflat_lists
+        self.maintenance_work_mem = maintenance_work_mem
+        self.flush_bytes = flush_bytes
+
+    def connect(self):
+        try:
+            import psycopg
+        except ImportError:
+            logger.error("[오류] psycopg가 설치되지 않았습니다. pip install \"psycopg[binary]\"")
+            raise
+        return psycopg.connect(self.db_url)
+
+    def _create_staging(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.staging_name}")
+        # 인덱스/기본키 없이 생성 (적재 후 한 번에 생성)
+        cursor.execute(
+            f"CREATE TABLE {self.staging_name} "
+            f"(LIKE {self.table_name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+
+    def _copy(self, cursor, rows: Iterable[Dict[str, Any]], report: BulkLoadReport):
+        columns = ", ".join(COPY_COLUMNS)
+        buffer = bytearray(_COPY_HEADER)
+        with cursor.copy(f"COPY {self.staging_name} ({columns}) FROM STDIN (FORMAT BINARY)") as copy:
+            for row in rows:
+                if len(row["embedding"]) != self.dimension:
+                    raise ValueError(f"벡터 차원 불일치: {len(row['embedding'])} != {self.dimension} (id={row['id']})")
+                buffer += encode_row(row)
+                report.rows += 1
+                if len(buffer) >= self.flush_bytes:
+                    copy.write(bytes(buffer))
+                    report.bytes += len(buffer)
+                    buffer.clear()
+            buffer += _COPY_TRAILER
+            copy.write(bytes(buffer))
+            report.bytes += len(buffer)
+
+    def _lists_for(self, rows: int) -> int:
+        # pgvector 권장값: 100만 행까지 rows / 1000
+        return self.ivfflat_lists or max(10, min(rows // 1000, 1000))
+
+    def _build_indexes(self, cursor, rows: int):
+        staging = self.staging_name
+        if self.maintenance_work_mem:
+            cursor.execute(f"SET maintenance_work_mem = '{self.maintenance_work_mem}'")
+        cursor.execute(f"ALTER TABLE {staging} ADD CONSTRAINT {staging}_pkey PRIMARY KEY (id)")
+        cursor.execute(
+            f"CREATE INDEX {staging}_embedding_idx ON {staging} "
+            f"USING ivfflat (embedding vector_cosine_ops) WITH (lists = {self._lists_for(rows)})"
+        )
+        cursor.execute(f"CREATE INDEX {staging}_metadata_idx ON {staging} USING gin (metadata)")
+        cursor.execute(
+            f"CREATE INDEX {staging}_content_idx ON {staging} "
+            f"USING gin (to_tsvector('english', content))"
+        )
+        cursor.execute(f"ANALYZE {staging}")
+
+    def _copy_policies(self, cursor):
+        """기존 테이블의 RLS 정책을 스테이징 테이블에 복사"""
+        cursor.execute(
+            "SELECT policyname, permissive, roles, cmd, qual, with_check "
+            "FROM pg_policies WHERE schemaname = current_schema() AND tablename = %s",
+            (self.table_name,)
+        )
+        policies = cursor.fetchall()
+        cursor.execute(f"ALTER TABLE {self.staging_name} ENABLE ROW LEVEL SECURITY")
+        for name, permissive, roles, cmd, qual, with_check in policies:
+            if isinstance(roles, str):
+                roles = roles.strip("{}").split(",")
+            statement = (
+                f'CREATE POLICY "{name}" ON {self.staging_name} AS {permissive} FOR {cmd} '
+                f"TO {', '.join(roles)}"
+            )
+            if qual:
+                statement += f" USING ({qual})"
+            if with_check:
+                statement += f" WITH CHECK ({with_check})"
+            cursor.execute(statement)
+
+    def _swap(self, cursor):
+        """기존 테이블 삭제 후 스테이징 테이블/인덱스를 원래 이름으로 변경"""
+        table, staging = self.table_name, self.staging_name
+        cursor.execute("SET LOCAL lock_timeout = '10s'")
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+        cursor.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {staging}_pkey TO {table}_pkey")
+        for suffix in ("embedding_idx", "metadata_idx", "content_idx"):
+            cursor.execute(f"ALTER INDEX {staging}_{suffix} RENAME TO {table}_{suffix}")
+
+    def load(self, rows: Iterable[Dict[str, Any]]) -> BulkLoadReport:
+        """
+        행을 스테이징 테이블에 적재하고 기존 테이블과 교체
+
+        Args:
+            rows: {"id", "content", "metadata", "embedding"} 행 (generator 가능)
+
+        Returns:
+            BulkLoadReport
+        """
+        report = BulkLoadReport()
+        with self.connect() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    self._create_staging(cursor)
+                    started = time.perf_counter()
+                    self._copy(cursor, rows, report)
+                    report.copy_seconds = time.perf_counter() - started
+                if not report.rows:
+                    # 원본을 못 읽은 경우 빈 테이블로 교체하지 않음
+                    raise ValueError("적재할 행이 없습니다 - 기존 테이블 유지")
+                conn.commit()
+                logger.info(f"[적재] COPY 완료: {report.rows}개 행, {report.bytes / 1024 / 1024:.1f} MB, "
+                            f"{report.copy_seconds:.1f}초 ({report.rows_per_second:.1f}행/초)")
+
+                started = time.perf_counter()
+                with conn.cursor() as cursor:
+                    self._build_indexes(cursor, report.rows)
+                    self._copy_policies(cursor)
+                conn.commit()
+                report.index_seconds = time.perf_counter() - started
+                logger.info(f"[적재] 인덱스 생성 완료 ({report.index_seconds:.1f}초)")
+
+                started = time.perf_counter()
+                with conn.cursor() as cursor:
+                    self._swap(cursor)
+                conn.commit()
+                report.swap_seconds = time.perf_counter() - started
+                logger.info(f"[적재] 테이블 교체 완료 ({report.swap_seconds:.2f}초)")
+            except Exception:
+                conn.rollback()
+                with conn.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE IF EXISTS {self.staging_name}")
+                conn.commit()
+                raise
+        return report
@@ -0,0 +1,509 @@
+"""
+MySQL → 벡터 인덱스 변경 동기화 워커 (CDC)
+작성일: 2025-12-11
+
+주요 기능:
+- 테이블마다 워터마크(updated_at + 기본 키, 또는 auto-increment 기본 키)를 저장하고
+  그 이후에 바뀐 행만 읽음
+- binlog를 읽을 수 있으면 (CDC_CONFIG["use_binlog"]) 추가/수정/삭제 이벤트로 바뀐 행을 찾음
+- 바뀐 행 → convert_to_documents → 청크 → 결정적 ID (index_sync) → 저장된 ID와 다른 청크만 임베딩/저장
+- 삭제된 행(또는 텍스트가 비게 된 행)의 벡터 삭제
+  - binlog: 삭제 이벤트로 바로
+  - 워터마크: reconcile_minutes마다 MySQL 기본 키와 벡터 행을 비교
+
+실행:
+    python cdc_sync.py              # interval_seconds마다 계속 (Ctrl+C / SIGTERM이면 현재 주기 후 종료)
+    python cdc_sync.py --once       # 한 번만
+    python cdc_sync.py --from-now   # 처음 실행 시 기존 행은 건너뜀 (2단계로 인덱스를 이미 만든 경우)
+
+주의:
+- 기본 키(단일 컬럼)가 metadata_columns에 있어야 벡터 행을 원본 행과 연결할 수 있습니다.
+- updated_at 워터마크는 (updated_at, 기본 키) 인덱스가 있어야 빠릅니다. updated_at이 NULL인 행은 감지하지 않습니다.
+- 행 단위로 반영하므로 유사 중복 제거(dedup.py)는 적용하지 않습니다 (2단계 전체 실행에서 다시 정리).
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.documents import Document
+
+import mysql_source
+from index_sync import VectorIndexSync, iter_chunk_ids
+
+# 설정 파일 임포트
+try:
+    from config import (
+        CAFE24_DB_CONFIG,
+        CDC_CONFIG,
+        DATA_EXTRACTION_CONFIG,
+        LOGGING_CONFIG,
+        SUPABASE_TABLES
+    )
+except ImportError:
+    print("[오류] config.py 파일이 없습니다!")
+    print("[참고] config.example.py를 config.py로 복사하고 실제 값을 입력하세요.")
+    exit(1)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TableSpec:
+    """동기화할 테이블 하나"""
+
+    key: str                    # DATA_EXTRACTION_CONFIG 키
+    table: str
+    columns: List[str]          # SELECT할 컬럼 (기본 키 + 설정 컬럼 + 워터마크 컬럼)
+    primary_key: str
+    watermark_column: str
+    text_columns: List[str]
+    metadata_columns: List[str]
+
+    @property
+    def uses_timestamp(self) -> bool:
+        return self.watermark_column != self.primary_key
+
+
+class CDCState:
+    """워터마크 / binlog 위치 저장 (JSON, 저장할 때마다 임시 파일 → 교체)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data: Dict[str, Any] = {"tables": {}, "binlog": None}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data.update(json.load(f))
+
+    def table(self, key: str) -> Dict[str, Any]:
+        return self.data["tables"].setdefault(key, {})
+
+    @property
+    def binlog(self) -> Optional[Dict[str, Any]]:
+        return self.data.get("binlog")
+
+    @binlog.setter
+    def binlog(self, position: Optional[Dict[str, Any]]):
+        self.data["binlog"] = position
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+
+
+def plan_tables(connection, cdc_tables: Dict[str, Dict[str, Any]],
+                extraction_config: Dict[str, Dict[str, Any]]) -> List[TableSpec]:
+    """CDC_CONFIG["tables"] → TableSpec 목록 (조건이 맞지 않는 테이블은 경고 후 제외)"""
+    specs = []
+    for key, cdc_table in cdc_tables.items():
+        table_config = extraction_config.get(key)
+        if not table_config:
+            logger.error(f"[오류] DATA_EXTRACTION_CONFIG에 {key}가 없습니다.")
+            continue
+        query = mysql_source.plan_query(
+            connection, key=key, table=table_config["table"],
+            wanted_columns=table_config["text_columns"] + table_config["metadata_columns"]
+        )
+        if not query:
+            continue
+        if len(query.order_by) != 1:
+            logger.error(f"[오류] {query.table}: 단일 컬럼 기본 키가 있어야 변경 동기화를 할 수 있습니다.")
+            continue
+        primary_key = query.order_by[0]
+        if primary_key not in table_config["metadata_columns"]:
+            logger.error(f"[오류] {query.table}: 기본 키 {primary_key}를 metadata_columns에 추가해야 합니다.")
+            continue
+        watermark_column = cdc_table.get("watermark_column") or primary_key
+        if watermark_column not in mysql_source.table_columns(connection, query.table):
+            logger.error(f"[오류] {query.table}에 워터마크 컬럼 {watermark_column}이 없습니다.")
+            continue
+        specs.append(TableSpec(
+            key=key,
+            table=query.table,
+            columns=list(dict.fromkeys(query.columns + [watermark_column])),
+            primary_key=primary_key,
+            watermark_column=watermark_column,
+            text_columns=table_config["text_columns"],
+            metadata_columns=table_config["metadata_columns"]
+        ))
+    return specs
+
+
+def current_binlog_position(connection) -> Optional[Dict[str, Any]]:
+    """현재 binlog 파일/위치 (MySQL 8.4부터는 SHOW BINARY LOG STATUS)"""
+    for statement in ("SHOW BINARY LOG STATUS", "SHOW MASTER STATUS"):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(statement)
+                row = cursor.fetchone()
+            if row:
+                return {"log_file": row["File"], "log_pos": int(row["Position"])}
+        except Exception:
+            continue
+    return None
+
+
+class BinlogReader:
+    """
+    binlog 행 이벤트에서 바뀐/삭제된 기본 키 모으기 (python-mysql-replication)
+
+    binlog_format=ROW, REPLICATION SLAVE / REPLICATION CLIENT 권한이 필요합니다.
+    """
+
+    def __init__(self, db_config: Dict[str, Any], server_id: int):
+        try:
+            from pymysqlreplication import BinLogStreamReader  # noqa: F401
+        except ImportError:
+            raise ImportError("binlog 읽기에는 mysql-replication이 필요합니다. pip install mysql-replication")
+        self.db_config = db_config
+        self.server_id = server_id
+
+    def read(self, specs: Sequence[TableSpec], position: Dict[str, Any]
+             ) -> Tuple[Dict[str, Set[Any]], Dict[str, Any]]:
+        """
+        position 이후 이벤트를 현재 끝까지 읽음 (기다리지 않음)
+
+        Returns:
+            ({테이블 키: 바뀌었거나 삭제된 기본 키}, 새 binlog 위치)
+        """
+        from pymysqlreplication import BinLogStreamReader
+        from pymysqlreplication.row_event import DeleteRowsEvent, UpdateRowsEvent, WriteRowsEvent
+
+        by_table = {spec.table: spec for spec in specs}
+        touched: Dict[str, Set[Any]] = {spec.key: set() for spec in specs}
+        stream = BinLogStreamReader(
+            connection_settings={
+                "host": self.db_config["host"],
+                "port": self.db_config.get("port", 3306),
+                "user": self.db_config["user"],
+                "passwd": self.db_config["password"],
+            },
+            server_id=self.server_id,
+            only_events=[WriteRowsEvent, UpdateRowsEvent, DeleteRowsEvent],
+            only_schemas=[self.db_config["database"]],
+            only_tables=list(by_table),
+            resume_stream=True,
+            log_file=position["log_file"],
+            log_pos=position["log_pos"],
+            blocking=False
+        )
+        try:
+            for event in stream:
+                spec = by_table.get(event.table)
+                if not spec:
+                    continue
+                for row in event.rows:
+                    # 수정: 바뀌기 전/후 키 모두 (기본 키가 바뀌면 이전 키는 삭제로 처리됨)
+                    for values_key in ("values", "before_values", "after_values"):
+                        values = row.get(values_key)
+                        if values and values.get(spec.primary_key) is not None:
+                            touched[spec.key].add(values[spec.primary_key])
+            new_position = {"log_file": stream.log_file or position["log_file"],
+                            "log_pos": stream.log_pos or position["log_pos"]}
+        finally:
+            stream.close()
+        return touched, new_position
+
+
+class CDCSync:
+    """
+    변경된 행만 벡터 인덱스에 반영
+
+    Args:
+        generator: 2_embedding_generator.EmbeddingGenerator (청크 분할 / 임베딩 / 저장)
+        loader: 1_mysql_data_loader.MySQLDataLoader (행 → Document)
+        db_config: MySQL 접속 정보
+        config: CDC_CONFIG
+    """
+
+    def __init__(self, generator, loader, db_config: Dict[str, Any] = CAFE24_DB_CONFIG,
+                 config: Dict[str, Any] = CDC_CONFIG,
+                 extraction_config: Dict[str, Dict[str, Any]] = DATA_EXTRACTION_CONFIG):
+        self.generator = generator
+        self.loader = loader
+        self.db_config = db_config
+        self.config = config
+        self.extraction_config = extraction_config
+        self.state = CDCState(config["state_file"])
+        self.index_sync = VectorIndexSync(generator.supabase_client, SUPABASE_TABLES["embeddings"])
+        self.binlog_reader: Optional[BinlogReader] = None
+        self.specs: List[TableSpec] = []
+
+    def prepare(self, from_now: bool = False):
+        """테이블 확인, 첫 실행이면 워터마크 / binlog 시작 위치 결정"""
+        connection = mysql_source.connect(self.db_config)
+        try:
+            self.specs = plan_tables(connection, self.config["tables"], self.extraction_config)
+            if self.config["use_binlog"]:
+                try:
+                    self.binlog_reader = BinlogReader(self.db_config, self.config["binlog_server_id"])
+                    if not self.state.binlog:
+                        # 지금 위치부터 읽고, 그 전 행은 워터마크로 따라잡음 (겹쳐도 결과는 같음)
+                        self.state.binlog = current_binlog_position(connection)
+                    if not self.state.binlog:
+                        raise RuntimeError("binlog 위치를 읽을 수 없습니다 (log_bin 비활성 또는 권한 없음)")
+                except Exception as e:
+                    logger.warning(f"[경고] binlog를 사용할 수 없어 워터마크 방식으로 동기화합니다: {str(e)}")
+                    self.binlog_reader = None
+            if from_now:
+                for spec in self.specs:
+                    if not self.state.table(spec.key).get("watermark"):
+                        self.state.table(spec.key)["watermark"] = self.latest_watermark(connection, spec)
+            self.state.save()
+        finally:
+            connection.close()
+        mode = "binlog" if self.binlog_reader else "워터마크"
+        logger.info(f"[완료] 변경 동기화 준비 완료 ({mode}): "
+                    + ", ".join(f"{spec.table}({spec.watermark_column})" for spec in self.specs))
+
+    # ------------------------------------------
+    # 행 반영
+    # ------------------------------------------
+
+    def sync_rows(self, spec: TableSpec, rows: List[Dict[str, Any]],
+                  deleted_keys: Sequence[Any] = ()) -> bool:
+        """
+        바뀐 행을 다시 임베딩/저장하고, 더 이상 없는 청크(삭제된 행 포함)의 벡터 삭제
+
+        Returns:
+            성공 여부 (실패하면 워터마크를 옮기지 않음)
+        """
+        documents: List[Document] = self.loader.convert_to_documents(
+            rows, spec.text_columns, spec.metadata_columns, spec.table
+        )
+        chunks = list(iter_chunk_ids(self.generator.iter_chunks(documents)))
+        keys = [row[spec.primary_key] for row in rows] + list(deleted_keys)
+        stored = self.index_sync.fetch_ids_by_row(spec.table, spec.primary_key, keys)
+
+        desired: Dict[str, Document] = {}
+        for chunk in chunks:
+            desired.setdefault(chunk.metadata["chunk_id"], chunk)
+        to_embed = [chunk for chunk_id, chunk in desired.items() if chunk_id not in stored]
+
+        if to_embed and not self.generator.save_to_supabase(to_embed):
+            return False
+        stale = sorted(stored - desired.keys())
+        if stale:
+            self.index_sync.delete_ids(stale)
+        logger.info(f"[동기화] {spec.table}: 행 {len(rows)}개 (삭제 {len(deleted_keys)}개) → "
+                    f"임베딩 {len(to_embed)}개, 변경 없음 {len(desired) - len(to_embed)}개, "
+                    f"벡터 삭제 {len(stale)}개")
+        return True
+
+    # ------------------------------------------
+    # 워터마크
+    # ------------------------------------------
+
+    def latest_watermark(self, connection, spec: TableSpec) -> Optional[List[Any]]:
+        """지금 가장 마지막 행의 워터마크 (--from-now)"""
+        wm = mysql_source.quote_identifier(spec.watermark_column)
+        pk = mysql_source.quote_identifier(spec.primary_key)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {wm} AS wm, {pk} AS pk FROM {mysql_source.quote_identifier(spec.table)} "
+                f"WHERE {wm} IS NOT NULL ORDER BY {wm} DESC, {pk} DESC LIMIT 1"
+            )
+            row = cursor.fetchone()
+        if not row:
+            return None
+        row = mysql_source.json_safe_rows([row])[0]
+        return [row["wm"], row["pk"]]
+
+    def changed_rows_query(self, spec: TableSpec, watermark: Optional[List[Any]]) -> "mysql_source.TableQuery":
+        """워터마크 이후 행 (워터마크 컬럼, 기본 키 순서로 batch_rows개)"""
+        wm = mysql_source.quote_identifier(spec.watermark_column)
+        pk = mysql_source.quote_identifier(spec.primary_key)
+        conditions: List[str] = []
+        params: List[Any] = []
+        if spec.uses_timestamp:
+            conditions.append(f"{wm} <= NOW() - INTERVAL %s SECOND")
+            params.append(self.config["safety_lag_seconds"])
+            if watermark:
+                conditions.append(f"({wm} > %s OR ({wm} = %s AND {pk} > %s))")
+                params.extend([watermark[0], watermark[0], watermark[1]])
+            order_by = [spec.watermark_column, spec.primary_key]
+        else:
+            if watermark:
+                conditions.append(f"{pk} > %s")
+                params.append(watermark[1])
+            order_by = [spec.primary_key]
+        return mysql_source.TableQuery(
+            key=spec.key, table=spec.table, columns=spec.columns, order_by=order_by,
+            where=" AND ".join(conditions) or None, params=params, limit=self.config["batch_rows"]
+        )
+
+    def poll_table(self, connection, spec: TableSpec, stop: threading.Event) -> int:
+        """워터마크 이후 바뀐 행을 batch_rows개씩 반영 (배치마다 워터마크 저장)"""
+        table_state = self.state.table(spec.key)
+        processed = 0
+        while not stop.is_set():
+            rows = mysql_source.fetch_rows(connection, self.changed_rows_query(spec, table_state.get("watermark")))
+            if not rows:
+                break
+            if not self.sync_rows(spec, rows):
+                logger.error(f"[오류] {spec.table} 반영 실패 - 다음 주기에 같은 행부터 다시 시도합니다.")
+                break
+            last = rows[-1]
+            table_state["watermark"] = [last[spec.watermark_column], last[spec.primary_key]]
+            self.state.save()
+            processed += len(rows)
+            if len(rows) < self.config["batch_rows"]:
+                break
+        return processed
+
+    def reconcile_deletes(self, connection, spec: TableSpec) -> int:
+        """
+        MySQL에 없는 기본 키의 벡터 삭제 (워터마크 방식은 삭제를 감지하지 못하므로 주기적으로)
+
+        MySQL 기본 키만 스트리밍으로 읽어서 집합으로 보관합니다 (키만, 행 내용은 읽지 않음).
+        """
+        keys: Set[str] = set()
+        key_query = mysql_source.TableQuery(key=spec.key, table=spec.table, columns=[spec.primary_key])
+        for rows in mysql_source.iter_row_chunks(self.db_config, key_query, chunk_size=10000):
+            keys.update(str(row[spec.primary_key]) for row in rows)
+
+        stale = [row_id for row_id, row_key in self.index_sync.iter_row_keys(spec.table, spec.primary_key)
+                 if row_key not in keys]
+        deleted = self.index_sync.delete_ids(stale) if stale else 0
+        self.state.table(spec.key)["reconciled_at"] = time.time()
+        self.state.save()
+        logger.info(f"[삭제 확인] {spec.table}: MySQL 행 {len(keys)}개 기준, 벡터 {deleted}개 삭제")
+        return deleted
+
+    # ------------------------------------------
+    # binlog
+    # ------------------------------------------
+
+    def sync_keys(self, connection, spec: TableSpec, keys: Set[Any]) -> bool:
+        """binlog에서 모은 기본 키: 지금 있는 행은 다시 반영, 없는 행은 삭제"""
+        keys_list = sorted(keys, key=str)
+        batch_rows = self.config["batch_rows"]
+        for i in range(0, len(keys_list), batch_rows):
+            batch = keys_list[i:i + batch_rows]
+            rows = mysql_source.fetch_rows(connection, mysql_source.TableQuery(
+                key=spec.key, table=spec.table, columns=spec.columns,
+                where=f"{mysql_source.quote_identifier(spec.primary_key)} IN ({', '.join(['%s'] * len(batch))})",
+                params=batch
+            ))
+            found = {str(row[spec.primary_key]) for row in rows}
+            deleted = [key for key in batch if str(key) not in found]
+            if not self.sync_rows(spec, rows, deleted_keys=deleted):
+                return False
+        return True
+
+    def run_binlog(self, connection) -> int:
+        touched, position = self.binlog_reader.read(self.specs, self.state.binlog)
+        total = 0
+        for spec in self.specs:
+            if touched[spec.key] and not self.sync_keys(connection, spec, touched[spec.key]):
+                logger.error(f"[오류] {spec.table} 반영 실패 - 다음 주기에 같은 binlog 위치부터 다시 읽습니다.")
+                return total
+            total += len(touched[spec.key])
+        self.state.binlog = position
+        self.state.save()
+        return total
+
+    # ------------------------------------------
+    # 실행
+    # ------------------------------------------
+
+    def run_once(self, stop: Optional[threading.Event] = None) -> int:
+        """한 주기: 바뀐 행 반영 (+ 워터마크 방식이면 주기마다 삭제 확인)"""
+        stop = stop or threading.Event()
+        started = time.perf_counter()
+        connection = mysql_source.connect(self.db_config)
+        total = 0
+        try:
+            # 워터마크로 기존 행을 따라잡은 뒤에는 binlog만 읽음
+            for spec in self.specs:
+                caught_up = self.state.table(spec.key).get("caught_up")
+                if self.binlog_reader and caught_up:
+                    continue
+                total += self.poll_table(connection, spec, stop)
+                if self.binlog_reader and not stop.is_set():
+                    self.state.table(spec.key)["caught_up"] = True
+                    self.state.save()
+            if self.binlog_reader and not stop.is_set():
+                total += self.run_binlog(connection)
+            elif not self.binlog_reader:
+                for spec in self.specs:
+                    reconciled_at = self.state.table(spec.key).get("reconciled_at", 0)
+                    if not stop.is_set() and time.time() - reconciled_at >= self.config["reconcile_minutes"] * 60:
+                        self.reconcile_deletes(connection, spec)
+        finally:
+            connection.close()
+        if total:
+            logger.info(f"[완료] 변경 행 {total}개 반영 ({time.perf_counter() - started:.1f}초)")
+        return total
+
+    def run_forever(self, stop: threading.Event):
+        interval = self.config["interval_seconds"]
+        logger.info(f"[시작] 변경 동기화 시작 ({interval}초마다)")
+        while not stop.is_set():
+            try:
+                self.run_once(stop)
+            except Exception as e:
+                # DB/네트워크 오류는 다음 주기에 다시 시도 (워터마크는 성공한 배치까지만 저장됨)
+                logger.error(f"[오류] 변경 동기화 실패: {str(e)}")
+            stop.wait(interval)
+        logger.info("[완료] 변경 동기화 종료")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="MySQL → 벡터 인덱스 변경 동기화")
+    parser.add_argument("--once", action="store_true", help="한 주기만 실행")
+    parser.add_argument("--from-now", action="store_true",
+                        help="첫 실행 시 기존 행은 건너뛰고 지금 이후 변경만 반영")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="삭제 확인을 지금 실행 (워터마크 방식)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=LOGGING_CONFIG["level"],
+        format=LOGGING_CONFIG["format"],
+        handlers=[
+            logging.FileHandler(LOGGING_CONFIG["file"]),
+            logging.StreamHandler()
+        ]
+    )
+
+    loader_module = importlib.import_module("1_mysql_data_loader")
+    generator_module = importlib.import_module("2_embedding_generator")
+    try:
+        loader = loader_module.MySQLDataLoader()
+    except ValueError as e:
+        logger.error(f"[오류] {str(e)}")
+        return
+
+    sync = CDCSync(generator_module.EmbeddingGenerator(), loader)
+    sync.prepare(from_now=args.from_now)
+    if not sync.specs:
+        logger.error("[오류] 동기화할 테이블이 없습니다 (CDC_CONFIG['tables'] 확인).")
+        return
+
+    if args.reconcile:
+        for spec in sync.specs:
+            sync.state.table(spec.key)["reconciled_at"] = 0
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    if args.once:
+        sync.run_once(stop)
+    else:
+        sync.run_forever(stop)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+청크 분할 - 임베딩 모델 토큰 기준 + 출처별 분할 방식
+작성일: 2025-12-08
+
+주요 기능:
+- 청크 크기/겹침을 글자 수가 아니라 임베딩 모델 토큰 수로 계산 (embedding_pipeline.get_token_counter)
+- 출처별 분할 방식
+  - "row": 표 데이터(MySQL/JSON/Excel/CSV 행)는 행 하나 = 청크 하나 (너무 길 때만 나눔)
+  - "document": 문서(PDF/Word/OCR)는 제목과 문단 경계를 따라 나누고, 청크에 소속 제목(section) 기록
+- 문단이 너무 길면 줄 → 문장 → 단어 → 글자 순으로 더 잘게 나눔
+
+분할 방식은 메타데이터의 source_type / _source_type / source 값으로 고릅니다
+(config.CHUNKING_CONFIG["source_strategies"]).
+
+벤치마크: python benchmarks/bench_chunking.py --mb 100
+"""
+
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+ROW = "row"
+DOCUMENT = "document"
+STRATEGIES = (ROW, DOCUMENT)
+
+# 제목으로 볼 줄 (짧은 줄만): 마크다운 제목, "제1장", "1.2 개요", "■ 배송 안내", "[공지]"
+_HEADING = re.compile(
+    r"^\s*(?:#{1,6}\s+\S"
+    r"|제\s*\d+\s*[편장절조항]"
+    r"|\d+(?:\.\d+)*\.?\s+\S"
+    r"|[■□▶▣◆◇●○※]\s*\S"
+    r"|\[[^\]]{1,40}\]\s*$)"
+)
+_HEADING_MAX_CHARS = 80
+
+# 문단보다 잘게 나눌 때의 경계 (줄 → 문장 → 단어), 다시 합칠 때 쓰는 구분자
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+")
+_FINER_SPLITS: List[Tuple[Callable[[str], List[str]], str]] = [
+    (lambda text: text.split("\n"), "\n"),
+    (lambda text: _SENTENCE_END.split(text), " "),
+    (lambda text: text.split(" "), " "),
+]
+
+# (조각, 토큰 수, 앞 조각과 이을 때 구분자)
+Piece = Tuple[str, int, str]
+
+
+def is_heading(line: str) -> bool:
+    stripped = line.strip()
+    return bool(stripped) and len(stripped) <= _HEADING_MAX_CHARS and bool(_HEADING.match(stripped))
+
+
+def iter_blocks(text: str) -> Iterator[Tuple[Optional[str], str]]:
+    """
+    문서를 (소속 제목, 문단) 단위로 반환
+
+    빈 줄에서 문단이 끝나고, 제목 줄은 새 구역을 시작합니다 (제목 줄도 문단으로 포함).
+    """
+    section: Optional[str] = None
+    lines: List[str] = []
+    for line in text.splitlines():
+        if is_heading(line):
+            if lines:
+                yield section, "\n".join(lines)
+                lines = []
+            section = line.strip().lstrip("#").strip()
+            lines.append(line.strip())
+        elif not line.strip():
+            if lines:
+                yield section, "\n".join(lines)
+                lines = []
+        else:
+            lines.append(line.rstrip())
+    if lines:
+        yield section, "\n".join(lines)
+
+
+class TokenChunker:
+    """
+    Document → 청크 목록
+
+    Args:
+        count_tokens: 토큰 수 계산 함수 (embedding_pipeline.get_token_counter)
+        chunk_tokens: 청크 최대 토큰 수
+        overlap_tokens: 같은 구역 안에서 앞 청크 끝부분을 다음 청크 앞에 다시 넣을 토큰 수
+        row_max_tokens: row 방식에서 이보다 긴 행만 document 방식으로 나눔
+        source_strategies: 출처 → 분할 방식 ("row" / "document")
+        default_strategy: 출처 설정이 없을 때 분할 방식
+    """
+
+    def __init__(self, count_tokens: Callable[[str], int], chunk_tokens: int = 512,
+                 overlap_tokens: int = 50, row_max_tokens: int = 2000,
+                 source_strategies: Optional[Dict[str, str]] = None,
+                 default_strategy: str = DOCUMENT):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError("overlap_tokens는 chunk_tokens보다 작아야 합니다.")
+        for strategy in list((source_strategies or {}).values()) + [default_strategy]:
+            if strategy not in STRATEGIES:
+                raise ValueError(f"알 수 없는 분할 방식: {strategy} ({', '.join(STRATEGIES)})")
+        self.count_tokens = count_tokens
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.row_max_tokens = row_max_tokens
+        self.source_strategies = source_strategies or {}
+        self.default_strategy = default_strategy
+        self._separator_tokens: Dict[str, int] = {}
+
+    def strategy_for(self, metadata: Dict) -> str:
+        for key in ("source_type", "_source_type", "source"):
+            strategy = self.source_strategies.get(str(metadata.get(key)))
+            if strategy:
+                return strategy
+        return self.default_strategy
+
+    # ------------------------------------------
+    # 잘게 나누기
+    # ------------------------------------------
+
+    def _hard_split(self, text: str) -> List[str]:
+        """경계 없이 긴 텍스트: 토큰 한도에 맞는 가장 긴 앞부분을 이진 탐색으로 잘라냄"""
+        pieces = []
+        while text:
+            low, high = 1, len(text)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if self.count_tokens(text[:middle]) <= self.chunk_tokens:
+                    low = middle
+                else:
+                    high = middle - 1
+            pieces.append(text[:low])
+            text = text[low:]
+        return pieces
+
+    def _pieces(self, text: str, separator: str, level: int = 0) -> List[Piece]:
+        """text를 조각 목록으로 - 조각마다 chunk_tokens 이하, 첫 조각 구분자는 separator"""
+        tokens = self.count_tokens(text)
+        if tokens <= self.chunk_tokens:
+            return [(text, tokens, separator)]
+        if level >= len(_FINER_SPLITS):
+            parts = self._hard_split(text)
+            return [(part, self.count_tokens(part), separator if i == 0 else "")
+                    for i, part in enumerate(parts)]
+
+        split, joiner = _FINER_SPLITS[level]
+        pieces: List[Piece] = []
+        for part in split(text):
+            if part.strip():
+                pieces.extend(self._pieces(part, joiner if pieces else separator, level + 1))
+        return pieces
+
+    # ------------------------------------------
+    # 묶기
+    # ------------------------------------------
+
+    def _joined_tokens(self, piece: Piece) -> int:
+        """조각을 앞 조각 뒤에 이을 때 늘어나는 토큰 수 (구분자 포함)"""
+        separator = piece[2]
+        if separator not in self._separator_tokens:
+            self._separator_tokens[separator] = self.count_tokens(separator) if separator else 0
+        return piece[1] + self._separator_tokens[separator]
+
+    def split_text(self, text: str) -> List[Tuple[Optional[str], str]]:
+        """document 방식: (소속 제목, 청크 텍스트) 목록"""
+        chunks: List[Tuple[Optional[str], str]] = []
+        current: List[Piece] = []
+        current_tokens = 0
+        current_section: Optional[str] = None
+        # 제목에서 구역이 바뀌어도 청크가 이보다 작으면 다음 구역과 합침
+        min_tokens = self.chunk_tokens // 4
+
+        def flush(keep_overlap: bool):
+            nonlocal current, current_tokens
+            if not current:
+                return
+            chunks.append((current_section, "".join(
+                (separator if i else "") + piece for i, (piece, _, separator) in enumerate(current)
+            )))
+            tail: List[Piece] = []
+            tail_tokens = 0
+            if keep_overlap and self.overlap_tokens:
+                for piece in reversed(current):
+                    if tail_tokens + self._joined_tokens(piece) > self.overlap_tokens:
+                        break
+                    tail.insert(0, piece)
+                    tail_tokens += self._joined_tokens(piece)
+            # 겹치는 부분의 첫 조각은 청크 맨 앞이라 구분자가 붙지 않음
+            if tail:
+                tail_tokens -= self._joined_tokens(tail[0]) - tail[0][1]
+            current, current_tokens = tail, tail_tokens
+
+        for section, block in iter_blocks(text):
+            if section != current_section:
+                if current_tokens >= min_tokens:
+                    flush(keep_overlap=False)
+                if not current:
+                    current_section = section
+            for piece in self._pieces(block, "\n\n"):
+                if current and current_tokens + self._joined_tokens(piece) > self.chunk_tokens:
+                    flush(keep_overlap=True)
+                    if current and current_tokens + self._joined_tokens(piece) > self.chunk_tokens:
+                        current, current_tokens = [], 0
+                current_tokens += self._joined_tokens(piece) if current else piece[1]
+                current.append(piece)
+        flush(keep_overlap=False)
+        return chunks
+
+    def split(self, doc: Document) -> List[Document]:
+        strategy = self.strategy_for(doc.metadata)
+        # 토큰 수는 UTF-8 바이트 수를 넘지 않으므로 짧은 행은 토큰을 세지 않음
+        if strategy == ROW and (len(doc.page_content.encode("utf-8")) <= self.row_max_tokens
+                                or self.count_tokens(doc.page_content) <= self.row_max_tokens):
+            return [Document(page_content=doc.page_content, metadata=dict(doc.metadata))]
+
+        chunks = []
+        for section, text in self.split_text(doc.page_content):
+            metadata = dict(doc.metadata)
+            if section:
+                metadata["section"] = section
+            chunks.append(Document(page_content=text, metadata=metadata))
+        return chunks
+
+    def iter_chunks(self, documents: Iterable[Document]) -> Iterator[Document]:
+        for doc in documents:
+            yield from self.split(doc)
@@ -0,0 +1,123 @@
+"""
+컬럼 기반 행 저장소 - DatabaseHelper.data_cache 메모리 절감용
+작성일: 2025-11-25
+
+주요 기능:
+- 행(dict) 대신 컬럼별 리스트로 저장
+- class_name, status 등 반복 값은 하나의 문자열 객체만 공유 (intern)
+- CompactRow는 dict처럼 동작 (get, [], keys, items 등)
+  → format_child_info / format_activity_photo_info 등 기존 코드 그대로 사용 가능
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# 값 종류가 적어서 공유하면 효과가 큰 컬럼
+DEFAULT_INTERN_COLUMNS = ("class_name", "status", "gender", "type", "category", "child_id")
+
+# 행에 해당 컬럼이 없음을 나타내는 표시 (None 값과 구분)
+_MISSING = object()
+
+
+class CompactRow(Mapping):
+    """CompactTable의 한 행을 dict처럼 보여주는 읽기 전용 뷰"""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "CompactTable", index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        column = self._table._columns.get(key)
+        if column is None:
+            raise KeyError(key)
+        value = column[self._index]
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        column = self._table._columns.get(key)
+        if column is None:
+            return default
+        value = column[self._index]
+        return default if value is _MISSING else value
+
+    def __iter__(self) -> Iterator[str]:
+        index = self._index
+        for name, column in self._table._columns.items():
+            if column[index] is not _MISSING:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"CompactRow({dict(self)!r})"
+
+
+class CompactTable:
+    """
+    컬럼 배열로 행을 저장하는 테이블
+
+    list처럼 len(), 인덱싱, 반복을 지원하며 원소는 CompactRow입니다.
+    """
+
+    def __init__(self, rows: Optional[Iterable[Dict[str, Any]]] = None,
+                 intern_columns: Iterable[str] = DEFAULT_INTERN_COLUMNS):
+        self._columns: Dict[str, List[Any]] = {}
+        self._intern_columns = set(intern_columns)
+        self._interned: Dict[str, Dict[Any, Any]] = {}
+        self._length = 0
+
+        if rows is not None:
+            self.extend(rows)
+
+    def append(self, row: Dict[str, Any]):
+        """행 추가 (처음 보는 컬럼은 기존 행을 빈 값으로 채워서 추가)"""
+        for name in row:
+            if name not in self._columns:
+                self._columns[name] = [_MISSING] * self._length
+
+        for name, column in self._columns.items():
+            value = row.get(name, _MISSING)
+            if name in self._intern_columns and value is not _MISSING:
+                pool = self._interned.setdefault(name, {})
+                try:
+                    value = pool.setdefault(value, value)
+                except TypeError:
+                    pass  # dict/list 등 해시 불가능한 값은 그대로 저장
+            column.append(value)
+
+        self._length += 1
+
+    def extend(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.append(row)
+
+    def column(self, name: str) -> List[Any]:
+        """컬럼 값 리스트 (없는 값은 None)"""
+        column = self._columns.get(name)
+        if column is None:
+            return [None] * self._length
+        return [None if value is _MISSING else value for value in column]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [CompactRow(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("CompactTable index out of range")
+        return CompactRow(self, index)
+
+    def __iter__(self) -> Iterator[CompactRow]:
+        for i in range(self._length):
+            yield CompactRow(self, i)
+
+    def __repr__(self) -> str:
+        return f"CompactTable(rows={self._length}, columns={list(self._columns)})"
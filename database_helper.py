@@ -8,25 +8,29 @@
 - RAG와 결합하여 하이브리드 검색
 """
 
-import json
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+from compact_rows import CompactTable, DEFAULT_INTERN_COLUMNS
+from record_io import iter_records, resolve_data_path
+
 logger = logging.getLogger(__name__)
 
 
 class DatabaseHelper:
     """MySQL 데이터베이스 실시간 조회 헬퍼"""
     
-    def __init__(self, json_files_config: Dict[str, Any]):
+    def __init__(self, json_files_config: Dict[str, Any], compact: bool = False):
         """
         초기화 (JSON 파일 기반)
         
         Args:
             json_files_config: config.py의 DATA_EXTRACTION_CONFIG
+            compact: True면 행을 dict 대신 컬럼 배열(CompactTable)로 저장
         """
         self.config = json_files_config
+        self.compact = compact
         self.data_cache = {}
         self.load_data()
     
@@ -38,15 +42,15 @@ class DatabaseHelper:
                 if not json_file:
                     continue
                 
-                with open(json_file, "r", encoding="utf-8") as f:
-                    json_data = json.load(f)
-                
-                # phpMyAdmin JSON 형식 파싱
-                data = []
-                for item in json_data:
-                    if item.get("type") == "table" and "data" in item:
-                        data = item["data"]
-                        break
+                # phpMyAdmin JSON / JSON Lines / Parquet (형식 자동 감지, 행 단위로 읽음)
+                rows = iter_records(resolve_data_path(json_file), table_rows_only=True)
+                if self.compact:
+                    data = CompactTable(
+                        rows,
+                        intern_columns=table_config.get("intern_columns", DEFAULT_INTERN_COLUMNS)
+                    )
+                else:
+                    data = list(rows)
                 
                 self.data_cache[table_key] = data
                 logger.info(f"[완료] {table_key} 테이블 로드: {len(data)}개 행")
@@ -109,6 +113,52 @@ class DatabaseHelper:
         """모든 아이 목록 조회"""
         return self.data_cache.get("children", [])
     
+    def _slice_page(self, rows: List[Dict[str, Any]], cursor: int,
+                    limit: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """메모리 데이터를 커서(오프셋) 기준으로 잘라서 반환"""
+        cursor = max(int(cursor or 0), 0)
+        page = rows[cursor:cursor + limit]
+        next_cursor = cursor + limit if cursor + limit < len(rows) else None
+        return page, next_cursor
+    
+    def get_children_page(self, cursor: int = 0,
+                          limit: int = 20) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        아이 목록 페이지 조회
+        
+        Args:
+            cursor: 이전 페이지에서 받은 커서 (처음이면 0)
+            limit: 페이지 크기
+            
+        Returns:
+            (페이지 행 리스트, 다음 커서 또는 None)
+        """
+        return self._slice_page(self.data_cache.get("children", []), cursor, limit)
+    
+    def get_products_page(self, cursor: int = 0, limit: int = 20,
+                          status: Optional[str] = "판매중") -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """제품 목록 페이지 조회 (반환 형식은 get_children_page와 동일)"""
+        products = self.data_cache.get("products", [])
+        if status:
+            products = [p for p in products if p.get("status") == status]
+        return self._slice_page(products, cursor, limit)
+    
+    def summarize_children(self) -> Dict[str, int]:
+        """반별 아이 수 집계"""
+        counts: Dict[str, int] = {}
+        for child in self.data_cache.get("children", []):
+            key = str(child.get("class_name") or "미지정")
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+    
+    def summarize_products(self) -> Dict[str, int]:
+        """상태별 제품 수 집계"""
+        counts: Dict[str, int] = {}
+        for product in self.data_cache.get("products", []):
+            key = str(product.get("status") or "미지정")
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+    
     def search_activity_photos(self, title: Optional[str] = None,
                                child_id: Optional[int] = None,
                                limit: int = 10) -> List[Dict[str, Any]]:
@@ -186,6 +236,19 @@ class DatabaseHelper:
 업로드 날짜: {photo.get('upload_date', '알 수 없음')}
 """.strip()
     
+    def get_entity_names(self) -> Dict[str, List[str]]:
+        """엔티티 사전(entity_gazetteer)용 제품명/아이 이름 목록"""
+        return {
+            "product": [
+                str(p.get("name")) for p in self.data_cache.get("products", [])
+                if p.get("name") and p.get("status") == "판매중"
+            ],
+            "child": [
+                str(c.get("name")) for c in self.data_cache.get("children", [])
+                if c.get("name")
+            ]
+        }
+    
     def get_statistics(self) -> Dict[str, Any]:
         """데이터베이스 통계"""
         return {
@@ -294,6 +357,94 @@ class MySQLDatabaseHelper(DatabaseHelper):
         """모든 아이 목록 조회"""
         return self.search_children()
     
+    def get_entity_names(self) -> Dict[str, List[str]]:
+        """MySQL에서 엔티티 사전용 이름 목록 조회 (search_products 기본 조건과 동일하게 판매중만)"""
+        names: Dict[str, List[str]] = {"product": [], "child": []}
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT name FROM products WHERE status = %s", ["판매중"])
+            names["product"] = [str(row["name"]) for row in cursor.fetchall() if row["name"]]
+            
+            cursor.execute("SELECT DISTINCT name FROM children")
+            names["child"] = [str(row["name"]) for row in cursor.fetchall() if row["name"]]
+        
+        logger.info(f"[완료] 엔티티 이름 조회: 제품 {len(names['product'])}개, 아이 {len(names['child'])}명")
+        return names
+    
+    def _fetch_page(self, query: str, params: List[Any],
+                    limit: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        id 기준 키셋 페이지네이션 실행
+        
+        limit + 1개를 조회해서 다음 페이지 존재 여부를 판단하고,
+        다음 커서로 마지막 행의 id를 돌려줍니다.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute(query, params + [limit + 1])
+            rows = list(cursor.fetchall())
+        
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, int(rows[-1]["id"])
+        return rows, None
+    
+    def get_children_page(self, cursor: int = 0,
+                          limit: int = 20) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """MySQL에서 아이 목록 페이지 조회 (필요한 컬럼만)"""
+        try:
+            rows, next_cursor = self._fetch_page(
+                "SELECT id, name, class_name FROM children "
+                "WHERE id > %s ORDER BY id LIMIT %s",
+                [int(cursor or 0)],
+                limit
+            )
+            logger.info(f"[검색] MySQL 아이 목록 페이지 조회: {len(rows)}개 결과")
+            return rows, next_cursor
+        except Exception as e:
+            logger.error(f"[오류] MySQL 아이 목록 조회 실패: {str(e)}")
+            return [], None
+    
+    def get_products_page(self, cursor: int = 0, limit: int = 20,
+                          status: Optional[str] = "판매중") -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """MySQL에서 제품 목록 페이지 조회 (필요한 컬럼만)"""
+        try:
+            query = "SELECT id, name, price, stock_quantity FROM products WHERE id > %s"
+            params: List[Any] = [int(cursor or 0)]
+            if status:
+                query += " AND status = %s"
+                params.append(status)
+            query += " ORDER BY id LIMIT %s"
+            
+            rows, next_cursor = self._fetch_page(query, params, limit)
+            logger.info(f"[검색] MySQL 제품 목록 페이지 조회: {len(rows)}개 결과")
+            return rows, next_cursor
+        except Exception as e:
+            logger.error(f"[오류] MySQL 제품 목록 조회 실패: {str(e)}")
+            return [], None
+    
+    def _count_by(self, table: str, column: str) -> Dict[str, int]:
+        """GROUP BY 집계 (table/column은 코드 내부 상수만 사용)"""
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {column} AS label, COUNT(*) AS count "
+                    f"FROM {table} GROUP BY {column} ORDER BY count DESC"
+                )
+                return {
+                    str(row["label"] or "미지정"): int(row["count"])
+                    for row in cursor.fetchall()
+                }
+        except Exception as e:
+            logger.error(f"[오류] MySQL 집계 실패 ({table}.{column}): {str(e)}")
+            return {}
+    
+    def summarize_children(self) -> Dict[str, int]:
+        """반별 아이 수 집계"""
+        return self._count_by("children", "class_name")
+    
+    def summarize_products(self) -> Dict[str, int]:
+        """상태별 제품 수 집계"""
+        return self._count_by("products", "status")
+    
     def format_product_info(self, product: Dict[str, Any]) -> str:
         """제품 정보를 보기 좋게 포맷팅"""
         info = f"🛒 제품명: {product.get('name', 'N/A')}\n"
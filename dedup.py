@@ -0,0 +1,291 @@
+"""
+중복 문서 제거 - MinHash/LSH 유사 중복 묶기 + 출처 병합
+작성일: 2025-12-09
+
+주요 기능:
+- 같은 상품 설명이 MySQL 내보내기 / Excel / PDF 카탈로그에 함께 있으면 하나만 임베딩
+- 정규화한 텍스트의 글자 n-gram으로 MinHash 서명 생성, LSH 밴드로 후보를 찾고 서명 일치율로 확인
+- 묶음마다 대표 문서 하나만 남기고, 나머지 출처는 대표 문서 metadata["provenance"]에 병합
+- 절약한 임베딩 수 / 저장 행 수 / 토큰 수 보고서
+
+두 번 읽기 방식 (원본 텍스트를 메모리에 모아 두지 않음):
+    1. plan(): 문서를 한 번 읽으면서 서명만 저장 → 묶음과 대표 결정
+    2. DedupPlan.apply(): 같은 문서를 다시 읽으면서 대표만 내보냄
+
+미리 보기 (임베딩 없이 보고서만):
+    python dedup.py extracted_data.json
+"""
+
+import json
+import logging
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# MinHash 순열용 메르센 소수 (2^61 - 1)
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 출처 병합에 남길 메타데이터 키
+PROVENANCE_FIELDS = ("source", "id", "_source_type", "_source_file", "page", "_sheet", "_row")
+
+# 줄 앞의 "컬럼명: " (행마다 컬럼 이름이 달라도 같은 내용이면 중복으로 보기 위해 제거)
+_FIELD_LABEL = re.compile(r"^[^\S\n]*[\w가-힣 ]{1,30}:[^\S\n]*", re.MULTILINE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("중복 제거에는 numpy가 필요합니다. pip install numpy")
+    return numpy
+
+
+def normalize(text: str) -> str:
+    """비교용 정규화: 유니코드 NFKC, 소문자, 컬럼명 제거, 공백 통일"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _FIELD_LABEL.sub("", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (밴드 수, 밴드당 행 수) - 후보가 되는 유사도 (1/b)^(1/r)가 threshold 이하인 조합 중 가장 높은 것
+
+    후보는 서명 일치율로 다시 확인하므로, 놓치지 않도록 threshold보다 낮은 쪽을 고릅니다.
+    """
+    best = (1, num_perm, 0.0)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        candidate_threshold = (1 / bands) ** (1 / rows)
+        if best[2] < candidate_threshold <= threshold:
+            best = (bands, rows, candidate_threshold)
+    return best[0], best[1]
+
+
+class MinHasher:
+    """글자 n-gram MinHash 서명 (num_perm개 uint32)"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        np = _require_numpy()
+        self.np = np
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        size = self.shingle_size
+        if len(text) <= size:
+            return {text}
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def signature(self, normalized_text: str):
+        np = self.np
+        shingles = self.shingles(normalized_text)
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        # (a * h + b) mod p (uint64 곱셈 넘침은 무시 - 해시 함수로만 사용)
+        values = (np.outer(hashes, self.a) + self.b) % np.uint64(_MERSENNE_PRIME)
+        return (values & np.uint64(_MAX_HASH)).min(axis=0).astype(np.uint32)
+
+
+def _provenance(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: metadata[key] for key in PROVENANCE_FIELDS if metadata.get(key) not in (None, "")}
+
+
+@dataclass
+class DedupReport:
+    documents_in: int = 0
+    documents_out: int = 0
+    hashed: int = 0                 # 비교 대상 문서 수 (min_chars 이상)
+    clusters: int = 0               # 문서가 2개 이상인 묶음 수
+    duplicates_removed: int = 0
+    chunks_saved: int = 0           # 임베딩하지 않은 청크 수 = 절약한 임베딩 / 저장 행 수
+    tokens_saved: int = 0
+    removed_by_source: Counter = field(default_factory=Counter)
+    largest_clusters: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "documents_in": self.documents_in,
+            "documents_out": self.documents_out,
+            "compared": self.hashed,
+            "clusters": self.clusters,
+            "duplicates_removed": self.duplicates_removed,
+            "embeddings_saved": self.chunks_saved,
+            "stored_rows_saved": self.chunks_saved,
+            "tokens_saved": self.tokens_saved,
+            "removed_by_source": dict(self.removed_by_source),
+            "largest_clusters": self.largest_clusters,
+        }
+
+
+class DedupPlan:
+    """plan() 결과: 문서 위치 → 대표 여부 / 병합할 출처"""
+
+    def __init__(self, representatives: Dict[int, List[Dict[str, Any]]], dropped: Set[int],
+                 report: DedupReport):
+        self.representatives = representatives  # 대표 위치 → 묶음 전체 출처 (대표 먼저)
+        self.dropped = dropped
+        self.report = report
+
+    def apply(self, documents: Iterable[Document],
+              count_chunks: Optional[Callable[[Document], int]] = None,
+              count_tokens: Optional[Callable[[str], int]] = None) -> Iterator[Document]:
+        """
+        plan()과 같은 순서의 문서를 다시 읽으면서 대표만 반환
+
+        Args:
+            documents: plan()에 넘긴 것과 같은 문서 (같은 순서)
+            count_chunks: 제거한 문서의 청크 수 계산 (절약한 임베딩/저장 행 보고용)
+            count_tokens: 제거한 문서의 토큰 수 계산 (절약한 토큰 보고용)
+        """
+        report = self.report
+        report.documents_out = report.chunks_saved = report.tokens_saved = 0
+        report.removed_by_source = Counter()
+        for position, doc in enumerate(documents):
+            if position in self.dropped:
+                report.removed_by_source[str(doc.metadata.get("_source_type") or
+                                             doc.metadata.get("source", "unknown"))] += 1
+                report.chunks_saved += count_chunks(doc) if count_chunks else 1
+                if count_tokens:
+                    report.tokens_saved += count_tokens(doc.page_content)
+                continue
+            provenance = self.representatives.get(position)
+            if provenance:
+                doc.metadata["provenance"] = provenance
+                doc.metadata["duplicate_count"] = len(provenance) - 1
+            report.documents_out += 1
+            yield doc
+
+
+class Deduplicator:
+    """
+    유사 중복 문서 묶기
+
+    Args:
+        threshold: 같은 묶음으로 볼 추정 Jaccard 유사도 (글자 n-gram 기준)
+        num_perm: MinHash 서명 길이
+        shingle_size: 글자 n-gram 크기
+        min_chars: 정규화 후 이보다 짧은 문서는 비교하지 않음 (짧은 행끼리 잘못 묶이는 것 방지)
+        prefer_sources: 대표로 남길 출처 우선순위 (_source_type 또는 source, 앞쪽 우선)
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, shingle_size: int = 5,
+                 min_chars: int = 30, prefer_sources: Sequence[str] = ()):
+        self.threshold = threshold
+        self.min_chars = min_chars
+        self.prefer_sources = list(prefer_sources)
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+
+    def _priority(self, provenance: Dict[str, Any]) -> int:
+        for key in ("_source_type", "source"):
+            value = provenance.get(key)
+            if value in self.prefer_sources:
+                return self.prefer_sources.index(value)
+        return len(self.prefer_sources)
+
+    def plan(self, documents: Iterable[Document]) -> DedupPlan:
+        np = self.hasher.np
+        report = DedupReport()
+        signatures: Dict[int, Any] = {}
+        provenances: Dict[int, Dict[str, Any]] = {}
+        buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        parent: Dict[int, int] = {}
+
+        def find(position: int) -> int:
+            while parent[position] != position:
+                parent[position] = parent[parent[position]]
+                position = parent[position]
+            return position
+
+        for position, doc in enumerate(documents):
+            report.documents_in += 1
+            text = normalize(doc.page_content)
+            if len(text) < self.min_chars:
+                continue
+            report.hashed += 1
+            signature = self.hasher.signature(text)
+            signatures[position] = signature
+            provenances[position] = _provenance(doc.metadata)
+            parent[position] = position
+
+            candidates: Set[int] = set()
+            for band, bucket in enumerate(buckets):
+                key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                members = bucket.setdefault(key, [])
+                candidates.update(members)
+                members.append(position)
+
+            for other in candidates:
+                if find(other) == find(position):
+                    continue
+                if float(np.mean(signatures[other] == signature)) >= self.threshold:
+                    parent[find(position)] = find(other)
+
+        clusters: Dict[int, List[int]] = {}
+        for position in parent:
+            clusters.setdefault(find(position), []).append(position)
+
+        representatives: Dict[int, List[Dict[str, Any]]] = {}
+        dropped: Set[int] = set()
+        for members in clusters.values():
+            if len(members) < 2:
+                continue
+            members.sort(key=lambda member: (self._priority(provenances[member]), member))
+            representative = members[0]
+            representatives[representative] = [provenances[member] for member in members]
+            dropped.update(members[1:])
+
+        report.clusters = len(representatives)
+        report.duplicates_removed = len(dropped)
+        report.largest_clusters = [
+            {"size": len(provenance), "provenance": provenance[:10]}
+            for provenance in sorted(representatives.values(), key=len, reverse=True)[:10]
+        ]
+        logger.info(f"[중복] 문서 {report.documents_in}개 중 {report.hashed}개 비교 → "
+                    f"묶음 {report.clusters}개, 중복 {report.duplicates_removed}개 제거 예정 "
+                    f"(밴드 {self.bands} x {self.rows})")
+        return DedupPlan(representatives, dropped, report)
+
+
+def main():
+    import argparse
+
+    from embedding_pipeline import get_token_counter
+    from record_io import iter_records, resolve_data_path
+
+    parser = argparse.ArgumentParser(
+        description="중복 문서 미리 보기 (임베딩 없이 보고서만, 절약한 임베딩은 문서 1개 = 청크 1개로 계산)"
+    )
+    parser.add_argument("input", help="1단계 결과 파일 (.json / .jsonl / .parquet)")
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--min-chars", type=int, default=30)
+    args = parser.parse_args()
+
+    def documents() -> Iterator[Document]:
+        for item in iter_records(resolve_data_path(args.input)):
+            yield Document(page_content=item["page_content"], metadata=item["metadata"])
+
+    deduplicator = Deduplicator(threshold=args.threshold, min_chars=args.min_chars)
+    plan = deduplicator.plan(documents())
+    for _ in plan.apply(documents(), count_tokens=get_token_counter("text-embedding-3-small")):
+        pass
+    print(json.dumps(plan.report.to_dict(), ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
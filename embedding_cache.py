@@ -0,0 +1,288 @@
+"""
+로컬 임베딩 캐시 (SQLite)
+작성일: 2025-12-01
+
+주요 기능:
+- 임베딩 모델 + 차원 + 텍스트 해시를 키로 float32 벡터 저장
+- OpenAIEmbeddings를 감싸서 캐시에 있는 텍스트는 API 호출 없이 반환
+- offline 모드: 캐시에 없으면 오류 (네트워크 없이 인덱스 재구성)
+- 전체 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (상한의 90%까지)
+
+사용법:
+    python embedding_cache.py stats
+    python embedding_cache.py evict --max-mb 500
+    python embedding_cache.py clear
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    dimension INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used_idx ON embeddings (last_used);
+"""
+
+# SQLite 변수 개수 제한 때문에 IN 조회를 나눠서 실행
+_QUERY_CHUNK = 500
+
+# 상한을 넘으면 상한의 이 비율까지 줄임 (가득 찬 뒤 쓸 때마다 전체 조회하지 않도록)
+_EVICT_TARGET = 0.9
+
+
+class CacheMissError(RuntimeError):
+    """offline 모드에서 캐시에 없는 텍스트를 요청한 경우 (재시도해도 같은 결과)"""
+
+    retryable = False
+
+
+def cache_key(model: str, dimension: int, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{dimension}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _to_blob(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _from_blob(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """SQLite 파일 하나에 저장하는 임베딩 캐시 (여러 스레드에서 사용 가능)"""
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # 벡터 총 크기 추정값 (처음 쓸 때 한 번만 전체 합계로 초기화, 이후 쓴 만큼 더함)
+        # INSERT OR REPLACE / 다른 프로세스 쓰기로 어긋날 수 있어 evict에서 다시 정확히 계산
+        self._approx_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get_many(self, model: str, dimension: int, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """텍스트별 벡터 (없으면 None)"""
+        keys = [cache_key(model, dimension, text) for text in texts]
+        found: Dict[str, bytes] = {}
+        now = time.time()
+
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for i in range(0, len(unique_keys), _QUERY_CHUNK):
+                chunk = unique_keys[i:i + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        [now] + [row[0] for row in rows]
+                    )
+            self._conn.commit()
+
+        result = [_from_blob(found[key]) if key in found else None for key in keys]
+        hit_count = sum(1 for vector in result if vector is not None)
+        self.hits += hit_count
+        self.misses += len(result) - hit_count
+        return result
+
+    def put_many(self, model: str, dimension: int, texts: Sequence[str],
+                 vectors: Sequence[Sequence[float]]):
+        now = time.time()
+        rows = [
+            (cache_key(model, dimension, text), model, dimension, _to_blob(vector), now, now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dimension, vector, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+        if not self.max_bytes:
+            return
+        added = sum(len(row[3]) for row in rows)
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._sum_bytes()
+            else:
+                self._approx_bytes += added
+            over = self._approx_bytes > self.max_bytes
+        if over:
+            self.evict(int(self.max_bytes * _EVICT_TARGET))
+
+    def _sum_bytes(self) -> int:
+        """벡터 총 크기 (전체 테이블 조회 - 잠금 안에서 호출)"""
+        row = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()
+        return int(row[0])
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._sum_bytes()
+
+    def evict(self, max_bytes: int) -> int:
+        """벡터 총 크기가 max_bytes 이하가 될 때까지 오래 사용하지 않은 항목 삭제"""
+        with self._lock:
+            total = self._sum_bytes()
+            excess = total - max_bytes
+            if excess <= 0:
+                self._approx_bytes = total
+                return 0
+
+            cursor = self._conn.execute("SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used")
+            to_delete = []
+            for key, size in cursor:
+                if excess <= 0:
+                    break
+                to_delete.append((key,))
+                excess -= size
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", to_delete)
+            self._conn.commit()
+            self._approx_bytes = max_bytes + excess
+        return len(to_delete)
+
+    def stats(self) -> List[Dict[str, object]]:
+        """모델/차원별 항목 수와 크기"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, dimension, COUNT(*), SUM(LENGTH(vector)), MIN(created_at), MAX(last_used) "
+                "FROM embeddings GROUP BY model, dimension ORDER BY model, dimension"
+            ).fetchall()
+        return [
+            {"model": model, "dimension": dimension, "entries": count, "bytes": size,
+             "oldest": oldest, "last_used": last_used}
+            for model, dimension, count, size, oldest, last_used in rows
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._approx_bytes = 0
+            self._conn.execute("VACUUM")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings:
+    """
+    LangChain 임베딩 객체(embed_documents / embed_query)를 캐시로 감싼 래퍼
+
+    Args:
+        embeddings: 실제 임베딩 객체 (offline이면 None 가능)
+        cache: EmbeddingCache
+        model: 임베딩 모델 이름 (캐시 키)
+        dimension: 벡터 차원 (캐시 키)
+        offline: True면 캐시에 없는 텍스트에서 CacheMissError
+    """
+
+    def __init__(self, embeddings, cache: EmbeddingCache, model: str, dimension: int,
+                 offline: bool = False):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model
+        self.dimension = dimension
+        self.offline = offline
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get_many(self.model, self.dimension, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+
+        if self.offline or self.embeddings is None:
+            raise CacheMissError(f"캐시에 없는 텍스트 {len(missing)}개 (offline 모드)")
+
+        # 같은 배치 안의 중복 텍스트는 한 번만 요청
+        missing_texts = list(dict.fromkeys(texts[i] for i in missing))
+        new_vectors = self.embeddings.embed_documents(missing_texts)
+        self.cache.put_many(self.model, self.dimension, missing_texts, new_vectors)
+
+        by_text = dict(zip(missing_texts, new_vectors))
+        for i in missing:
+            vectors[i] = by_text[texts[i]]
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get_many(self.model, self.dimension, [text])[0]
+        if vector is not None:
+            return vector
+        if self.offline or self.embeddings is None:
+            raise CacheMissError("캐시에 없는 질문 (offline 모드)")
+
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(self.model, self.dimension, [text], [vector])
+        return vector
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 캐시 관리")
+    parser.add_argument("command", choices=["stats", "evict", "clear"])
+    parser.add_argument("--path", help="캐시 파일 경로 (기본: EMBEDDING_CACHE_CONFIG['path'])")
+    parser.add_argument("--max-mb", type=float, help="evict: 남길 최대 크기 (MB)")
+    args = parser.parse_args()
+
+    path = args.path
+    max_bytes = None
+    if not path or args.max_mb is None:
+        from config import EMBEDDING_CACHE_CONFIG
+        path = path or EMBEDDING_CACHE_CONFIG["path"]
+        max_bytes = EMBEDDING_CACHE_CONFIG["max_bytes"]
+    if args.max_mb is not None:
+        max_bytes = int(args.max_mb * 1024 * 1024)
+
+    if not os.path.exists(path):
+        print(f"캐시 파일이 없습니다: {path}")
+        sys.exit(1)
+
+    cache = EmbeddingCache(path)
+    if args.command == "stats":
+        entries = cache.stats()
+        print(f"캐시 파일: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+        print(f"최대 크기: {max_bytes / 1024 / 1024:.0f} MB" if max_bytes else "최대 크기: 제한 없음")
+        for entry in entries:
+            print(f"  - {entry['model']} ({entry['dimension']}차원): "
+                  f"{entry['entries']:,}개, {entry['bytes'] / 1024 / 1024:.1f} MB, "
+                  f"마지막 사용 {time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used']))}")
+        if not entries:
+            print("  (비어 있음)")
+    elif args.command == "evict":
+        if not max_bytes:
+            print("--max-mb 또는 EMBEDDING_CACHE_CONFIG['max_bytes']가 필요합니다.")
+            sys.exit(1)
+        removed = cache.evict(max_bytes)
+        print(f"{removed:,}개 항목 삭제 (현재 {cache.total_bytes() / 1024 / 1024:.1f} MB)")
+    else:
+        cache.clear()
+        print("캐시를 비웠습니다.")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
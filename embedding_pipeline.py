@@ -0,0 +1,344 @@
+"""
+임베딩 적재 엔진 - 동시 실행 + 레이트 리밋 대응
+작성일: 2025-11-29
+
+주요 기능:
+- 토큰 수 기준으로 배치 구성 (항목 수 상한도 함께 적용)
+- 임베딩 요청과 Supabase 저장을 각각 제한된 동시성으로 실행
+- 임베딩이 끝난 배치는 바로 저장 단계로 넘어가서 다음 임베딩과 겹쳐서 진행
+- 429(Rate limit) 발생 시 모든 작업자가 함께 물러나는 적응형 backoff
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================================
+# 1. 토큰 수 계산
+# ==============================================
+
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """
+    모델 토크나이저 기반 토큰 수 계산 함수
+
+    tiktoken이 없거나 인코딩 파일을 받을 수 없으면(오프라인) 글자 수로 근사합니다
+    (한국어는 대략 글자당 1토큰 이상이라 보수적인 값).
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return len
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"[경고] tiktoken 인코딩을 불러올 수 없어 글자 수로 근사합니다: {str(e)}")
+        return len
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+# ==============================================
+# 2. 배치 구성
+# ==============================================
+
+@dataclass
+class Batch:
+    index: int
+    documents: List[Document]
+    tokens: int
+    start: int  # 전체 입력에서 첫 문서 위치
+    ids: List[str] = field(default_factory=list)
+
+
+def pack_batches(documents: Iterable[Document], count_tokens: Callable[[str], int],
+                 max_tokens: int, max_items: int) -> Iterator[Batch]:
+    """
+    문서를 토큰 수 합계가 max_tokens를 넘지 않도록 묶어서 반환
+
+    문서 하나가 max_tokens보다 크면 단독 배치로 보냅니다.
+    """
+    current: List[Document] = []
+    current_tokens = 0
+    index = 0
+    position = 0
+    start = 0
+
+    for doc in documents:
+        tokens = count_tokens(doc.page_content)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            yield Batch(index=index, documents=current, tokens=current_tokens, start=start)
+            index += 1
+            start = position
+            current, current_tokens = [], 0
+        current.append(doc)
+        current_tokens += tokens
+        position += 1
+
+    if current:
+        yield Batch(index=index, documents=current, tokens=current_tokens, start=start)
+
+
+# ==============================================
+# 3. 레이트 리밋 backoff
+# ==============================================
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """OpenAI/HTTP 429 오류 여부"""
+    if type(error).__name__ == "RateLimitError":
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "429" in str(error) or "rate limit" in str(error).lower()
+
+
+class AdaptiveBackoff:
+    """
+    작업자들이 공유하는 backoff 상태
+
+    429가 나면 지연 시간을 두 배로 늘리고 그 시간 동안 모든 작업자가 새 요청을 멈춥니다.
+    성공하면 지연 시간을 점차 줄입니다.
+    """
+
+    def __init__(self, initial_delay: float = 1.0, max_delay: float = 60.0):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.delay = 0.0
+        self.resume_at = 0.0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        while True:
+            remaining = self.resume_at - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def on_rate_limit(self):
+        with self._lock:
+            self.rate_limited += 1
+            self.delay = min(self.max_delay, max(self.initial_delay, self.delay * 2))
+            # 여러 작업자가 동시에 재시도하지 않도록 약간의 지터 추가
+            self.resume_at = max(self.resume_at, time.monotonic() + self.delay * random.uniform(1.0, 1.5))
+
+    def on_success(self):
+        with self._lock:
+            self.delay /= 2
+            if self.delay < self.initial_delay:
+                self.delay = 0.0
+
+
+# ==============================================
+# 4. 적재 엔진
+# ==============================================
+
+@dataclass
+class IngestionReport:
+    batches: int = 0
+    succeeded_batches: int = 0
+    failed_batches: List[Dict[str, Any]] = field(default_factory=list)
+    documents: int = 0
+    stored_rows: int = 0
+    tokens: int = 0
+    rate_limited: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.stored_rows / self.elapsed if self.elapsed else 0.0
+
+
+class EmbeddingIngestor:
+    """
+    문서 → 임베딩 → Supabase 저장 파이프라인
+
+    임베딩 단계와 저장 단계는 별도 스레드 풀에서 실행되며,
+    진행 중인 배치 수를 제한해서 입력이 아무리 커도 메모리 사용량은 일정합니다.
+    """
+
+    def __init__(self, embeddings, supabase_client, table_name: str, config: Dict[str, Any],
+                 on_batch_done: Optional[Callable[[Batch, Optional[Exception]], None]] = None):
+        self.embeddings = embeddings
+        self.supabase_client = supabase_client
+        self.table_name = table_name
+        self.count_tokens = get_token_counter(config["model"])
+        self.max_batch_tokens = config.get("max_batch_tokens", 50000)
+        self.max_batch_items = config.get("batch_size", 100)
+        self.embed_concurrency = config.get("embed_concurrency", 4)
+        self.insert_concurrency = config.get("insert_concurrency", 2)
+        self.max_retries = config.get("max_retries", 6)
+        self.backoff = AdaptiveBackoff(
+            initial_delay=config.get("backoff_initial_seconds", 1.0),
+            max_delay=config.get("backoff_max_seconds", 60.0)
+        )
+        self.on_batch_done = on_batch_done
+
+    def _call_with_retry(self, func: Callable[[], Any]) -> Any:
+        """429는 공유 backoff로, 그 외 오류는 지수 backoff로 재시도"""
+        attempt = 0
+        while True:
+            self.backoff.wait()
+            try:
+                result = func()
+                self.backoff.on_success()
+                return result
+            except Exception as e:
+                attempt += 1
+                # 재시도해도 소용없는 오류 (예: embedding_cache.CacheMissError)
+                if attempt > self.max_retries or not getattr(e, "retryable", True):
+                    raise
+                if is_rate_limit_error(e):
+                    self.backoff.on_rate_limit()
+                    logger.warning(f"[경고] 레이트 리밋 - {self.backoff.delay:.1f}초 대기 후 재시도 ({attempt}/{self.max_retries})")
+                else:
+                    delay = min(30.0, 2 ** attempt) * random.uniform(0.5, 1.0)
+                    logger.warning(f"[경고] 요청 실패 - {delay:.1f}초 후 재시도 ({attempt}/{self.max_retries}): {str(e)}")
+                    time.sleep(delay)
+
+    def build_rows(self, batch: Batch, vectors: List[List[float]]) -> List[Dict[str, Any]]:
+        """Supabase에 넣을 행 구성 (index_sync.assign_chunk_ids의 chunk_id가 있으면 그 ID 사용)"""
+        if not batch.ids:
+            batch.ids = [doc.metadata.get("chunk_id") or str(uuid.uuid4()) for doc in batch.documents]
+        return [
+            {
+                "id": row_id,
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "embedding": vector,
+            }
+            for row_id, doc, vector in zip(batch.ids, batch.documents, vectors)
+        ]
+
+    def _embed(self, batch: Batch) -> List[List[float]]:
+        texts = [doc.page_content for doc in batch.documents]
+        return self._call_with_retry(lambda: self.embeddings.embed_documents(texts))
+
+    def _insert(self, batch: Batch, vectors: List[List[float]]) -> int:
+        rows = self.build_rows(batch, vectors)
+        # 같은 ID는 덮어쓰기 (재실행해도 중복 행이 생기지 않음)
+        self._call_with_retry(
+            lambda: self.supabase_client.table(self.table_name).upsert(rows, on_conflict="id").execute()
+        )
+        return len(rows)
+
+    def run(self, documents: Iterable[Document],
+            progress: Optional[Callable[[int], None]] = None) -> IngestionReport:
+        """
+        문서를 임베딩하고 저장
+
+        Args:
+            documents: 문서 (리스트 또는 generator)
+            progress: 배치 하나가 끝날 때마다 처리한 문서 수로 호출되는 함수
+        """
+        report = IngestionReport()
+        started = time.perf_counter()
+        max_in_flight = self.embed_concurrency + self.insert_concurrency
+
+        embed_pool = ThreadPoolExecutor(max_workers=self.embed_concurrency, thread_name_prefix="embed")
+        insert_pool = ThreadPoolExecutor(max_workers=self.insert_concurrency, thread_name_prefix="insert")
+        pending: Dict[Future, tuple] = {}
+
+        def finish(batch: Batch, error: Optional[Exception], stored: int = 0):
+            if error is None:
+                report.succeeded_batches += 1
+                report.stored_rows += stored
+                logger.info(f"[완료] 배치 {batch.index + 1} 저장 완료 ({len(batch.documents)}개, {batch.tokens} 토큰)")
+            else:
+                report.failed_batches.append({
+                    "batch": batch.index,
+                    "start": batch.start,
+                    "size": len(batch.documents),
+                    "error": str(error)
+                })
+                logger.error(f"[경고] 배치 {batch.index + 1} 저장 실패: {str(error)}")
+            if self.on_batch_done:
+                self.on_batch_done(batch, error)
+            if progress:
+                progress(len(batch.documents))
+
+        def drain(return_when):
+            done, _ = wait(list(pending), return_when=return_when)
+            for future in done:
+                stage, batch = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    finish(batch, e)
+                    continue
+                if stage == "embed":
+                    # 임베딩이 끝난 배치는 바로 저장 단계로 (다음 배치 임베딩과 겹쳐서 진행)
+                    pending[insert_pool.submit(self._insert, batch, result)] = ("insert", batch)
+                else:
+                    finish(batch, None, result)
+
+        try:
+            for batch in pack_batches(documents, self.count_tokens,
+                                      self.max_batch_tokens, self.max_batch_items):
+                report.batches += 1
+                report.documents += len(batch.documents)
+                report.tokens += batch.tokens
+
+                while len(pending) >= max_in_flight:
+                    drain(FIRST_COMPLETED)
+                pending[embed_pool.submit(self._embed, batch)] = ("embed", batch)
+
+            while pending:
+                drain(FIRST_COMPLETED)
+        finally:
+            embed_pool.shutdown(wait=True)
+            insert_pool.shutdown(wait=True)
+
+        report.rate_limited = self.backoff.rate_limited
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def iter_rows(self, documents: Iterable[Document], report: IngestionReport,
+                  progress: Optional[Callable[[int], None]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        임베딩만 동시에 실행하고 저장할 행을 순서대로 반환 (bulk_loader.BulkVectorLoader용)
+
+        저장은 호출한 쪽에서 하므로 배치가 하나라도 실패하면 바로 예외를 올립니다.
+        """
+        started = time.perf_counter()
+        embed_pool = ThreadPoolExecutor(max_workers=self.embed_concurrency, thread_name_prefix="embed")
+        pending: List[tuple] = []
+
+        def emit(future: Future, batch: Batch) -> Iterator[Dict[str, Any]]:
+            rows = self.build_rows(batch, future.result())
+            report.succeeded_batches += 1
+            report.stored_rows += len(rows)
+            if progress:
+                progress(len(batch.documents))
+            return iter(rows)
+
+        try:
+            for batch in pack_batches(documents, self.count_tokens,
+                                      self.max_batch_tokens, self.max_batch_items):
+                report.batches += 1
+                report.documents += len(batch.documents)
+                report.tokens += batch.tokens
+                pending.append((embed_pool.submit(self._embed, batch), batch))
+
+                # 입력 순서대로 내보내서 메모리에는 최대 embed_concurrency개 배치만 유지
+                if len(pending) > self.embed_concurrency:
+                    yield from emit(*pending.pop(0))
+
+            while pending:
+                yield from emit(*pending.pop(0))
+        finally:
+            for future, _ in pending:
+                future.cancel()
+            embed_pool.shutdown(wait=True)
+            report.rate_limited = self.backoff.rate_limited
+            report.elapsed = time.perf_counter() - started
@@ -0,0 +1,151 @@
+"""
+엔티티 사전 (Gazetteer) - 실제 제품명/아이 이름 기반 의도 추출
+작성일: 2025-11-27
+
+주요 기능:
+- DB(또는 JSON 캐시)의 제품명, 아이 이름으로 사전 구성
+- 트라이(trie)에 저장하고 질문에서 가장 긴 일치부터 찾기
+- 주기적으로 다시 만들어서 새 제품/아이도 바로 인식
+
+제품명은 "출하예정(2025-12-07)_포도"처럼 저장되는 경우가 많아서
+전체 이름과 함께 마지막 "_" 뒤의 실제 상품명도 별칭으로 등록합니다.
+("제주 유기농 감귤"의 "유기농", "제주" 같은 일반 단어 조각은 등록하지 않음 -
+정확 일치로 처리되면 벡터 검색을 건너뛰기 때문)
+"""
+
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+# 별칭으로 쓰기엔 너무 일반적인 조각
+ALIAS_STOPWORDS = {"상품", "제품", "판매", "판매중", "품절", "신제품", "세트"}
+
+_HAS_LETTER = re.compile(r"[가-힣A-Za-z]")
+
+_END = "\0"  # 트라이 노드에서 단어 끝 표시 키
+
+
+class EntityMatch(NamedTuple):
+    start: int
+    end: int
+    text: str
+    types: Set[str]
+
+
+def product_aliases(name: str, min_length: int = 2) -> List[str]:
+    """제품명과 마지막 "_" 뒤의 상품명 (예: "출하예정(2025-12-07)_포도" → 전체, "포도")"""
+    name = str(name).strip()
+    aliases = [name] if name else []
+    if "_" in name:
+        part = name.rsplit("_", 1)[1].strip()
+        if (len(part) >= min_length and _HAS_LETTER.search(part)
+                and part not in ALIAS_STOPWORDS and part not in aliases):
+            aliases.append(part)
+    return aliases
+
+
+class EntityGazetteer:
+    """엔티티 이름 트라이 (최장 일치 검색)"""
+
+    def __init__(self, min_length: int = 2):
+        self.min_length = min_length
+        self._root: Dict[str, dict] = {}
+        self.size = 0
+        self.built_at = time.time()
+
+    @classmethod
+    def from_names(cls, names_by_type: Dict[str, Iterable[str]],
+                   min_length: int = 2) -> "EntityGazetteer":
+        """
+        {"product": [...], "child": [...]} 형태의 이름 목록으로 사전 생성
+
+        product 이름은 product_aliases로 상품명 별칭까지 등록합니다.
+        """
+        gazetteer = cls(min_length=min_length)
+        for entity_type, names in names_by_type.items():
+            for name in names:
+                if not name:
+                    continue
+                if entity_type == "product":
+                    for alias in product_aliases(name, min_length):
+                        gazetteer.add(alias, entity_type)
+                else:
+                    gazetteer.add(str(name).strip(), entity_type)
+        return gazetteer
+
+    def add(self, text: str, entity_type: str):
+        if len(text) < self.min_length:
+            return
+        node = self._root
+        for char in text:
+            node = node.setdefault(char, {})
+        types = node.setdefault(_END, set())
+        if not types:
+            self.size += 1
+        types.add(entity_type)
+
+    def find_all(self, query: str) -> List[EntityMatch]:
+        """질문에서 겹치지 않는 엔티티를 왼쪽부터, 각 위치에서 가장 긴 것으로 찾기"""
+        matches = []
+        i = 0
+        while i < len(query):
+            node = self._root
+            best = None
+            j = i
+            while j < len(query) and query[j] in node:
+                node = node[query[j]]
+                j += 1
+                if _END in node:
+                    best = (j, node[_END])
+            if best:
+                end, types = best
+                matches.append(EntityMatch(i, end, query[i:end], set(types)))
+                i = end
+            else:
+                i += 1
+        return matches
+
+    def longest_match(self, query: str, entity_type: Optional[str] = None) -> Optional[EntityMatch]:
+        """가장 긴 엔티티 하나 (길이가 같으면 앞쪽)"""
+        best = None
+        for match in self.find_all(query):
+            if entity_type and entity_type not in match.types:
+                continue
+            if best is None or (match.end - match.start) > (best.end - best.start):
+                best = match
+        return best
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class GazetteerCache:
+    """
+    사전을 주기적으로 다시 만드는 래퍼
+
+    loader는 {"product": [...], "child": [...]}를 반환하는 함수입니다.
+    만료된 뒤 처음 요청한 스레드만 다시 만들고, 나머지는 기존 사전을 그대로 사용합니다.
+    """
+
+    def __init__(self, loader: Callable[[], Dict[str, Iterable[str]]],
+                 refresh_seconds: float = 300):
+        self.loader = loader
+        self.refresh_seconds = refresh_seconds
+        self._gazetteer: Optional[EntityGazetteer] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[EntityGazetteer]:
+        gazetteer = self._gazetteer
+        if gazetteer is None or time.time() - gazetteer.built_at >= self.refresh_seconds:
+            if self._lock.acquire(blocking=gazetteer is None):
+                try:
+                    # 기다리는 동안 다른 스레드가 이미 만들었으면 그대로 사용
+                    if self._gazetteer is gazetteer:
+                        self._gazetteer = EntityGazetteer.from_names(self.loader())
+                finally:
+                    self._lock.release()
+        return self._gazetteer
+
+    def invalidate(self):
+        self._gazetteer = None
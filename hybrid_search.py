@@ -0,0 +1,138 @@
+"""
+하이브리드 검색 - 벡터 검색 + BM25 키워드 검색 결과 결합
+작성일: 2025-12-13
+
+주요 기능:
+- 결합 방식 (RETRIEVAL_CONFIG["fusion"])
+  - "rank": 순위 위치 점수 (k - 순위) × 가중치 합 (기존 방식)
+  - "rrf": Reciprocal Rank Fusion - 가중치 / (rrf_k + 순위) 합, 한쪽 결과가 길어도 점수가 치우치지 않음
+  - "score": 검색기별 점수(코사인 유사도 / BM25)를 0~1로 정규화한 뒤 가중치 합
+- 벡터 / BM25 검색 결과를 점수와 함께 받음 (점수가 없으면 순위로 대신함)
+
+k / 가중치 / 결합 방식 비교: python benchmarks/bench_retrieval.py
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+FUSION_METHODS = ("rank", "rrf", "score")
+
+# RRF 상수 (원 논문 기본값)
+DEFAULT_RRF_K = 60
+
+# (문서, 검색기 점수 - 없으면 None)
+Scored = Tuple[Document, Optional[float]]
+
+
+def _normalized(scores: Sequence[Optional[float]]) -> List[float]:
+    """최소-최대 정규화 (점수가 없으면 순위로, 모두 같으면 1.0)"""
+    if not scores:
+        return []
+    if any(score is None for score in scores):
+        return [1.0 - i / len(scores) for i in range(len(scores))]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+def fuse(results: Sequence[Sequence[Scored]], weights: Sequence[float], k: int,
+         method: str = "rank", rrf_k: int = DEFAULT_RRF_K) -> List[Document]:
+    """
+    검색기별 결과(순위 순)를 하나로 합쳐서 상위 k개 반환
+
+    같은 내용의 문서는 점수를 더합니다. 점수가 같으면 먼저 나온 문서가 앞에 옵니다.
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"알 수 없는 결합 방식: {method} ({', '.join(FUSION_METHODS)})")
+
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranked, weight in zip(results, weights):
+        normalized = _normalized([score for _, score in ranked]) if method == "score" else None
+        for i, (doc, _) in enumerate(ranked):
+            if method == "rank":
+                value = (k - i) * weight
+            elif method == "rrf":
+                value = weight / (rrf_k + i + 1)
+            else:
+                value = weight * normalized[i]
+            key = doc.page_content
+            documents.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + value
+
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    return [documents[key] for key in ordered[:k]]
+
+
+def bm25_search(bm25_retriever, query: str, k: int) -> List[Scored]:
+    """
+    BM25 상위 k개와 점수
+
+    langchain BM25Retriever의 내부 색인(vectorizer)으로 점수를 계산합니다
+    (순서는 BM25Retriever.invoke와 같음). 색인이 없으면 점수 없이 invoke 결과 사용.
+    """
+    vectorizer = getattr(bm25_retriever, "vectorizer", None)
+    if vectorizer is None:
+        return [(doc, None) for doc in bm25_retriever.invoke(query)[:k]]
+
+    import numpy as np
+
+    scores = vectorizer.get_scores(bm25_retriever.preprocess_func(query))
+    top = np.argsort(scores)[::-1][:k]
+    return [(bm25_retriever.docs[i], float(scores[i])) for i in top]
+
+
+def vector_search(vector_retriever, query: str, k: int,
+                  query_embedding: Optional[List[float]] = None) -> List[Scored]:
+    """벡터 검색 상위 k개와 유사도 (similarity_search_with_scores가 없으면 점수 없이)"""
+    if hasattr(vector_retriever, "similarity_search_with_scores"):
+        return vector_retriever.similarity_search_with_scores(query, k=k, query_embedding=query_embedding)
+    return [(doc, None) for doc in vector_retriever.similarity_search(query, k=k, query_embedding=query_embedding)]
+
+
+class HybridRetriever:
+    """
+    하이브리드 검색기 (벡터 검색 + BM25 키워드 검색)
+
+    Args:
+        vector_retriever: similarity_search(_with_scores)(query, k, query_embedding)를 가진 검색기
+        bm25_retriever: langchain BM25Retriever
+        vector_weight / bm25_weight: 결합 가중치
+        fusion: 결합 방식 ("rank" / "rrf" / "score")
+        rrf_k: RRF 상수
+    """
+
+    def __init__(self, vector_retriever, bm25_retriever, vector_weight=0.7, bm25_weight=0.3,
+                 fusion: str = "rank", rrf_k: int = DEFAULT_RRF_K):
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"알 수 없는 결합 방식: {fusion} ({', '.join(FUSION_METHODS)})")
+        self.vector_retriever = vector_retriever
+        self.bm25_retriever = bm25_retriever
+        self.vector_weight = vector_weight
+        self.bm25_weight = bm25_weight
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+
+    def search(self, query: str, k: int = 5,
+               query_embedding: Optional[List[float]] = None) -> List[Document]:
+        """하이브리드 검색 (오류는 그대로 올림)"""
+        vector_results = vector_search(self.vector_retriever, query, k, query_embedding)
+        bm25_results = bm25_search(self.bm25_retriever, query, k)
+        return fuse([vector_results, bm25_results], [self.vector_weight, self.bm25_weight],
+                    k=k, method=self.fusion, rrf_k=self.rrf_k)
+
+    def invoke(self, query: str, k: int = 5,
+               query_embedding: Optional[List[float]] = None) -> List[Document]:
+        """하이브리드 검색 수행 (query_embedding: 미리 계산한 질문 임베딩)"""
+        try:
+            result = self.search(query, k=k, query_embedding=query_embedding)
+            logger.info(f"[완료] 하이브리드 검색 완료: {len(result)}개 결과 ({self.fusion})")
+            return result
+        except Exception as e:
+            logger.error(f"[오류] 검색 오류: {str(e)}")
+            return []
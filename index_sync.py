@@ -0,0 +1,271 @@
+"""
+벡터 인덱스 증분 동기화 - 내용 해시 기반 결정적 ID
+작성일: 2025-11-30
+
+주요 기능:
+- 청크마다 "원본 키 + 내용 해시"로 항상 같은 UUID 부여
+- Supabase에 이미 저장된 ID와 비교해서 새로 추가/변경된 청크만 임베딩
+- 원본에서 사라진(또는 내용이 바뀐) 청크의 기존 행 삭제
+- 추출기가 끝까지 읽었는데 청크가 하나도 없는 source(비워진 테이블/파일)의 행도 삭제
+
+원본 키: 메타데이터의 source(테이블/파일) + 행 id(또는 파일 경로/페이지) + 청크 번호
+내용이 바뀌면 해시가 바뀌므로 새 ID로 저장되고, 이전 ID는 삭제 대상이 됩니다.
+"""
+
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# 결정적 UUID 네임스페이스 (바꾸면 모든 ID가 바뀌므로 고정)
+CHUNK_ID_NAMESPACE = uuid.UUID("6f1c1c55-3f0e-4f57-9a3e-2a8f5f2d7b10")
+
+# 원본 행을 식별하는 메타데이터 키 (앞쪽 우선)
+ROW_KEY_FIELDS = ("id", "_source_file", "source_file", "page")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def source_key(metadata: Dict[str, Any], text: str) -> str:
+    """
+    청크의 원본 키
+
+    행 id 등 식별 정보가 없으면 내용 해시를 대신 사용합니다 (같은 내용이면 같은 키).
+    """
+    source = str(metadata.get("source", "unknown"))
+    parts = [str(metadata[key]) for key in ROW_KEY_FIELDS if metadata.get(key) not in (None, "")]
+    row_key = "/".join(parts) if parts else content_hash(text)[:16]
+    return f"{source}:{row_key}:{metadata.get('chunk_index', 0)}"
+
+
+def iter_chunk_ids(chunks: Iterable[Document]) -> Iterator[Document]:
+    """
+    청크 메타데이터에 source_key, content_hash, chunk_id를 기록하면서 하나씩 반환
+
+    중복 제거(dedup.py)로 병합된 출처가 있으면 해시에 포함합니다
+    (내용이 같아도 출처 목록이 바뀌면 새 ID로 다시 저장).
+    """
+    for chunk in chunks:
+        text = chunk.page_content
+        if chunk.metadata.get("provenance"):
+            text += "\0" + json.dumps(chunk.metadata["provenance"], ensure_ascii=False,
+                                      sort_keys=True, default=str)
+        digest = content_hash(text)
+        key = source_key(chunk.metadata, chunk.page_content)
+        chunk.metadata["source_key"] = key
+        chunk.metadata["content_hash"] = digest
+        chunk.metadata["chunk_id"] = str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{key}:{digest}"))
+        yield chunk
+
+
+def skip_duplicate_ids(chunks: Iterable[Document], counts: Dict[str, int]) -> Iterator[Document]:
+    """
+    chunk_id가 이미 나온 청크는 건너뜀 (원본 키와 내용이 같은 청크, counts["duplicates"]에 개수)
+
+    iter_changed는 직접 걸러내므로, 비교 없이 전부 적재하는 경로(bulk_loader)에서 사용합니다.
+    """
+    seen: Set[str] = set()
+    counts.setdefault("duplicates", 0)
+    for chunk in chunks:
+        chunk_id = chunk.metadata["chunk_id"]
+        if chunk_id in seen:
+            counts["duplicates"] += 1
+            continue
+        seen.add(chunk_id)
+        yield chunk
+
+
+def assign_chunk_ids(chunks: Iterable[Document]) -> List[Document]:
+    """청크 메타데이터에 source_key, content_hash, chunk_id 기록"""
+    return list(iter_chunk_ids(chunks))
+
+
+@dataclass
+class SyncPlan:
+    to_embed: List[Document] = field(default_factory=list)
+    stale_ids: List[str] = field(default_factory=list)
+    changed: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+
+
+class VectorIndexSync:
+    """Supabase 임베딩 테이블과 이번 실행의 청크를 비교/정리"""
+
+    def __init__(self, supabase_client, table_name: str, page_size: int = 1000,
+                 delete_batch_size: int = 200):
+        self.supabase_client = supabase_client
+        self.table_name = table_name
+        self.page_size = page_size
+        self.delete_batch_size = delete_batch_size
+
+    def fetch_stored_ids(self, sources: Iterable[str]) -> Set[str]:
+        """해당 source들에 속한 저장된 행 ID 전부 (페이지 단위 조회)"""
+        stored: Set[str] = set()
+        sources = sorted(set(sources))
+        if not sources:
+            return stored
+
+        offset = 0
+        while True:
+            response = (
+                self.supabase_client.table(self.table_name)
+                .select("id")
+                .in_("metadata->>source", sources)
+                .order("id")
+                .range(offset, offset + self.page_size - 1)
+                .execute()
+            )
+            rows = response.data or []
+            stored.update(str(row["id"]) for row in rows)
+            if len(rows) < self.page_size:
+                return stored
+            offset += self.page_size
+
+    def fetch_ids_by_row(self, source: str, key_field: str, values: Sequence[Any]) -> Set[str]:
+        """
+        source에서 metadata[key_field]가 values 중 하나인 행 ID (행 단위 갱신/삭제용, cdc_sync.py)
+
+        요청 주소 길이 제한 때문에 values를 delete_batch_size개씩 나눠서 조회합니다.
+        """
+        stored: Set[str] = set()
+        values = [str(value) for value in values]
+        for i in range(0, len(values), self.delete_batch_size):
+            offset = 0
+            while True:
+                response = (
+                    self.supabase_client.table(self.table_name)
+                    .select("id")
+                    .eq("metadata->>source", source)
+                    .in_(f"metadata->>{key_field}", values[i:i + self.delete_batch_size])
+                    .order("id")
+                    .range(offset, offset + self.page_size - 1)
+                    .execute()
+                )
+                rows = response.data or []
+                stored.update(str(row["id"]) for row in rows)
+                if len(rows) < self.page_size:
+                    break
+                offset += self.page_size
+        return stored
+
+    def iter_row_keys(self, source: str, key_field: str) -> Iterator[Tuple[str, Optional[str]]]:
+        """source에 저장된 모든 행의 (ID, metadata[key_field]) - 페이지 단위 조회"""
+        offset = 0
+        while True:
+            response = (
+                self.supabase_client.table(self.table_name)
+                .select(f"id, row_key:metadata->>{key_field}")
+                .eq("metadata->>source", source)
+                .order("id")
+                .range(offset, offset + self.page_size - 1)
+                .execute()
+            )
+            rows = response.data or []
+            for row in rows:
+                yield str(row["id"]), row.get("row_key")
+            if len(rows) < self.page_size:
+                return
+            offset += self.page_size
+
+    def plan(self, chunks: List[Document], full_refresh: bool = False) -> SyncPlan:
+        """
+        임베딩할 청크와 삭제할 ID 계산
+
+        Args:
+            chunks: assign_chunk_ids를 거친 청크
+            full_refresh: True면 저장 여부와 상관없이 전부 다시 임베딩 (ID는 동일하게 유지)
+        """
+        plan = SyncPlan()
+        desired: Dict[str, Document] = {}
+        for chunk in chunks:
+            chunk_id = chunk.metadata["chunk_id"]
+            if chunk_id in desired:
+                plan.duplicates += 1
+                continue
+            desired[chunk_id] = chunk
+
+        stored = self.fetch_stored_ids(chunk.metadata.get("source", "unknown") for chunk in desired.values())
+
+        for chunk_id, chunk in desired.items():
+            if chunk_id in stored and not full_refresh:
+                plan.unchanged += 1
+            else:
+                plan.to_embed.append(chunk)
+
+        plan.changed = len(plan.to_embed)
+        plan.stale_ids = sorted(stored - desired.keys())
+        logger.info(
+            f"[비교] 저장된 행 {len(stored)}개 / 이번 청크 {len(desired)}개 → "
+            f"임베딩 {len(plan.to_embed)}개, 변경 없음 {plan.unchanged}개, "
+            f"삭제 {len(plan.stale_ids)}개, 중복 청크 {plan.duplicates}개"
+        )
+        return plan
+
+    def iter_changed(self, chunks: Iterable[Document], plan: SyncPlan,
+                     full_refresh: bool = False,
+                     enumerated_sources: Optional[Callable[[], Optional[Iterable[str]]]] = None
+                     ) -> Iterator[Document]:
+        """
+        plan()의 스트리밍 버전: 임베딩할 청크만 하나씩 반환
+
+        저장된 ID는 source가 처음 나올 때 조회하고, 메모리에는 ID만 보관합니다.
+        plan.stale_ids는 청크를 끝까지 읽은 뒤에 채워집니다.
+
+        Args:
+            enumerated_sources: 청크를 끝까지 읽은 뒤 호출 - 추출기가 끝까지 읽은 source 목록
+                (모르면 None). 이 중 청크가 하나도 없던 source의 저장된 행도 삭제 대상에 포함.
+                건너뛰거나 실패한 source는 목록에 없으므로 삭제되지 않음
+        """
+        stored: Set[str] = set()
+        seen_sources: Set[str] = set()
+        seen_ids: Set[str] = set()
+
+        for chunk in chunks:
+            source = chunk.metadata.get("source", "unknown")
+            if source not in seen_sources:
+                seen_sources.add(source)
+                stored |= self.fetch_stored_ids([source])
+
+            chunk_id = chunk.metadata["chunk_id"]
+            if chunk_id in seen_ids:
+                plan.duplicates += 1
+                continue
+            seen_ids.add(chunk_id)
+
+            if chunk_id in stored and not full_refresh:
+                plan.unchanged += 1
+            else:
+                plan.changed += 1
+                yield chunk
+
+        empty_sources = set((enumerated_sources and enumerated_sources()) or ()) - seen_sources
+        if empty_sources:
+            empty_ids = self.fetch_stored_ids(empty_sources)
+            stored |= empty_ids
+            logger.info(f"[비교] 행이 없는 source {len(empty_sources)}개 "
+                        f"({', '.join(sorted(empty_sources))}): 저장된 행 {len(empty_ids)}개 삭제 대상")
+
+        plan.stale_ids = sorted(stored - seen_ids)
+        logger.info(
+            f"[비교] 저장된 행 {len(stored)}개 / 이번 청크 {len(seen_ids)}개 → "
+            f"임베딩 {plan.changed}개, 변경 없음 {plan.unchanged}개, "
+            f"삭제 {len(plan.stale_ids)}개, 중복 청크 {plan.duplicates}개"
+        )
+
+    def delete_ids(self, ids: List[str]) -> int:
+        """ID 목록 삭제 (요청 크기 제한 때문에 나눠서 삭제)"""
+        deleted = 0
+        for i in range(0, len(ids), self.delete_batch_size):
+            chunk = ids[i:i + self.delete_batch_size]
+            self.supabase_client.table(self.table_name).delete().in_("id", chunk).execute()
+            deleted += len(chunk)
+        return deleted
@@ -0,0 +1,153 @@
+"""
+임베딩 적재 체크포인트 - 중단된 실행 이어하기
+작성일: 2025-12-03
+
+주요 기능:
+- 배치가 끝날 때마다 성공/실패한 청크 ID를 JSONL 파일에 기록 (한 줄씩 추가, fsync)
+- --resume 실행 시 이미 저장된 청크는 건너뛰고 실패했거나 처리 못 한 청크만 다시 임베딩
+- 실행이 끝나면 저장된 것 / 저장되지 않은 것을 정리한 보고서 생성
+
+청크 ID는 index_sync.assign_chunk_ids의 결정적 ID라서 다시 실행해도 같은 값입니다.
+
+체크포인트 형식 (한 줄에 하나):
+    {"event": "run_start", "time": ..., "resume": false}
+    {"event": "batch_done", "batch": 3, "ids": [...], "time": ...}
+    {"event": "batch_failed", "batch": 4, "ids": [...], "keys": [...], "error": "...", "time": ...}
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+def _chunk_ids(batch) -> List[str]:
+    # 저장까지 간 배치는 batch.ids (= chunk_id), 임베딩에서 실패한 배치는 메타데이터에서
+    if batch.ids:
+        return list(batch.ids)
+    return [doc.metadata.get("chunk_id") for doc in batch.documents]
+
+
+class IngestionCheckpoint:
+    """
+    체크포인트 파일 기록/복원
+
+    Args:
+        path: 체크포인트 JSONL 파일 경로
+        resume: True면 기존 기록을 읽어서 이어하기, False면 새로 시작 (기존 파일 비움)
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.resume = resume
+        self.completed: set = set()
+        self.failed: Dict[str, Dict[str, Any]] = {}  # chunk_id → {"key", "error"}
+        self.skipped = 0
+        self.completed_by_source: Counter = Counter()
+        self.previous_failures = 0
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(path):
+            self._load()
+            logger.info(f"[이어하기] 체크포인트 로드: 저장 완료 {len(self.completed)}개, "
+                        f"다시 시도할 실패 {self.previous_failures}개 ({path})")
+        elif resume:
+            logger.warning(f"[경고] 체크포인트 파일이 없어 처음부터 실행합니다: {path}")
+
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        self._write({"event": "run_start", "resume": resume})
+
+    def _load(self):
+        previous_failures = set()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 중 중단된 마지막 줄은 무시
+                    logger.warning(f"[경고] 체크포인트 {line_no}번째 줄을 읽을 수 없어 건너뜁니다.")
+                    continue
+                event = record.get("event")
+                if event == "batch_done":
+                    self.completed.update(record["ids"])
+                    previous_failures.difference_update(record["ids"])
+                elif event == "batch_failed":
+                    previous_failures.update(record["ids"])
+        # 지난 실패는 저장 완료로 기록되지 않았으므로 이번 실행에서 다시 처리됨
+        self.previous_failures = len(previous_failures - self.completed)
+
+    def _write(self, record: Dict[str, Any]):
+        record["time"] = datetime.now().isoformat()
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def pending(self, chunks: Iterable[Document]) -> Iterator[Document]:
+        """이미 저장 완료로 기록된 청크는 건너뛰고 나머지만 반환"""
+        for chunk in chunks:
+            if chunk.metadata.get("chunk_id") in self.completed:
+                self.skipped += 1
+                self.completed_by_source[chunk.metadata.get("source", "unknown")] += 1
+                continue
+            yield chunk
+
+    def on_batch_done(self, batch, error: Optional[Exception]):
+        """EmbeddingIngestor(on_batch_done=...)에 넘기는 콜백"""
+        ids = _chunk_ids(batch)
+        if error is None:
+            self._write({"event": "batch_done", "batch": batch.index, "ids": ids})
+            with self._lock:
+                self.completed.update(ids)
+                for chunk_id in ids:
+                    self.failed.pop(chunk_id, None)
+                self.completed_by_source.update(
+                    doc.metadata.get("source", "unknown") for doc in batch.documents
+                )
+        else:
+            keys = [doc.metadata.get("source_key") for doc in batch.documents]
+            self._write({"event": "batch_failed", "batch": batch.index, "ids": ids,
+                         "keys": keys, "error": str(error)})
+            with self._lock:
+                for chunk_id, key in zip(ids, keys):
+                    self.failed[chunk_id] = {"key": key, "error": str(error)}
+
+    def report(self, **extra) -> Dict[str, Any]:
+        """
+        저장 결과 보고서
+
+        - indexed: 이번 실행(이어하기 포함)에서 저장이 확인된 청크 수 (source별)
+        - not_indexed: 이번 실행에서 저장되지 않은 청크 목록 (청크 ID, 원본 키, 오류)
+        """
+        return {
+            "created_at": datetime.now().isoformat(),
+            "checkpoint": self.path,
+            "resumed": self.resume,
+            "indexed": {
+                "total": sum(self.completed_by_source.values()),
+                "skipped_from_checkpoint": self.skipped,
+                "by_source": dict(self.completed_by_source),
+            },
+            "not_indexed": [
+                {"chunk_id": chunk_id, "source_key": info["key"], "error": info["error"]}
+                for chunk_id, info in sorted(self.failed.items())
+            ],
+            **extra,
+        }
+
+    def write_report(self, path: str, **extra) -> Dict[str, Any]:
+        report = self.report(**extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+    def close(self):
+        with self._lock:
+            self._file.close()
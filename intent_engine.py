@@ -0,0 +1,284 @@
+"""
+질문 의도 분석 엔진
+작성일: 2025-11-26
+
+주요 기능:
+- 모든 키워드 목록을 하나의 Aho-Corasick 오토마톤으로 미리 컴파일
+- 질문을 한 번만 훑어서 매칭된 키워드 분류를 모두 반환
+- 이름 추출 정규식 미리 컴파일
+- 최근 의도 판단 결과 LRU 캐시
+"""
+
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# ==============================================
+# 1. 키워드 목록
+# ==============================================
+
+KEYWORD_SETS: Dict[str, List[str]] = {
+    # 제품/상품 관련 질문
+    "product": ['제품', '상품', '농산물', '판매', '가격', '얼마', '재고', '사고 싶', '구매', '주문',
+                '신제품', '새로운', '최신', '뭐야', '뭐', '무엇', '출하', '배송', '언제', '날짜'],
+    # 특정 아이 정보 질문
+    "child": ['반', '어느', '어디', '누구', '언제', '몇', '알려', '대해', '정보', '소개'],
+    # 최신 활동 질문
+    "recent": ['최근', '최신', '새로운', '오늘', '어제'],
+    "activity": ['활동', '사진', '업로드'],
+    # 전체 목록 질문
+    "list": ['명단', '목록', '전체'],
+    "list_product": ['제품', '상품', '농산물', '판매'],
+    # 목록 질문 중 전체 행 대신 집계만 필요한 표현
+    "summary": ['몇 명', '몇명', '몇 개', '몇개', '통계', '요약', '현황', '반별', '상태별'],
+}
+
+# 질문에 직접 언급되면 바로 제품 검색하는 제품명 (목록 순서가 우선순위)
+COMMON_PRODUCTS: List[str] = ['고추', '딸기', '포도', '사과', '바나나', '블루베리', '콩', '당근',
+                              '망골드', '수박', '참외', '오이', '토마토', '감자']
+
+# "김민수는", "최예은이", "박지훈" 등 이름 패턴
+NAME_PATTERNS = [
+    re.compile(r'([가-힣]{2,4})(?:는|은|이|가|의|을|를)'),  # 조사가 붙은 이름
+    re.compile(r'([가-힣]{2,4})\s*어[디느]'),  # "김민수 어디" 형태
+]
+NAME_WORD_PATTERN = re.compile(r'^[가-힣]{2,4}$')
+
+# 목록/최근 활동은 "전체", "최근" 같은 키워드 하나로도 분류되므로, DB 결과로 바로 답해도 되는
+# 분명한 표현인지 따로 확인 (strict_match, ANSWER_POLICY_CONFIG["require_confirmation"])
+STRICT_INTENT_PATTERNS = {
+    "list_all": re.compile(r'명단|(아이|원아|아이들)\s*(전체\s*)?목록|전체\s*(아이|원아)'),
+    "list_all_products": re.compile(r'(제품|상품|농산물)\s*(전체\s*)?목록|전체\s*(제품|상품|농산물)'),
+    "recent_activity": re.compile(r'(최근|최신|오늘|어제)\s*(올라온\s*|올린\s*|업로드된\s*)?(활동\s*)?(사진|활동)'),
+}
+# 방법/문의 질문은 목록이나 사진을 달라는 뜻이 아님
+HOWTO_PATTERN = re.compile(r'방법|어떻게|문의|하는\s*법|안\s*돼|안되|오류|에러')
+WORD_PATTERN = re.compile(r'\S+')
+
+
+# ==============================================
+# 2. Aho-Corasick 다중 패턴 매처
+# ==============================================
+
+class KeywordAutomaton:
+    """
+    여러 키워드 집합을 한 번에 찾는 Aho-Corasick 오토마톤
+
+    같은 키워드가 여러 분류에 속할 수 있습니다 (예: '최신' → product, recent).
+    """
+
+    def __init__(self, keyword_sets: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, Tuple[str, ...]]]] = [[]]
+
+        labels_by_keyword: Dict[str, Set[str]] = {}
+        for label, keywords in keyword_sets.items():
+            for keyword in keywords:
+                if keyword:
+                    labels_by_keyword.setdefault(keyword, set()).add(label)
+
+        for keyword, labels in labels_by_keyword.items():
+            self._add(keyword, tuple(sorted(labels)))
+        self._build_failure_links()
+
+    def _add(self, keyword: str, labels: Tuple[str, ...]):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((keyword, labels))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # 실패 링크 쪽에서 끝나는 키워드도 함께 출력
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, str, Tuple[str, ...]]]:
+        """(시작, 끝, 키워드, 분류들)을 텍스트 순서대로 반환"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword, labels in output[state]:
+                yield end - len(keyword), end, keyword, labels
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """분류별로 매칭된 키워드 집합 반환"""
+        found: Dict[str, Set[str]] = {}
+        for _, _, keyword, labels in self.iter_matches(text):
+            for label in labels:
+                found.setdefault(label, set()).add(keyword)
+        return found
+
+
+# ==============================================
+# 3. 의도 분석 엔진
+# ==============================================
+
+class IntentEngine:
+    """check_query_intent 규칙을 미리 컴파일해서 실행하는 엔진"""
+
+    def __init__(self, keyword_sets: Optional[Dict[str, List[str]]] = None,
+                 product_names: Optional[List[str]] = None,
+                 cache_size: int = 256):
+        self.keyword_sets = keyword_sets or KEYWORD_SETS
+        self.product_names = product_names if product_names is not None else COMMON_PRODUCTS
+        self._product_rank = {name: i for i, name in enumerate(self.product_names)}
+
+        # 제품명도 같은 오토마톤에 "product_name" 분류로 넣어서 한 번에 찾음
+        self.automaton = KeywordAutomaton({**self.keyword_sets, "product_name": self.product_names})
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 웹 서버 스레드가 함께 쓰므로 캐시 조회/갱신은 잠금 안에서 (분류는 잠금 밖)
+        self._lock = threading.Lock()
+
+        # 실제 제품명/아이 이름 사전 (entity_gazetteer.EntityGazetteer, 선택)
+        self.gazetteer = None
+
+    def set_gazetteer(self, gazetteer):
+        """엔티티 사전 교체 (바뀐 경우에만 캐시 초기화)"""
+        if gazetteer is not self.gazetteer:
+            self.gazetteer = gazetteer
+            self.clear_cache()
+
+    def extract_person_name(self, query: str) -> str:
+        """질문에서 이름 추출"""
+        for pattern in NAME_PATTERNS:
+            match = pattern.search(query)
+            if match:
+                return match.group(1)
+
+        # 단순히 한글 이름만 있는 경우
+        for word in query.split():
+            if NAME_WORD_PATTERN.match(word):
+                return word
+
+        return ""
+
+    def check_query_intent(self, query: str) -> Dict[str, Any]:
+        """
+        질문 의도 파악 (최근 결과는 캐시에서 반환)
+
+        Returns:
+            {
+                "needs_db": bool,  # DB 검색 필요 여부
+                "intent": str,     # "child_info", "recent_activity", "product_info" 등
+                "params": dict,    # 검색 파라미터
+                "exact_entity": bool,  # 엔티티 사전과 정확히 일치한 경우에만 포함
+                "strict_match": bool   # 목록/최근 활동이 분명한 표현일 때만 포함
+            }
+        """
+        with self._lock:
+            cached = self._cache.get(query)
+            if cached is not None:
+                self._cache.move_to_end(query)
+                return _copy_intent(cached)
+
+        result = self._classify(query)
+
+        with self._lock:
+            self._cache[query] = result
+            self._cache.move_to_end(query)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return _copy_intent(result)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _classify(self, query: str) -> Dict[str, Any]:
+        # 질문 전체를 한 번만 훑어서 모든 분류의 매칭 위치를 수집
+        matches = list(self.automaton.iter_matches(query))
+        found: Dict[str, Set[str]] = {}
+        for _, _, keyword, labels in matches:
+            for label in labels:
+                found.setdefault(label, set()).add(keyword)
+
+        # 실제 카탈로그/명단에 있는 이름이 나오면 그 이름으로 바로 조회
+        # (목록/최근 활동 질문은 아래 키워드 규칙을 따름)
+        if self.gazetteer is not None and "list" not in found and not ("recent" in found and "activity" in found):
+            entity = self.gazetteer.longest_match(query)
+            if entity:
+                intent = "product_info" if "product" in entity.types else "child_info"
+                result = _intent(intent, {"name": entity.text})
+                result["exact_entity"] = True
+                return result
+
+        name = self.extract_person_name(query)
+
+        # 제품/상품 관련 질문 (우선순위 높음)
+        if "product" in found:
+            # 제품 키워드가 포함되지 않은 첫 번째 단어를 제품명으로 사용
+            product_spans = [(start, end) for start, end, _, labels in matches if "product" in labels]
+            for word_match in WORD_PATTERN.finditer(query):
+                word = word_match.group()
+                word_start, word_end = word_match.span()
+                if len(word) >= 2 and not any(
+                    word_start <= start and end <= word_end for start, end in product_spans
+                ):
+                    return _intent("product_info", {"name": word})
+
+        # 제품명이 직접 언급된 경우 (고추, 딸기, 포도 등)
+        if "product_name" in found:
+            product = min(found["product_name"], key=self._product_rank.__getitem__)
+            return _intent("product_info", {"name": product})
+
+        # 특정 아이 정보 질문
+        if name and "child" in found:
+            return _intent("child_info", {"name": name})
+
+        # 이름만 있는 경우도 검색 (예: "박지훈?" 또는 "박지훈 뭐야?")
+        if name and len(query.strip().split()) <= 3:
+            return _intent("child_info", {"name": name})
+
+        # 최신 활동 질문
+        if "recent" in found and "activity" in found:
+            return _strict(_intent("recent_activity", {"limit": 5}), query)
+
+        # 전체 목록 질문
+        if "list" in found:
+            # "몇 명", "현황" 등은 전체 목록 대신 집계만 조회
+            list_params = {"mode": "summary"} if "summary" in found else {}
+            if "list_product" in found:
+                return _strict(_intent("list_all_products", list_params), query)
+            return _strict(_intent("list_all", list_params), query)
+
+        # 기본: RAG만 사용
+        return {"needs_db": False, "intent": "general", "params": {}}
+
+
+def _intent(intent: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {"needs_db": True, "intent": intent, "params": params}
+
+
+def _strict(result: Dict[str, Any], query: str) -> Dict[str, Any]:
+    """분명한 목록/최근 활동 표현이면 strict_match 표시"""
+    pattern = STRICT_INTENT_PATTERNS.get(result["intent"])
+    if pattern is not None and pattern.search(query) and not HOWTO_PATTERN.search(query):
+        result["strict_match"] = True
+    return result
+
+
+def _copy_intent(result: Dict[str, Any]) -> Dict[str, Any]:
+    """캐시된 결과가 호출자 쪽에서 수정되지 않도록 복사"""
+    return {**result, "params": dict(result["params"])}
@@ -0,0 +1,121 @@
+"""
+임베딩 기반 의도 라우터
+작성일: 2025-11-28
+
+주요 기능:
+- 예시 질문으로 미리 만든 의도별 중심 벡터(centroid) 로드
+- 벡터 검색용으로 이미 계산한 질문 임베딩을 그대로 사용 (추가 API 호출 없음)
+- 가장 가까운 중심 벡터로 의도 선택, 확신이 낮으면 키워드 규칙 결과 유지
+
+중심 벡터 파일은 setup/build_intent_centroids.py로 만듭니다.
+"""
+
+import json
+import logging
+import math
+import os
+from operator import mul
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 라우터가 파라미터 없이 바로 바꿀 수 있는 의도
+_PARAMLESS_INTENTS = {
+    "general": {},
+    "list_all": {},
+    "list_all_products": {},
+    "recent_activity": {"limit": 5},
+}
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else list(vector)
+
+
+class IntentRouter:
+    """의도별 중심 벡터와 질문 임베딩의 코사인 유사도로 의도 선택"""
+
+    def __init__(self, centroids: Dict[str, List[float]], model: Optional[str] = None,
+                 min_similarity: float = 0.35, min_margin: float = 0.03):
+        self.centroids = {intent: _normalize(vector) for intent, vector in centroids.items()}
+        self.model = model
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+
+    @classmethod
+    def load(cls, file_path: str, expected_model: Optional[str] = None,
+             **kwargs) -> Optional["IntentRouter"]:
+        """
+        중심 벡터 파일 로드
+
+        파일이 없거나 임베딩 모델이 다르면 None (키워드 규칙만 사용)
+        """
+        if not file_path or not os.path.exists(file_path):
+            logger.info(f"[정보] 의도 중심 벡터 파일 없음 ({file_path}) - 키워드 규칙만 사용")
+            return None
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if expected_model and data.get("model") != expected_model:
+            logger.warning(f"[경고] 의도 중심 벡터 모델 불일치 ({data.get('model')} != {expected_model}) - 사용 안 함")
+            return None
+
+        router = cls(data["centroids"], model=data.get("model"), **kwargs)
+        logger.info(f"[완료] 의도 라우터 로드: {len(router.centroids)}개 의도")
+        return router
+
+    def classify(self, query_embedding: List[float]) -> Tuple[Optional[str], float, float]:
+        """
+        Returns:
+            (의도 또는 None, 최고 유사도, 2위와의 차이)
+            확신이 낮으면 의도는 None
+        """
+        query = _normalize(query_embedding)
+        scores = sorted(
+            ((sum(map(mul, query, centroid)), intent) for intent, centroid in self.centroids.items()),
+            reverse=True
+        )
+        if not scores:
+            return None, 0.0, 0.0
+
+        best_score, best_intent = scores[0]
+        margin = best_score - scores[1][0] if len(scores) > 1 else best_score
+        if best_score < self.min_similarity or margin < self.min_margin:
+            return None, best_score, margin
+        return best_intent, best_score, margin
+
+    def route(self, keyword_intent: Dict[str, Any], query_embedding: List[float],
+              name_extractor: Optional[Callable[[], str]] = None) -> Dict[str, Any]:
+        """
+        키워드 규칙 결과를 임베딩 분류로 보정
+
+        - 엔티티 사전 정확 일치는 그대로 사용
+        - 확신이 낮으면 키워드 결과 유지, 같은 의도면 router_agreed 표시
+        - 파라미터를 알 수 없는 의도(제품명 없는 product_info 등)로는 바꾸지 않음
+        """
+        if keyword_intent.get("exact_entity"):
+            return keyword_intent
+
+        intent, score, margin = self.classify(query_embedding)
+        if intent is None:
+            return keyword_intent
+        if intent == keyword_intent["intent"]:
+            return {**keyword_intent, "router_agreed": True}
+
+        if intent in _PARAMLESS_INTENTS:
+            params = dict(_PARAMLESS_INTENTS[intent])
+        elif intent == "child_info" and name_extractor and name_extractor():
+            params = {"name": name_extractor()}
+        else:
+            return keyword_intent
+
+        logger.info(f"[정보] 의도 보정: {keyword_intent['intent']} → {intent} "
+                    f"(유사도 {score:.3f}, 차이 {margin:.3f})")
+        return {
+            "needs_db": intent != "general",
+            "intent": intent,
+            "params": params,
+            "routed_by": "embedding"
+        }
@@ -0,0 +1,226 @@
+"""
+스트리밍 JSON 리더 - 대용량 phpMyAdmin JSON 내보내기용
+작성일: 2025-11-24
+
+주요 기능:
+- 파일 전체를 json.load 하지 않고 조금씩 읽으면서 파싱
+- "type": "table" 객체의 "data" 배열을 한 행씩 generator로 반환
+- 일반 JSON 배열(processed_data.json 등)도 원소 단위로 반환
+
+phpMyAdmin 내보내기 구조:
+    [
+        {"type": "header", ...},
+        {"type": "database", "name": "..."},
+        {"type": "table", "name": "...", "database": "...", "data": [{...}, {...}]}
+    ]
+"""
+
+import json
+import re
+from typing import Any, Dict, IO, Iterator, Tuple
+
+# phpMyAdmin 내보내기에서 데이터가 아닌 항목
+PHPMYADMIN_META_TYPES = ("header", "database")
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+# 숫자 뒤에 이어질 수 있는 문자 ("2." / "1e" 처럼 버퍼 끝에서 잘린 숫자 확인용)
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+
+class StreamingJSONReader:
+    """
+    텍스트 스트림 위에서 JSON 토큰을 순서대로 읽는 최소 파서
+
+    배열/객체의 구조 문자('[', '{', ',', ':')는 직접 처리하고,
+    개별 값은 json.JSONDecoder.raw_decode로 디코딩합니다.
+    버퍼에는 현재 처리 중인 값 하나 정도만 유지됩니다.
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = 1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """버퍼에 데이터 추가 (읽은 부분은 버림). 더 읽을 게 없으면 False"""
+        if self.eof:
+            return False
+
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+        # 큰 값 하나가 버퍼를 넘는 경우 재시도 횟수를 줄이기 위해 읽는 양을 늘림
+        chunk = self.fp.read(max(self.chunk_size, len(self.buffer)))
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """공백을 건너뛰고 다음 문자 반환 (파일 끝이면 빈 문자열)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        """다음 문자가 char인지 확인하고 소비"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON 형식 오류: '{char}' 위치에 '{found or 'EOF'}'")
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """다음 JSON 값 하나를 읽어서 반환"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            # 숫자/리터럴이 버퍼 끝에서 잘렸을 수 있으므로 다음 문자를 확인
+            # ("2.5"가 "2."에서 잘리면 raw_decode는 2까지만 읽으므로 남은 부분이 숫자 문자뿐이면 더 읽음)
+            if not self.eof and (
+                end == len(self.buffer)
+                or (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and _NUMBER_TAIL.match(self.buffer, end).end() == len(self.buffer))
+            ):
+                self._fill()
+                continue
+
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator[None]:
+        """
+        배열 원소 위치마다 한 번씩 멈춤
+
+        호출자는 매 반복마다 원소 하나를 직접 읽어야 합니다 (read_value 등).
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+
+        while True:
+            yield None
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"JSON 형식 오류: 배열 구분자 위치에 '{sep or 'EOF'}'")
+
+
+def _iter_object(reader: StreamingJSONReader) -> Iterator[Tuple[str, Any]]:
+    """
+    객체 하나를 읽으면서 이벤트 반환
+
+    - ("row", row): 테이블 객체의 data 배열 원소 (스트리밍)
+    - ("item", obj): 테이블이 아닌 객체 전체
+    - ("table_end", name): 테이블 객체 하나의 data 배열이 끝남
+    """
+    reader.expect("{")
+    obj: Dict[str, Any] = {}
+    streamed = False
+
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.read_value()
+            reader.expect(":")
+
+            # phpMyAdmin은 "type"을 "data"보다 먼저 쓰므로 이때는 행 단위로 스트리밍
+            if key == "data" and obj.get("type") == "table" and reader.peek() == "[":
+                for _ in reader.iter_array():
+                    yield "row", reader.read_value()
+                streamed = True
+            else:
+                obj[key] = reader.read_value()
+
+            sep = reader.peek()
+            reader.pos += 1
+            if sep == "}":
+                break
+            if sep != ",":
+                raise ValueError(f"JSON 형식 오류: 객체 구분자 위치에 '{sep or 'EOF'}'")
+
+    if streamed:
+        yield "table_end", obj.get("name")
+    elif obj.get("type") == "table" and isinstance(obj.get("data"), list):
+        # "data"가 "type"보다 먼저 나온 경우 (이미 메모리에 올라옴)
+        for row in obj["data"]:
+            yield "row", row
+        yield "table_end", obj.get("name")
+    else:
+        yield "item", obj
+
+
+def _iter_events(reader: StreamingJSONReader) -> Iterator[Tuple[str, Any]]:
+    """파일 최상위 값을 순회하며 이벤트 반환 (_iter_object 참고)"""
+    first = reader.peek()
+
+    if first == "[":
+        for _ in reader.iter_array():
+            if reader.peek() == "{":
+                yield from _iter_object(reader)
+            else:
+                yield "item", reader.read_value()
+    elif first == "{":
+        yield from _iter_object(reader)
+    elif first:
+        yield "item", reader.read_value()
+
+
+def iter_table_rows(file_path: str, first_table_only: bool = False,
+                    encoding: str = "utf-8") -> Iterator[Dict[str, Any]]:
+    """
+    phpMyAdmin JSON 내보내기에서 테이블 행을 하나씩 반환
+
+    Args:
+        file_path: JSON 파일 경로
+        first_table_only: True면 첫 번째 테이블만 읽고 중단 (기존 로더 동작)
+        encoding: 파일 인코딩
+
+    Yields:
+        테이블 행 (dict)
+    """
+    with open(file_path, "r", encoding=encoding) as f:
+        for event, value in _iter_events(StreamingJSONReader(f)):
+            if event == "row":
+                yield value
+            elif event == "table_end" and first_table_only:
+                return
+
+
+def iter_json_records(file_path: str, first_table_only: bool = True,
+                      encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    JSON 파일의 레코드를 하나씩 반환 (phpMyAdmin / 일반 배열 모두 지원)
+
+    - phpMyAdmin 형식: 테이블 행 (header/database 항목은 제외)
+    - 일반 배열: 배열 원소
+    - 단일 객체: 그 객체
+    """
+    with open(file_path, "r", encoding=encoding) as f:
+        for event, value in _iter_events(StreamingJSONReader(f)):
+            if event == "row":
+                yield value
+            elif event == "table_end":
+                if first_table_only:
+                    return
+            elif not (isinstance(value, dict) and value.get("type") in PHPMYADMIN_META_TYPES):
+                yield value
+
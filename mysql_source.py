@@ -0,0 +1,250 @@
+"""
+MySQL 직접 추출 - 서버 측 커서 스트리밍 + 테이블 병렬 읽기
+작성일: 2025-12-10
+
+주요 기능:
+- 서버 측(unbuffered) 커서로 행을 chunk_size개씩 받아서 반환 (테이블 전체를 메모리에 올리지 않음)
+- 설정된 컬럼만 SELECT (없는 컬럼은 경고 후 제외)
+- 기본 키 순서로 읽어서 실행할 때마다 같은 순서 (InnoDB는 기본 키 순서 읽기에 정렬 비용 없음)
+- 여러 테이블을 각자의 연결에서 동시에 읽고, 테이블마다 chunk를 번갈아 반환 (순서 고정)
+
+읽는 쪽(임베딩 등)이 느려서 다음 chunk를 늦게 가져가도 서버가 연결을 끊지 않도록
+스트리밍 연결은 net_write_timeout을 늘려서 사용합니다.
+"""
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# 한 테이블에서 미리 받아 둘 chunk 수 (읽는 쪽보다 앞서 가는 양 제한)
+_PREFETCH_CHUNKS = 2
+
+
+def _require_pymysql():
+    try:
+        import pymysql
+        import pymysql.cursors
+    except ImportError:
+        raise ImportError("MySQL 직접 추출에는 pymysql이 필요합니다. pip install pymysql")
+    return pymysql
+
+
+def _json_value(value: Any) -> Any:
+    """MySQL 값 → JSON으로 저장할 수 있는 값 (Supabase metadata / 추출 파일)"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("utf-8", errors="replace")
+    return value
+
+
+def json_safe_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{key: _json_value(value) for key, value in row.items()} for row in rows]
+
+
+def quote_identifier(name: str) -> str:
+    """테이블/컬럼 이름 → `이름` (백틱 이스케이프)"""
+    return "`" + str(name).replace("`", "``") + "`"
+
+
+def connect(db_config: Dict[str, Any], streaming: bool = False, net_write_timeout: int = 3600):
+    """
+    MySQL 연결
+
+    Args:
+        db_config: config.CAFE24_DB_CONFIG 형식
+        streaming: True면 서버 측 커서(SSDictCursor) - 행을 받는 만큼만 전송
+        net_write_timeout: 스트리밍 연결에서 서버가 다음 읽기를 기다리는 최대 시간 (초)
+    """
+    pymysql = _require_pymysql()
+    connection = pymysql.connect(
+        host=db_config["host"],
+        port=db_config.get("port", 3306),
+        user=db_config["user"],
+        password=db_config["password"],
+        database=db_config["database"],
+        charset=db_config.get("charset") or "utf8mb4",
+        cursorclass=pymysql.cursors.SSDictCursor if streaming else pymysql.cursors.DictCursor
+    )
+    if streaming:
+        with connection.cursor() as cursor:
+            cursor.execute("SET SESSION net_write_timeout = %s", (net_write_timeout,))
+    return connection
+
+
+def table_columns(connection, table: str) -> List[str]:
+    """테이블 컬럼 목록 (테이블이 없으면 빈 목록)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+            (table,)
+        )
+        return [row["COLUMN_NAME"] for row in cursor.fetchall()]
+
+
+def primary_key(connection, table: str) -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY' "
+            "ORDER BY ORDINAL_POSITION",
+            (table,)
+        )
+        return [row["COLUMN_NAME"] for row in cursor.fetchall()]
+
+
+@dataclass
+class TableQuery:
+    """테이블 하나 읽기 설정"""
+
+    key: str                        # 설정 이름 (DATA_EXTRACTION_CONFIG 키)
+    table: str
+    columns: List[str]
+    order_by: List[str] = field(default_factory=list)
+    where: Optional[str] = None     # 예: "updated_at > %s"
+    params: Sequence[Any] = ()
+    limit: Optional[int] = None
+
+    def sql(self) -> str:
+        sql = f"SELECT {', '.join(quote_identifier(c) for c in self.columns)} FROM {quote_identifier(self.table)}"
+        if self.where:
+            sql += f" WHERE {self.where}"
+        if self.order_by:
+            sql += f" ORDER BY {', '.join(quote_identifier(c) for c in self.order_by)}"
+        if self.limit:
+            sql += f" LIMIT {int(self.limit)}"
+        return sql
+
+
+def plan_query(connection, key: str, table: str, wanted_columns: Sequence[str]) -> Optional[TableQuery]:
+    """
+    설정 컬럼 중 실제로 있는 컬럼만 고르고 기본 키 순서로 읽는 TableQuery
+
+    기본 키는 순서 고정과 행 식별(증분 동기화)을 위해 항상 포함합니다.
+    테이블이 없거나 읽을 컬럼이 없으면 None.
+    """
+    existing = table_columns(connection, table)
+    if not existing:
+        logger.error(f"[오류] MySQL 테이블을 찾을 수 없습니다: {table} ({key})")
+        return None
+
+    wanted = list(dict.fromkeys(wanted_columns))
+    present = [column for column in wanted if column in existing]
+    missing = [column for column in wanted if column not in existing]
+    if missing:
+        logger.warning(f"[경고] {table}에 없는 컬럼은 제외합니다: {', '.join(missing)}")
+    if not present:
+        logger.error(f"[오류] {table}에서 읽을 컬럼이 없습니다 ({key})")
+        return None
+    key_columns = primary_key(connection, table)
+    columns = list(dict.fromkeys(key_columns + present))
+    return TableQuery(key=key, table=table, columns=columns, order_by=key_columns)
+
+
+def iter_row_chunks(db_config: Dict[str, Any], query: TableQuery,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    stop: Optional[threading.Event] = None,
+                    net_write_timeout: int = 3600) -> Iterator[List[Dict[str, Any]]]:
+    """서버 측 커서로 query 결과를 chunk_size개씩 반환"""
+    connection = connect(db_config, streaming=True, net_write_timeout=net_write_timeout)
+    finished = False
+    try:
+        cursor = connection.cursor()
+        cursor.execute(query.sql(), tuple(query.params))
+        while not (stop and stop.is_set()):
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                finished = True
+                break
+            yield json_safe_rows(rows)
+        if finished:
+            cursor.close()
+    finally:
+        # 중간에 멈추면 남은 행을 다 받지 않고 연결을 닫음 (SSCursor.close()는 남은 행을 전부 읽음)
+        connection.close()
+
+
+def fetch_rows(connection, query: TableQuery) -> List[Dict[str, Any]]:
+    """작은 조회(LIMIT / 기본 키 목록)를 한 번에 가져오기 (일반 연결)"""
+    with connection.cursor() as cursor:
+        cursor.execute(query.sql(), tuple(query.params))
+        return json_safe_rows(list(cursor.fetchall()))
+
+
+def iter_table_chunks(db_config: Dict[str, Any], queries: List[TableQuery],
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      workers: int = 4,
+                      net_write_timeout: int = 3600) -> Iterator[Tuple[TableQuery, List[Dict[str, Any]]]]:
+    """
+    여러 테이블을 동시에 읽어서 (TableQuery, 행 chunk)를 반환
+
+    테이블마다 연결 하나와 작은 버퍼(chunk 2개)를 쓰고, 테이블 순서대로 chunk를 하나씩
+    번갈아 반환합니다 (실행마다 같은 순서). workers개 테이블만 동시에 열어 둡니다.
+    한 테이블이라도 실패하면 예외를 그대로 올립니다 (일부만 읽은 결과로 인덱스를 바꾸지 않도록).
+    """
+    if workers <= 1 or len(queries) <= 1:
+        for query in queries:
+            for rows in iter_row_chunks(db_config, query, chunk_size,
+                                        net_write_timeout=net_write_timeout):
+                yield query, rows
+        return
+
+    stop = threading.Event()
+    done = object()
+
+    def produce(query: TableQuery, buffer: "queue.Queue"):
+        try:
+            for rows in iter_row_chunks(db_config, query, chunk_size, stop, net_write_timeout):
+                while not stop.is_set():
+                    try:
+                        buffer.put(rows, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+            buffer.put(done)
+        except Exception as e:
+            buffer.put(e)
+
+    pending = list(queries)
+    active: List[Tuple[TableQuery, "queue.Queue", threading.Thread]] = []
+    try:
+        while pending or active:
+            while pending and len(active) < workers:
+                query = pending.pop(0)
+                buffer: "queue.Queue" = queue.Queue(maxsize=_PREFETCH_CHUNKS)
+                thread = threading.Thread(target=produce, args=(query, buffer), daemon=True,
+                                          name=f"mysql-{query.table}")
+                thread.start()
+                active.append((query, buffer, thread))
+
+            for item in list(active):
+                query, buffer, _ = item
+                rows = buffer.get()
+                if rows is done:
+                    active.remove(item)
+                elif isinstance(rows, Exception):
+                    raise rows
+                else:
+                    yield query, rows
+    finally:
+        stop.set()
+        for _, buffer, thread in active:
+            # 멈춘 생산자가 put에서 기다리지 않도록 비워 줌
+            while thread.is_alive():
+                try:
+                    buffer.get(timeout=0.1)
+                except queue.Empty:
+                    pass
@@ -0,0 +1,363 @@
+"""
+이미지 OCR 단계 - 전처리 + 타일 병렬 인식 + 결과 캐시
+작성일: 2025-12-06
+
+주요 기능:
+- 전처리: EXIF 회전 보정, 긴 변 기준 축소(선택), 흑백 이진화(선택, Otsu 자동 임계값)
+- 세로로 아주 긴 이미지(영수증 사진 등)는 겹치는 가로 띠(타일)로 나눠 동시에 인식
+- OCR 결과를 (이미지 내용 해시 + OCR 설정) 키로 SQLite에 캐시 → 다시 실행하면 바로 반환
+- 이미지별 단계 시간(읽기 / 전처리 / OCR) 기록
+
+설정 (환경 변수, 프로세스 풀 작업자에도 그대로 전달됨):
+    OCR_LANG=kor+eng
+    OCR_MAX_SIDE=3000        # 긴 변이 이보다 크면 축소 (0이면 축소 안 함)
+    OCR_BINARIZE=0           # 1이면 이진화
+    OCR_THRESHOLD=           # 이진화 임계값 (비우면 Otsu 자동)
+    OCR_TILE_HEIGHT=2000     # 높이가 이 값의 1.5배를 넘으면 타일로 나눔 (0이면 나누지 않음)
+    OCR_TILE_OVERLAP=80      # 타일 경계에서 줄이 잘리지 않도록 겹치는 픽셀 수
+    OCR_TILE_WORKERS=4       # 타일 동시 인식 수
+    OCR_CACHE=1              # 0이면 캐시 사용 안 함
+    OCR_CACHE_PATH=.ocr_cache.sqlite3
+
+사용법 (설정 조정용, 이미지별 시간 출력):
+    python ocr_pipeline.py data/image/receipt.jpg --max-side 2000 --binarize
+    python ocr_pipeline.py clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_text (
+    key TEXT PRIMARY KEY,
+    settings TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+DEFAULT_CACHE_PATH = ".ocr_cache.sqlite3"
+
+
+def _require_ocr():
+    try:
+        from PIL import Image
+        import pytesseract
+    except ImportError:
+        raise ImportError("OCR에는 Pillow와 pytesseract가 필요합니다. pip install Pillow pytesseract")
+    return Image, pytesseract
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+@dataclass(frozen=True)
+class OCRSettings:
+    """OCR 설정 (workers를 제외한 값이 바뀌면 캐시 키도 바뀜)"""
+
+    lang: str = "kor+eng"
+    max_side: int = 3000
+    binarize: bool = False
+    threshold: Optional[int] = None
+    tile_height: int = 2000
+    tile_overlap: int = 80
+    tesseract_config: str = ""
+    workers: int = 4
+
+    @classmethod
+    def from_env(cls) -> "OCRSettings":
+        threshold = os.getenv("OCR_THRESHOLD", "").strip()
+        return cls(
+            lang=os.getenv("OCR_LANG", cls.lang),
+            max_side=_env_int("OCR_MAX_SIDE", cls.max_side),
+            binarize=os.getenv("OCR_BINARIZE", "0").lower() in ("1", "true", "yes"),
+            threshold=int(threshold) if threshold else None,
+            tile_height=_env_int("OCR_TILE_HEIGHT", cls.tile_height),
+            tile_overlap=_env_int("OCR_TILE_OVERLAP", cls.tile_overlap),
+            tesseract_config=os.getenv("OCR_TESSERACT_CONFIG", cls.tesseract_config),
+            workers=max(1, _env_int("OCR_TILE_WORKERS", cls.workers)),
+        )
+
+    def cache_settings(self) -> str:
+        settings = asdict(self)
+        settings.pop("workers")
+        return json.dumps(settings, sort_keys=True)
+
+
+@dataclass
+class OCRResult:
+    text: str
+    cached: bool = False
+    tiles: int = 0
+    original_size: Tuple[int, int] = (0, 0)
+    processed_size: Tuple[int, int] = (0, 0)
+    timings: Dict[str, float] = field(default_factory=dict)  # load / preprocess / ocr / total (초)
+
+    def summary(self) -> str:
+        """한 줄 요약 (예: 4.21초 = 전처리 0.35 + OCR 3.80, 4032x3024→3000x2250, 타일 2개)"""
+        total = self.timings.get("total", 0.0)
+        if self.cached:
+            return f"{total:.2f}초 (캐시)"
+        text = (f"{total:.2f}초 = 읽기 {self.timings.get('load', 0.0):.2f} + "
+                f"전처리 {self.timings.get('preprocess', 0.0):.2f} + OCR {self.timings.get('ocr', 0.0):.2f}")
+        if self.processed_size != self.original_size:
+            text += (f", {self.original_size[0]}x{self.original_size[1]}"
+                     f"→{self.processed_size[0]}x{self.processed_size[1]}")
+        if self.tiles > 1:
+            text += f", 타일 {self.tiles}개"
+        return text
+
+
+# ==============================================
+# 1. 캐시
+# ==============================================
+
+def cache_key(image_bytes: bytes, settings: OCRSettings) -> str:
+    digest = hashlib.sha256(image_bytes)
+    digest.update(b"\0" + settings.cache_settings().encode("utf-8"))
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """SQLite 파일 하나에 저장하는 OCR 결과 캐시 (여러 프로세스가 같은 파일을 써도 됨)"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM ocr_text WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, settings: OCRSettings, text: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_text (key, settings, text, created_at) VALUES (?, ?, ?, ?)",
+                (key, settings.cache_settings(), text, time.time())
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ocr_text").fetchone()[0]
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM ocr_text").rowcount
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ==============================================
+# 2. 전처리 / 타일
+# ==============================================
+
+def otsu_threshold(histogram: List[int]) -> int:
+    """회색조 히스토그램(256칸)에서 두 집단의 분산이 가장 커지는 임계값"""
+    total = sum(histogram)
+    if not total:
+        return 128
+    sum_all = sum(value * count for value, count in enumerate(histogram))
+    sum_background = 0.0
+    weight_background = 0
+    best_threshold, best_variance = 128, -1.0
+    for value, count in enumerate(histogram):
+        weight_background += count
+        if weight_background == 0:
+            continue
+        weight_foreground = total - weight_background
+        if weight_foreground == 0:
+            break
+        sum_background += value * count
+        mean_background = sum_background / weight_background
+        mean_foreground = (sum_all - sum_background) / weight_foreground
+        variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = value, variance
+    return best_threshold
+
+
+def preprocess(image, settings: OCRSettings):
+    """EXIF 회전 보정 → 축소 → (선택) 회색조 + 이진화"""
+    from PIL import Image, ImageOps
+
+    if settings.max_side and max(image.size) > settings.max_side:
+        # JPEG는 draft로 디코딩 단계에서 먼저 줄여서 전체 해상도 디코딩 생략
+        image.draft(image.mode, (settings.max_side, settings.max_side))
+    image = ImageOps.exif_transpose(image)
+    if settings.max_side and max(image.size) > settings.max_side:
+        image.thumbnail((settings.max_side, settings.max_side), Image.LANCZOS)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    if settings.binarize:
+        gray = image.convert("L")
+        threshold = settings.threshold if settings.threshold is not None else otsu_threshold(gray.histogram())
+        image = gray.point([0 if value <= threshold else 255 for value in range(256)])
+    return image
+
+
+def tile_boxes(width: int, height: int, tile_height: int, overlap: int) -> List[Tuple[int, int, int, int]]:
+    """세로로 긴 이미지를 겹치는 가로 띠로 나눈 영역 (작은 이미지는 전체 한 개)"""
+    if not tile_height or height <= tile_height * 1.5:
+        return [(0, 0, width, height)]
+    boxes = []
+    top = 0
+    while top < height:
+        bottom = min(top + tile_height, height)
+        # 마지막 띠가 너무 얇으면 앞 띠에 합침
+        if height - bottom < tile_height // 2:
+            bottom = height
+        boxes.append((0, max(0, top - overlap), width, bottom))
+        top = bottom
+    return boxes
+
+
+def merge_tile_texts(texts: List[str], max_overlap_lines: int = 3) -> str:
+    """겹친 영역 때문에 다음 타일 첫 줄에 반복된 줄 제거 후 합치기"""
+    merged: List[str] = []
+    for text in texts:
+        lines = text.strip().splitlines()
+        for size in range(min(max_overlap_lines, len(merged), len(lines)), 0, -1):
+            if [line.strip() for line in merged[-size:]] == [line.strip() for line in lines[:size]]:
+                lines = lines[size:]
+                break
+        merged.extend(lines)
+    return "\n".join(merged).strip()
+
+
+# ==============================================
+# 3. OCR 실행
+# ==============================================
+
+class OCRPipeline:
+    """
+    이미지 파일 → 텍스트
+
+    Args:
+        settings: OCR 설정 (None이면 환경 변수)
+        cache: OCR 결과 캐시 (None이면 캐시 없이 실행)
+    """
+
+    def __init__(self, settings: Optional[OCRSettings] = None, cache: Optional[OCRCache] = None):
+        self.settings = settings or OCRSettings.from_env()
+        self.cache = cache
+        if self.settings.workers > 1:
+            # 타일을 동시에 돌릴 때 tesseract 내부 스레드끼리 CPU를 다투지 않도록
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    def _recognize(self, image) -> str:
+        _, pytesseract = _require_ocr()
+        return pytesseract.image_to_string(image, lang=self.settings.lang,
+                                           config=self.settings.tesseract_config)
+
+    def run(self, path: str) -> OCRResult:
+        Image, _ = _require_ocr()
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        with open(path, "rb") as f:
+            image_bytes = f.read()
+        key = cache_key(image_bytes, self.settings)
+        if self.cache is not None:
+            text = self.cache.get(key)
+            if text is not None:
+                timings["total"] = time.perf_counter() - started
+                return OCRResult(text=text, cached=True, timings=timings)
+
+        with Image.open(path) as source:
+            original_size = source.size
+            timings["load"] = time.perf_counter() - started
+
+            step = time.perf_counter()
+            image = preprocess(source, self.settings)
+            image.load()
+            timings["preprocess"] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        boxes = tile_boxes(image.width, image.height, self.settings.tile_height, self.settings.tile_overlap)
+        if len(boxes) == 1:
+            text = self._recognize(image).strip()
+        else:
+            tiles = [image.crop(box) for box in boxes]
+            with ThreadPoolExecutor(max_workers=min(self.settings.workers, len(tiles))) as pool:
+                text = merge_tile_texts(list(pool.map(self._recognize, tiles)))
+        timings["ocr"] = time.perf_counter() - step
+
+        if self.cache is not None:
+            self.cache.put(key, self.settings, text)
+        timings["total"] = time.perf_counter() - started
+        return OCRResult(text=text, tiles=len(boxes), original_size=original_size,
+                         processed_size=image.size, timings=timings)
+
+
+_pipeline: Optional[OCRPipeline] = None
+
+
+def get_pipeline() -> OCRPipeline:
+    """프로세스마다 하나씩 만들어 쓰는 기본 파이프라인 (환경 변수 설정 + 캐시)"""
+    global _pipeline
+    if _pipeline is None:
+        cache = None
+        if os.getenv("OCR_CACHE", "1").lower() not in ("0", "false", "no"):
+            cache = OCRCache(os.getenv("OCR_CACHE_PATH", DEFAULT_CACHE_PATH))
+        _pipeline = OCRPipeline(cache=cache)
+    return _pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 OCR (설정별 시간 확인)")
+    parser.add_argument("images", nargs="+", help="이미지 경로 (또는 clear: 캐시 비우기)")
+    parser.add_argument("--max-side", type=int, help="긴 변 최대 픽셀 (0이면 축소 안 함)")
+    parser.add_argument("--binarize", action="store_true", help="이진화")
+    parser.add_argument("--tile-height", type=int, help="타일 높이 (0이면 나누지 않음)")
+    parser.add_argument("--workers", type=int, help="타일 동시 인식 수")
+    parser.add_argument("--no-cache", action="store_true", help="캐시 사용 안 함")
+    parser.add_argument("--show-text", action="store_true", help="인식한 텍스트 출력")
+    args = parser.parse_args()
+
+    cache_path = os.getenv("OCR_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if args.images == ["clear"]:
+        cache = OCRCache(cache_path)
+        print(f"🗑️ OCR 캐시 {cache.clear()}개 삭제 ({cache_path})")
+        cache.close()
+        return
+
+    settings = OCRSettings.from_env()
+    overrides = {"max_side": args.max_side, "tile_height": args.tile_height, "workers": args.workers}
+    settings = replace(settings, **{name: value for name, value in overrides.items() if value is not None})
+    if args.binarize:
+        settings = replace(settings, binarize=True)
+
+    cache = None if args.no_cache else OCRCache(cache_path)
+    pipeline = OCRPipeline(settings, cache)
+    for path in args.images:
+        result = pipeline.run(path)
+        print(f"🖼️ {path}: 글자 {len(result.text):,}개, {result.summary()}")
+        if args.show_text:
+            print(result.text + "\n")
+    if cache is not None:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+PDF 텍스트 추출 - 페이지 스트리밍 + 페이지 구간 병렬 처리
+작성일: 2025-12-05
+
+주요 기능:
+- 페이지를 하나씩 generator로 반환 (전체 페이지 목록을 만들지 않음)
+- 큰 문서는 페이지 구간으로 나눠 여러 프로세스에서 동시에 추출 (결과는 페이지 순서대로)
+- 설치된 가장 빠른 추출 엔진 자동 선택: PyMuPDF → pypdfium2 → PyPDF2
+
+엔진 지정: 환경 변수 PDF_BACKEND=pymupdf|pypdfium2|pypdf2 또는 backend 인자
+
+벤치마크: python benchmarks/bench_pdf_extract.py --pages 1000
+"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# 이보다 짧은 문서는 프로세스를 띄우는 비용이 더 커서 순차 추출
+MIN_PAGES_FOR_PARALLEL = 64
+DEFAULT_PAGES_PER_RANGE = 32
+
+
+# ==============================================
+# 1. 추출 엔진
+# ==============================================
+
+class PDFBackend:
+    """추출 엔진 공통 인터페이스 (문서 열기 / 페이지 수 / 페이지 텍스트)"""
+
+    name = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        raise NotImplementedError
+
+    def open(self, path: str):
+        raise NotImplementedError
+
+    def page_count(self, doc) -> int:
+        raise NotImplementedError
+
+    def page_text(self, doc, index: int) -> str:
+        raise NotImplementedError
+
+    def close(self, doc):
+        close = getattr(doc, "close", None)
+        if close:
+            close()
+
+
+class PdfiumBackend(PDFBackend):
+    name = "pypdfium2"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import pypdfium2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def open(self, path: str):
+        import pypdfium2
+        return pypdfium2.PdfDocument(path)
+
+    def page_count(self, doc) -> int:
+        return len(doc)
+
+    def page_text(self, doc, index: int) -> str:
+        page = doc[index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+
+
+class PyMuPDFBackend(PDFBackend):
+    name = "pymupdf"
+
+    @staticmethod
+    def _module():
+        try:
+            import pymupdf
+        except ImportError:
+            import fitz as pymupdf
+        return pymupdf
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            cls._module()
+            return True
+        except ImportError:
+            return False
+
+    def open(self, path: str):
+        return self._module().open(path)
+
+    def page_count(self, doc) -> int:
+        return doc.page_count
+
+    def page_text(self, doc, index: int) -> str:
+        return doc.load_page(index).get_text()
+
+
+class PyPDF2Backend(PDFBackend):
+    name = "pypdf2"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import PyPDF2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def open(self, path: str):
+        import PyPDF2
+        return PyPDF2.PdfReader(path)
+
+    def page_count(self, doc) -> int:
+        return len(doc.pages)
+
+    def page_text(self, doc, index: int) -> str:
+        return doc.pages[index].extract_text() or ""
+
+    def close(self, doc):
+        stream = getattr(doc, "stream", None)
+        if stream is not None:
+            stream.close()
+
+
+# 자동 선택 순서 (빠른 엔진 우선, benchmarks/bench_pdf_extract.py 기준)
+BACKENDS: Dict[str, Type[PDFBackend]] = {
+    PyMuPDFBackend.name: PyMuPDFBackend,
+    PdfiumBackend.name: PdfiumBackend,
+    PyPDF2Backend.name: PyPDF2Backend,
+}
+
+
+def available_backends() -> List[str]:
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def get_backend(name: Optional[str] = None) -> PDFBackend:
+    """
+    추출 엔진 선택
+
+    Raises:
+        ImportError: 사용할 수 있는 엔진이 없거나 지정한 엔진이 설치되지 않음
+    """
+    name = (name or os.getenv("PDF_BACKEND") or "").lower()
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"알 수 없는 PDF 엔진: {name} ({', '.join(BACKENDS)})")
+        if not BACKENDS[name].available():
+            raise ImportError(f"PDF 엔진 {name}이(가) 설치되지 않았습니다.")
+        return BACKENDS[name]()
+
+    for backend in BACKENDS.values():
+        if backend.available():
+            return backend()
+    raise ImportError("PDF 추출 엔진이 없습니다. pip install pypdfium2 (또는 PyMuPDF, PyPDF2)")
+
+
+# ==============================================
+# 2. 페이지 추출
+# ==============================================
+
+def _extract_range(path: str, backend_name: str, start: int, stop: int) -> List[str]:
+    """작업 프로세스: [start, stop) 구간 페이지 텍스트"""
+    backend = BACKENDS[backend_name]()
+    doc = backend.open(path)
+    try:
+        return [backend.page_text(doc, index) for index in range(start, stop)]
+    finally:
+        backend.close(doc)
+
+
+def page_count(path: str, backend: Optional[PDFBackend] = None) -> int:
+    """PDF 페이지 수"""
+    backend = backend or get_backend()
+    doc = backend.open(path)
+    try:
+        return backend.page_count(doc)
+    finally:
+        backend.close(doc)
+
+
+def _can_fork_workers() -> bool:
+    # multiprocessing.Pool 작업자(daemon)는 자식 프로세스를 만들 수 없음
+    return not multiprocessing.current_process().daemon
+
+
+def iter_pdf_pages(path: str, backend: Optional[PDFBackend] = None, workers: int = 1,
+                   pages_per_range: int = DEFAULT_PAGES_PER_RANGE,
+                   min_pages_for_parallel: int = MIN_PAGES_FOR_PARALLEL) -> Iterator[Tuple[int, str]]:
+    """
+    PDF 페이지 텍스트를 (페이지 번호(1부터), 텍스트) 순서대로 하나씩 반환
+
+    Args:
+        path: PDF 파일 경로
+        backend: 추출 엔진 (None이면 자동 선택)
+        workers: 동시에 추출할 프로세스 수 (1이면 순차)
+        pages_per_range: 작업 하나가 맡는 페이지 수
+        min_pages_for_parallel: 이 페이지 수 이상일 때만 병렬 추출
+    """
+    backend = backend or get_backend()
+    doc = backend.open(path)
+    try:
+        total = backend.page_count(doc)
+        parallel = workers > 1 and total >= min_pages_for_parallel and _can_fork_workers()
+        if not parallel:
+            for index in range(total):
+                yield index + 1, backend.page_text(doc, index)
+            return
+    finally:
+        # 병렬 추출이면 작업자가 각자 문서를 열기 때문에 여기서 닫음
+        backend.close(doc)
+
+    yield from _iter_parallel(path, backend.name, total, workers, pages_per_range)
+
+
+def _iter_parallel(path: str, backend_name: str, total: int, workers: int,
+                   pages_per_range: int) -> Iterator[Tuple[int, str]]:
+    """페이지 구간을 작업자에게 나눠 주고 페이지 순서대로 반환 (진행 중인 구간 수 제한)"""
+    ranges = [(start, min(start + pages_per_range, total)) for start in range(0, total, pages_per_range)]
+    max_in_flight = workers * 2
+    pending = []
+    next_range = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < max_in_flight:
+                start, stop = ranges[next_range]
+                pending.append((start, pool.submit(_extract_range, path, backend_name, start, stop)))
+                next_range += 1
+
+            start, future = pending.pop(0)
+            for offset, text in enumerate(future.result()):
+                yield start + offset + 1, text
@@ -0,0 +1,291 @@
+"""
+중간 데이터 파일 읽기/쓰기 (JSON / JSON Lines / Parquet)
+작성일: 2025-12-04
+
+주요 기능:
+- 형식 자동 감지: 확장자 + 내용 확인 (기존 .json 파일은 그대로 읽힘)
+- JSON Lines: 한 줄에 레코드 하나 (스트리밍 읽기, 이어 쓰기 가능)
+- Parquet: 압축 컬럼 형식 (Excel/MySQL 내보내기처럼 컬럼이 일정한 표 데이터용, pyarrow 필요)
+  metadata 같은 중첩 컬럼은 JSON 문자열로 저장 (행마다 키가 달라도 보존, 읽을 때 복원)
+- JSON 배열: 기존 형식 (phpMyAdmin 내보내기 포함, json_stream으로 스트리밍 읽기)
+
+형식 변환 (예: MySQL 내보내기를 Parquet으로):
+    python record_io.py data/children.json data/children.parquet --table-rows
+
+형식:
+    "json"    - [ {...}, {...} ]
+    "jsonl"   - {...}\\n{...}\\n   (.jsonl, .ndjson)
+    "parquet" - .parquet
+"""
+
+import json
+import os
+import textwrap
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from json_stream import iter_json_records, iter_table_rows
+
+FORMATS = ("json", "jsonl", "parquet")
+
+_EXTENSIONS = {
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+}
+
+# Parquet row group 크기 (스키마는 첫 row group에서 결정)
+PARQUET_ROW_GROUP_SIZE = 10000
+
+# dict / list 컬럼(metadata 등)은 JSON 문자열로 저장 - 스키마 메타데이터에 컬럼 목록 기록
+PARQUET_JSON_COLUMNS_KEY = b"record_io.json_columns"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet 형식에는 pyarrow가 필요합니다. pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def _sniff_text(file_path: str, encoding: str = "utf-8") -> str:
+    """내용으로 json / jsonl 구분 (확장자가 .json인데 실제로는 JSON Lines인 경우)"""
+    with open(file_path, "r", encoding=encoding) as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped.startswith("["):
+                return "json"
+            # 첫 줄이 그 자체로 완전한 JSON 객체면 JSON Lines
+            try:
+                json.loads(stripped)
+            except ValueError:
+                return "json"
+            return "jsonl" if stripped.startswith("{") else "json"
+    return "json"
+
+
+def detect_format(file_path: str) -> str:
+    ext = os.path.splitext(file_path)[1].lower()
+    fmt = _EXTENSIONS.get(ext)
+    if fmt == "parquet":
+        return fmt
+    with open(file_path, "rb") as f:
+        if f.read(4) == b"PAR1":
+            return "parquet"
+    return _sniff_text(file_path)
+
+
+def format_for_path(file_path: str, default: str = "json") -> str:
+    """쓰기용: 확장자로 형식 결정"""
+    return _EXTENSIONS.get(os.path.splitext(file_path)[1].lower(), default)
+
+
+def resolve_data_path(file_path: str) -> str:
+    """
+    설정된 경로가 없으면 같은 이름의 다른 형식 파일 찾기
+
+    예: data/processed_data.json이 없고 data/processed_data.jsonl이 있으면 그 경로
+    """
+    if os.path.exists(file_path):
+        return file_path
+    stem = os.path.splitext(file_path)[0]
+    for ext in (".jsonl", ".ndjson", ".parquet", ".json"):
+        if os.path.exists(stem + ext):
+            return stem + ext
+    return file_path
+
+
+# ==============================================
+# 읽기
+# ==============================================
+
+def _iter_jsonl(file_path: str, encoding: str) -> Iterator[Any]:
+    with open(file_path, "r", encoding=encoding) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{file_path} {line_no}번째 줄 JSON 오류: {str(e)}")
+
+
+def _iter_parquet(file_path: str, columns: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    _, pq = _require_pyarrow()
+    parquet_file = pq.ParquetFile(file_path)
+    schema_metadata = parquet_file.schema_arrow.metadata or {}
+    json_columns = json.loads(schema_metadata.get(PARQUET_JSON_COLUMNS_KEY, b"[]"))
+    for batch in parquet_file.iter_batches(columns=columns):
+        for record in batch.to_pylist():
+            for column in json_columns:
+                if record.get(column) is not None:
+                    record[column] = json.loads(record[column])
+            yield record
+
+
+def iter_records(file_path: str, fmt: Optional[str] = None, table_rows_only: bool = False,
+                 columns: Optional[List[str]] = None, encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    레코드를 하나씩 반환 (형식 자동 감지)
+
+    Args:
+        file_path: 파일 경로
+        fmt: 형식 (None이면 자동 감지)
+        table_rows_only: JSON 배열일 때 phpMyAdmin 첫 테이블 행만 읽기 (기존 로더 동작)
+        columns: Parquet에서 읽을 컬럼 (None이면 전체)
+    """
+    fmt = fmt or detect_format(file_path)
+    if fmt == "jsonl":
+        yield from _iter_jsonl(file_path, encoding)
+    elif fmt == "parquet":
+        yield from _iter_parquet(file_path, columns)
+    elif table_rows_only:
+        yield from iter_table_rows(file_path, first_table_only=True, encoding=encoding)
+    else:
+        yield from iter_json_records(file_path, encoding=encoding)
+
+
+# ==============================================
+# 쓰기
+# ==============================================
+
+def _write_json_array(file_path: str, records: Iterable[Any], indent: Optional[int]) -> int:
+    """
+    레코드를 하나씩 써서 JSON 배열 생성 (전체를 메모리에 올리지 않음)
+
+    indent가 있으면 json.dump(list, indent=...)와 같은 모양으로 저장합니다.
+    """
+    count = 0
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for record in records:
+            f.write(",\n" if count else "\n")
+            text = json.dumps(record, ensure_ascii=False, default=str, indent=indent)
+            f.write(textwrap.indent(text, " " * indent) if indent else text)
+            count += 1
+        f.write("\n]\n")
+    return count
+
+
+def _write_jsonl(file_path: str, records: Iterable[Any], append: bool) -> int:
+    count = 0
+    with open(file_path, "a" if append else "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, default=str))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def _encode_json_columns(batch: List[Dict[str, Any]], json_columns: List[str]) -> List[Dict[str, Any]]:
+    """dict / list 컬럼을 JSON 문자열로 (행마다 키가 달라도 그대로 보존)"""
+    encoded = []
+    for record in batch:
+        record = dict(record)
+        for column in json_columns:
+            if record.get(column) is not None:
+                record[column] = json.dumps(record[column], ensure_ascii=False, default=str)
+        encoded.append(record)
+    return encoded
+
+
+def _write_parquet(file_path: str, records: Iterable[Dict[str, Any]], compression: str) -> int:
+    """
+    레코드를 row group 단위로 Parquet 저장
+
+    중첩 컬럼(metadata 등)은 JSON 문자열로 저장합니다. 구조체로 저장하면 스키마가
+    첫 row group에서 정해져서 뒤에 나오는 행의 새 키가 사라지기 때문입니다.
+    """
+    pa, pq = _require_pyarrow()
+    iterator = iter(records)
+    writer = None
+    json_columns: List[str] = []
+    count = 0
+    try:
+        while True:
+            batch = list(islice(iterator, PARQUET_ROW_GROUP_SIZE))
+            if not batch:
+                break
+            if writer is None:
+                json_columns = sorted({column for record in batch for column, value in record.items()
+                                       if isinstance(value, (dict, list))})
+                table = pa.Table.from_pylist(_encode_json_columns(batch, json_columns))
+                schema = table.schema.with_metadata(
+                    {PARQUET_JSON_COLUMNS_KEY: json.dumps(json_columns).encode("utf-8")})
+                table = table.replace_schema_metadata(schema.metadata)
+                writer = pq.ParquetWriter(file_path, schema, compression=compression)
+            else:
+                extra = set().union(*batch) - set(writer.schema.names)
+                nested = {column for record in batch for column, value in record.items()
+                          if isinstance(value, (dict, list)) and column not in json_columns}
+                if extra:
+                    raise ValueError(f"Parquet 스키마에 없는 컬럼 {sorted(extra)} - "
+                                     f"컬럼이 일정하지 않은 데이터는 jsonl 형식을 사용하세요.")
+                if nested:
+                    raise ValueError(f"첫 row group에서 중첩 값이 아니던 컬럼 {sorted(nested)}에 dict / list - "
+                                     f"컬럼이 일정하지 않은 데이터는 jsonl 형식을 사용하세요.")
+                table = pa.Table.from_pylist(_encode_json_columns(batch, json_columns), schema=writer.schema)
+            writer.write_table(table)
+            count += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        # 빈 파일도 읽을 수 있게 빈 스키마로 저장
+        pq.write_table(pa.table({}), file_path, compression=compression)
+    return count
+
+
+def write_records(file_path: str, records: Iterable[Any], fmt: Optional[str] = None,
+                  append: bool = False, indent: Optional[int] = None,
+                  compression: str = "zstd") -> int:
+    """
+    레코드 저장
+
+    Args:
+        file_path: 저장 경로
+        records: 레코드 (리스트 또는 generator)
+        fmt: 형식 (None이면 확장자로 결정, 모르는 확장자는 json)
+        append: jsonl에서 기존 파일 뒤에 이어 쓰기
+        indent: json 배열 들여쓰기 (None이면 한 줄에 레코드 하나)
+        compression: parquet 압축 방식
+
+    Returns:
+        저장한 레코드 수
+    """
+    fmt = fmt or format_for_path(file_path)
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} ({', '.join(FORMATS)})")
+    if append and fmt != "jsonl":
+        raise ValueError("이어 쓰기는 jsonl 형식만 지원합니다.")
+
+    if fmt == "jsonl":
+        return _write_jsonl(file_path, records, append)
+    if fmt == "parquet":
+        return _write_parquet(file_path, records, compression)
+    return _write_json_array(file_path, records, indent)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="중간 데이터 파일 형식 변환")
+    parser.add_argument("source", help="원본 파일 (phpMyAdmin JSON / JSON / JSON Lines / Parquet)")
+    parser.add_argument("target", help="저장 경로 (확장자로 형식 결정: .json / .jsonl / .parquet)")
+    parser.add_argument("--table-rows", action="store_true",
+                        help="phpMyAdmin 내보내기에서 첫 테이블 행만 변환")
+    args = parser.parse_args()
+
+    count = write_records(args.target, iter_records(args.source, table_rows_only=args.table_rows))
+    print(f"{args.source} ({detect_format(args.source)}) → {args.target} "
+          f"({format_for_path(args.target)}): {count:,}개 레코드")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+파이프라인 실행기 - 파일 처리 → 테이블별 추출 → 임베딩을 한 번에
+작성일: 2025-12-12
+
+주요 기능:
+- 단계를 DAG로 구성하고, 앞 단계가 끝난 단계부터 동시에 실행 (최대 PIPELINE_CONFIG["jobs"]개)
+  - files: setup/file_processor_v2.py (파일은 단계 안에서 여러 프로세스로 병렬 처리)
+  - extract:<테이블>: 1_mysql_data_loader.py --table <테이블> (테이블마다 별도 프로세스)
+  - embed: 2_embedding_generator.py --input <테이블별 추출 결과...>
+- 입력(파일/폴더의 크기·수정 시각, 명령, 스크립트, config.py)이 지난 성공 때와 같으면 단계 건너뜀
+  (MySQL에서 읽는 단계는 입력을 알 수 없으므로 항상 실행)
+- 단계별 실행 시간, 행 수, 행/초, 최대 메모리(RSS) 보고 → .pipeline/report.json
+
+단계는 각자 프로세스로 실행하므로 최대 메모리는 단계별로 따로 측정됩니다 (Linux/macOS).
+단계 출력은 .pipeline/logs/<단계>.log에 저장하고, 실패하면 마지막 부분을 보여 줍니다.
+
+사용법:
+    python run_pipeline.py                  # 바뀐 단계만 실행
+    python run_pipeline.py --mysql          # 테이블을 MySQL에서 바로 추출
+    python run_pipeline.py --force          # 모든 단계 다시 실행
+    python run_pipeline.py --no-embed       # 추출까지만
+    python run_pipeline.py -- --offline     # -- 뒤의 인자는 2_embedding_generator.py에 전달
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from record_io import FORMATS
+
+# 설정 파일 임포트
+try:
+    from config import (
+        DATA_EXTRACTION_CONFIG,
+        EMBEDDING_CONFIG,
+        LOGGING_CONFIG,
+        PIPELINE_CONFIG
+    )
+except ImportError:
+    print("[오류] config.py 파일이 없습니다!")
+    print("[참고] config.example.py를 config.py로 복사하고 실제 값을 입력하세요.")
+    exit(1)
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent
+
+# 실패한 단계 로그에서 보여 줄 줄 수
+_LOG_TAIL_LINES = 20
+
+
+@dataclass
+class Stage:
+    """파이프라인 단계 하나 (별도 프로세스로 실행)"""
+
+    name: str
+    command: List[str]
+    inputs: List[str] = field(default_factory=list)       # 지문에 포함할 파일/폴더
+    outputs: List[str] = field(default_factory=list)      # 건너뛰려면 모두 있어야 함
+    depends_on: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)      # 입력 폴더에서 제외할 경로 (단계 자신의 출력 등)
+    always_run: bool = False                              # 입력을 알 수 없는 단계 (MySQL)
+    count_rows: Optional[Callable[[], Optional[int]]] = None
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str = "pending"         # ok / skipped / failed / blocked
+    seconds: float = 0.0
+    rows: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    returncode: Optional[int] = None
+    log: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        if self.rows is None or self.status != "ok" or not self.seconds:
+            return None
+        return self.rows / self.seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "seconds": round(self.seconds, 3),
+            "rows": self.rows,
+            "rows_per_second": round(self.rows_per_second, 1) if self.rows_per_second else None,
+            "peak_rss_mb": round(self.peak_rss_bytes / 1048576, 1) if self.peak_rss_bytes else None,
+            "returncode": self.returncode,
+            "log": self.log,
+        }
+
+
+# ==============================================
+# 입력 지문
+# ==============================================
+
+def _iter_input_files(path: Path, excluded: Sequence[Path]):
+    if path.is_file():
+        yield path
+        return
+    for file_path in sorted(path.rglob("*")):
+        resolved = file_path.resolve()
+        if file_path.is_file() and resolved not in excluded and not any(
+                parent in excluded for parent in resolved.parents):
+            yield file_path
+
+
+def fingerprint(stage: Stage) -> str:
+    """명령 + 입력 파일들의 (경로, 크기, 수정 시각) 해시"""
+    digest = hashlib.sha256(json.dumps(stage.command).encode("utf-8"))
+    excluded = [Path(path).resolve() for path in stage.exclude]
+    for input_path in stage.inputs:
+        path = Path(input_path)
+        if not path.exists():
+            digest.update(f"\0{input_path}\0missing".encode("utf-8"))
+            continue
+        for file_path in _iter_input_files(path, excluded):
+            stat = file_path.stat()
+            digest.update(f"\0{file_path}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ==============================================
+# 행 수 (단계 출력에서)
+# ==============================================
+
+def count_lines(path: str) -> Optional[int]:
+    """JSONL 레코드 수 (줄 수)"""
+    if not os.path.exists(path):
+        return None
+    lines = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+    return lines
+
+
+def manifest_records(output_path: str) -> Optional[int]:
+    """file_processor_v2 manifest의 파일별 레코드 수 합계"""
+    output = Path(output_path)
+    manifest_path = output.with_name(output.stem + ".manifest.json")
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        files = json.load(f).get("files", {})
+    return sum(entry.get("count", 0) for entry in files.values())
+
+
+def report_value(path: str, key: str) -> Optional[int]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get(key)
+
+
+# ==============================================
+# 단계 구성
+# ==============================================
+
+def build_stages(mysql: bool = False, embed: bool = True, embed_args: Sequence[str] = (),
+                 config: Dict[str, Any] = PIPELINE_CONFIG,
+                 extraction_config: Dict[str, Dict[str, Any]] = DATA_EXTRACTION_CONFIG) -> List[Stage]:
+    python = sys.executable
+    state_dir = Path(config["state_dir"])
+    files_output = Path(config["files_output"])
+    stages: List[Stage] = []
+
+    # 테이블별 추출: JSON 모드에서 파일 처리 결과를 읽는 테이블만 files 단계 뒤에 실행
+    extract_outputs = []
+    needs_files = False
+    for key, table_config in extraction_config.items():
+        output = str(state_dir / "extracted" / f"{key}.jsonl")
+        extract_outputs.append(output)
+        command = [python, "1_mysql_data_loader.py", "--table", key, "--output", output]
+        stage = Stage(
+            name=f"extract:{key}",
+            command=command,
+            outputs=[output],
+            inputs=["1_mysql_data_loader.py", "config.py"],
+            count_rows=lambda output=output: count_lines(output)
+        )
+        if mysql:
+            stage.command += ["--mysql", "--parallel-tables", "1"]
+            stage.always_run = True
+        else:
+            json_file = table_config.get("json_file", "")
+            stage.inputs.append(json_file)
+            if Path(json_file).resolve() == files_output.resolve():
+                stage.depends_on.append("files")
+                needs_files = True
+        stages.append(stage)
+
+    if needs_files:
+        outputs = [str(files_output.with_suffix("." + fmt)) for fmt in FORMATS]
+        stages.insert(0, Stage(
+            name="files",
+            command=[python, "setup/file_processor_v2.py", "--output", str(files_output),
+                     "--workers", str(config["file_workers"])],
+            inputs=["data", "setup/file_processor_v2.py"],
+            outputs=[str(files_output)],
+            exclude=outputs + [
+                str(files_output.with_name(files_output.stem + ".manifest.json")),
+                str(files_output.with_name(files_output.stem + ".parts")),
+            ],
+            count_rows=lambda: manifest_records(str(files_output))
+        ))
+
+    if embed:
+        stages.append(Stage(
+            name="embed",
+            command=[python, "2_embedding_generator.py", "--input", *extract_outputs, *embed_args],
+            inputs=extract_outputs + ["2_embedding_generator.py", "config.py"],
+            outputs=[EMBEDDING_CONFIG["report_file"]],
+            depends_on=[stage.name for stage in stages if stage.name.startswith("extract:")],
+            count_rows=lambda: report_value(EMBEDDING_CONFIG["report_file"], "chunks")
+        ))
+    return stages
+
+
+# ==============================================
+# 실행
+# ==============================================
+
+def run_command(command: List[str], log_path: Path):
+    """
+    명령 실행 → (종료 코드, 최대 RSS 바이트)
+
+    os.wait4로 이 프로세스(와 하위 프로세스) 중 가장 큰 RSS를 받습니다 (Windows는 None).
+    """
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    with open(log_path, "w", encoding="utf-8") as log:
+        process = subprocess.Popen(command, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT, env=env)
+        if not hasattr(os, "wait4"):
+            return process.wait(), None
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss: Linux는 KB, macOS는 바이트
+    peak = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return process.returncode, peak
+
+
+def _log_tail(log_path: Path) -> str:
+    try:
+        with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+            return "".join(f.readlines()[-_LOG_TAIL_LINES:])
+    except OSError:
+        return ""
+
+
+class PipelineRunner:
+    """
+    단계 DAG 실행
+
+    Args:
+        stages: build_stages() 결과 (depends_on은 같은 목록의 단계 이름)
+        jobs: 동시에 실행할 단계 수
+        force: 입력이 같아도 모든 단계 실행
+        state_dir: 지문 / 로그 / 보고서 저장 폴더
+    """
+
+    def __init__(self, stages: List[Stage], jobs: int = 4, force: bool = False,
+                 state_dir: str = PIPELINE_CONFIG["state_dir"]):
+        names = {stage.name for stage in stages}
+        for stage in stages:
+            unknown = [name for name in stage.depends_on if name not in names]
+            if unknown:
+                raise ValueError(f"{stage.name}: 알 수 없는 선행 단계 {', '.join(unknown)}")
+        self.stages = {stage.name: stage for stage in stages}
+        self.jobs = max(1, jobs)
+        self.force = force
+        self.state_dir = Path(state_dir)
+        self.state_path = self.state_dir / "state.json"
+        self.state: Dict[str, Dict[str, Any]] = {}
+        if self.state_path.exists():
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        self._check_cycles()
+
+    def _check_cycles(self):
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"단계 순환: {name}")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _save_state(self):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def run_stage(self, stage: Stage, upstream_ran: bool) -> StageResult:
+        result = StageResult(name=stage.name)
+        stage_fingerprint = fingerprint(stage)
+        previous = self.state.get(stage.name, {})
+        unchanged = (not self.force and not stage.always_run and not upstream_ran
+                     and previous.get("fingerprint") == stage_fingerprint
+                     and all(os.path.exists(path) for path in stage.outputs))
+        if unchanged:
+            result.status = "skipped"
+            result.rows = previous.get("rows")
+            return result
+
+        log_path = self.state_dir / "logs" / f"{stage.name.replace(':', '_')}.log"
+        result.log = str(log_path)
+        logger.info(f"[시작] {stage.name}: {' '.join(stage.command[1:])}")
+        started = time.perf_counter()
+        result.returncode, result.peak_rss_bytes = run_command(stage.command, log_path)
+        result.seconds = time.perf_counter() - started
+
+        if result.returncode != 0:
+            result.status = "failed"
+            logger.error(f"[오류] {stage.name} 실패 (종료 코드 {result.returncode}, 로그: {log_path})\n"
+                         f"{_log_tail(log_path)}")
+            return result
+
+        result.status = "ok"
+        result.rows = stage.count_rows() if stage.count_rows else None
+        # 입력 지문은 실행 전 값으로 저장 (실행 중에 입력이 바뀌었으면 다음에 다시 실행)
+        self.state[stage.name] = {"fingerprint": stage_fingerprint, "rows": result.rows,
+                                  "finished_at": time.time()}
+        logger.info(f"[완료] {stage.name}: {result.seconds:.1f}초")
+        return result
+
+    def run(self) -> Dict[str, StageResult]:
+        results: Dict[str, StageResult] = {}
+        pending = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    dependencies = [results.get(dependency) for dependency in stage.depends_on]
+                    if any(result and result.status in ("failed", "blocked") for result in dependencies):
+                        results[name] = StageResult(name=name, status="blocked")
+                        del pending[name]
+                    elif all(dependencies) and len(running) < self.jobs:
+                        upstream_ran = any(result.status == "ok" for result in dependencies)
+                        running[executor.submit(self.run_stage, stage, upstream_ran)] = name
+                        del pending[name]
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    if results[name].status == "ok":
+                        self._save_state()
+        return {name: results[name] for name in self.stages}
+
+
+def format_bytes(value: Optional[int]) -> str:
+    return f"{value / 1048576:,.0f} MB" if value else "-"
+
+
+def log_report(results: Dict[str, StageResult], wall_seconds: float):
+    logger.info("\n" + "="*50)
+    logger.info(f"[결과] 단계별 결과 (전체 {wall_seconds:.1f}초)")
+    logger.info("="*50)
+    logger.info(f"{'단계':<26}{'상태':<9}{'시간':>9}{'행 수':>12}{'행/초':>11}{'최대 메모리':>12}")
+    for result in results.values():
+        rows = f"{result.rows:,}" if result.rows is not None else "-"
+        rate = f"{result.rows_per_second:,.0f}" if result.rows_per_second else "-"
+        seconds = f"{result.seconds:.1f}초" if result.status in ("ok", "failed") else "-"
+        logger.info(f"{result.name:<26}{result.status:<9}{seconds:>9}{rows:>12}{rate:>11}"
+                    f"{format_bytes(result.peak_rss_bytes):>12}")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="파이프라인 실행 (파일 처리 → 테이블별 추출 → 임베딩)")
+    parser.add_argument("--mysql", action="store_true", help="테이블을 MySQL에서 바로 추출")
+    parser.add_argument("--force", action="store_true", help="입력이 같아도 모든 단계 다시 실행")
+    parser.add_argument("--no-embed", action="store_true", help="추출까지만 실행")
+    parser.add_argument("--jobs", type=int, default=PIPELINE_CONFIG["jobs"], help="동시에 실행할 단계 수")
+    parser.add_argument("embed_args", nargs="*", help="-- 뒤에 쓰면 2_embedding_generator.py에 전달")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=LOGGING_CONFIG["level"],
+        format=LOGGING_CONFIG["format"],
+        handlers=[
+            logging.FileHandler(LOGGING_CONFIG["file"]),
+            logging.StreamHandler()
+        ]
+    )
+
+    stages = build_stages(mysql=args.mysql, embed=not args.no_embed, embed_args=args.embed_args)
+    runner = PipelineRunner(stages, jobs=args.jobs, force=args.force)
+
+    logger.info("="*50)
+    logger.info(f"[시작] 파이프라인 실행 (단계 {len(stages)}개, 동시 {runner.jobs}개)")
+    logger.info("="*50)
+    started = time.perf_counter()
+    results = runner.run()
+    wall_seconds = time.perf_counter() - started
+
+    log_report(results, wall_seconds)
+    report_path = runner.state_dir / "report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"seconds": round(wall_seconds, 3),
+                   "stages": {name: result.to_dict() for name, result in results.items()}},
+                  f, ensure_ascii=False, indent=2)
+    logger.info(f"[보고서] {report_path}")
+
+    failed = [name for name, result in results.items() if result.status in ("failed", "blocked")]
+    if failed:
+        logger.error(f"[오류] 실패하거나 실행하지 못한 단계: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
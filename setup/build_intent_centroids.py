@@ -0,0 +1,69 @@
+"""
+의도 중심 벡터 생성 스크립트 (오프라인, 1회 실행)
+
+setup/intent_examples.json의 의도별 예시 질문을 임베딩하고
+의도마다 평균 벡터를 계산해서 intent_centroids.json으로 저장합니다.
+챗봇(4_chatbot_web.py)은 이 파일이 있으면 임베딩 기반 의도 보정을 사용합니다.
+
+예시 질문을 추가/수정했거나 임베딩 모델을 바꿨다면 다시 실행하세요.
+
+사용법:
+    python setup/build_intent_centroids.py
+    python setup/build_intent_centroids.py --examples my_examples.json --output intent_centroids.json
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    from langchain_openai import OpenAIEmbeddings
+    from config import OPENAI_API_KEY, EMBEDDING_CONFIG, INTENT_ROUTER_CONFIG
+
+    parser = argparse.ArgumentParser(description="의도 중심 벡터 생성")
+    parser.add_argument("--examples", default=str(Path(__file__).parent / "intent_examples.json"),
+                        help="의도별 예시 질문 JSON")
+    parser.add_argument("--output", default=INTENT_ROUTER_CONFIG["centroids_file"],
+                        help="중심 벡터 저장 경로")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🧭 의도 중심 벡터 생성")
+    print("=" * 60)
+
+    with open(args.examples, "r", encoding="utf-8") as f:
+        examples = json.load(f)
+
+    embeddings = OpenAIEmbeddings(
+        model=EMBEDDING_CONFIG["model"],
+        openai_api_key=OPENAI_API_KEY
+    )
+
+    centroids = {}
+    for intent, questions in examples.items():
+        vectors = embeddings.embed_documents(questions)
+        dimension = len(vectors[0])
+        centroids[intent] = [
+            sum(vector[i] for vector in vectors) / len(vectors)
+            for i in range(dimension)
+        ]
+        print(f"  - {intent}: 예시 {len(questions)}개")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "model": EMBEDDING_CONFIG["model"],
+            "created_at": datetime.now().isoformat(),
+            "example_counts": {intent: len(questions) for intent, questions in examples.items()},
+            "centroids": centroids
+        }, f)
+
+    print(f"\n✅ 저장 완료: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
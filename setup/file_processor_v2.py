@@ -8,24 +8,54 @@ data/ 폴더의 다양한 파일을 처리합니다.
 2. 구조화 모드: data/json/, data/pdf/ 등 → 폴더별 처리
 
 지원 형식:
-- JSON, PDF, 이미지, Word, Excel
+- JSON, PDF, 이미지, Word, Excel(모든 시트), CSV
 
 사용법:
     python setup/file_processor_v2.py
+    python setup/file_processor_v2.py --workers 8 --timeout 600
+    python setup/file_processor_v2.py --workers 1   # 순차 처리
+    python setup/file_processor_v2.py --full        # manifest 무시하고 전체 다시 처리
+
+파일은 CPU 코어 수만큼의 프로세스에서 병렬로 처리하고 (OCR, PDF 추출),
+결과는 항상 같은 순서(형식 → 경로 순)로 합칩니다.
+큰 PDF(pdf_extract.MIN_PAGES_FOR_PARALLEL 페이지 이상)는 풀 작업자 안에서는 페이지 단위로 나눌 수
+없으므로, 다른 파일이 끝난 뒤 메인 프로세스에서 페이지 구간별로 병렬 추출합니다.
+
+결과 형식은 --output 확장자로 정합니다 (.json / .jsonl / .parquet).
+파일별 레코드는 처리하는 대로 data/processed_data.parts/에 JSONL로 쓰고, 마지막에 하나씩
+읽어서 합치므로 큰 스프레드시트도 메모리 사용량이 일정합니다.
+처리 결과는 data/processed_data.manifest.json에 파일별(경로, 크기, 수정 시각, 해시)로
+기록되며, 다음 실행에서는 추가/변경된 파일만 다시 처리하고 삭제된 파일의 레코드는 뺍니다.
 """
 
 import os
+import sys
 import json
+import time
+import hashlib
+import importlib.util
+import argparse
+import multiprocessing
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 import mimetypes
 
+# 프로젝트 루트 모듈 임포트 (python setup/file_processor_v2.py 로 실행 시)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ocr_pipeline import get_pipeline as get_ocr_pipeline
+from pdf_extract import MIN_PAGES_FOR_PARALLEL, get_backend, iter_pdf_pages, page_count
+from record_io import FORMATS, format_for_path, iter_records, write_records
+from spreadsheet_reader import iter_spreadsheet_rows
+
 def get_file_type(file_path: Path) -> str:
     """파일 형식 자동 감지"""
     ext = file_path.suffix.lower()
     
     type_map = {
         '.json': 'json',
+        '.jsonl': 'json',
+        '.ndjson': 'json',
         '.pdf': 'pdf',
         '.png': 'image',
         '.jpg': 'image',
@@ -33,6 +63,7 @@ def get_file_type(file_path: Path) -> str:
         '.gif': 'image',
         '.docx': 'word',
         '.xlsx': 'excel',
+        '.xlsm': 'excel',
         '.xls': 'excel',
         '.csv': 'csv',
     }
@@ -42,93 +73,84 @@ def get_file_type(file_path: Path) -> str:
 def process_json_file(file_path: Path, folder_name: str = None) -> List[Dict[str, Any]]:
     """JSON 파일 처리"""
     print(f"  📄 JSON: {file_path.name}")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # phpMyAdmin 형식 처리
-    if isinstance(data, list) and len(data) > 0:
-        for item in data:
-            if item.get("type") == "table" and "data" in item:
-                data = item["data"]
-                break
-    
-    # 리스트가 아니면 리스트로 변환
-    if not isinstance(data, list):
-        data = [data]
-    
-    # 메타데이터 추가
-    for item in data:
+    
+    # phpMyAdmin 형식이면 테이블 행, 일반 배열/JSON Lines면 원소를 하나씩 읽음
+    data = []
+    for item in iter_records(str(file_path)):
+        # 메타데이터 추가
         if isinstance(item, dict):
             item['_source_type'] = 'json'
             item['_source_file'] = str(file_path)
             if folder_name:
                 item['_source_folder'] = folder_name
+        data.append(item)
     
     return data
 
-def process_pdf_file(file_path: Path, folder_name: str = None) -> List[Dict[str, Any]]:
-    """PDF 파일 처리"""
+def iter_pdf_records(file_path: Path, folder_name: str = None) -> Iterator[Dict[str, Any]]:
+    """
+    PDF 페이지를 하나씩 레코드로 반환
+    
+    큰 문서는 페이지 구간별로 여러 프로세스에서 추출합니다 (pdf_extract 참고).
+    이미 프로세스 풀 작업자 안에서 실행 중이면 순차로 추출합니다.
+    """
+    count = 0
+    for page_num, text in iter_pdf_pages(str(file_path), workers=os.cpu_count() or 1):
+        if text.strip():
+            count += 1
+            yield {
+                "id": f"{file_path.stem}_page_{page_num}",
+                "title": f"{file_path.stem} - 페이지 {page_num}",
+                "content": text.strip(),
+                "source": str(file_path),
+                "page": page_num,
+                "_source_type": "pdf",
+                "_source_file": str(file_path),
+                "_source_folder": folder_name or "root"
+            }
+    
+    print(f"    ✅ {count}개 페이지 추출됨")
+
+def process_pdf_file(file_path: Path, folder_name: str = None) -> Iterator[Dict[str, Any]]:
+    """PDF 파일 처리 (페이지를 추출하는 대로 반환)"""
     print(f"  📕 PDF: {file_path.name}")
     
     try:
-        import PyPDF2
+        get_backend()
     except ImportError:
-        print("    ⚠️ PyPDF2가 설치되지 않았습니다. pip install PyPDF2")
+        print("    ⚠️ PDF 추출 엔진이 설치되지 않았습니다. pip install pypdfium2 (또는 PyPDF2)")
         return []
     
-    documents = []
-    with open(file_path, 'rb') as f:
-        pdf_reader = PyPDF2.PdfReader(f)
-        
-        for page_num, page in enumerate(pdf_reader.pages):
-            text = page.extract_text()
-            if text.strip():
-                documents.append({
-                    "id": f"{file_path.stem}_page_{page_num + 1}",
-                    "title": f"{file_path.stem} - 페이지 {page_num + 1}",
-                    "content": text.strip(),
-                    "source": str(file_path),
-                    "page": page_num + 1,
-                    "_source_type": "pdf",
-                    "_source_file": str(file_path),
-                    "_source_folder": folder_name or "root"
-                })
-    
-    print(f"    ✅ {len(documents)}개 페이지 추출됨")
-    return documents
+    return iter_pdf_records(file_path, folder_name)
 
 def process_image_file(file_path: Path, folder_name: str = None) -> List[Dict[str, Any]]:
-    """이미지 파일 처리 (OCR)"""
+    """이미지 파일 처리 (OCR - 전처리/타일/캐시는 ocr_pipeline.py, 설정은 OCR_* 환경 변수)"""
     print(f"  🖼️ 이미지: {file_path.name}")
     
-    try:
-        from PIL import Image
-        import pytesseract
-    except ImportError:
+    # 설치 여부만 확인 (실제 import는 ocr_pipeline에서)
+    if importlib.util.find_spec("PIL") is None or importlib.util.find_spec("pytesseract") is None:
         print("    ⚠️ PIL 또는 pytesseract가 설치되지 않았습니다.")
         print("    pip install Pillow pytesseract")
         return []
     
-    try:
-        image = Image.open(file_path)
-        text = pytesseract.image_to_string(image, lang='kor+eng')
-        
-        if text.strip():
-            return [{
-                "id": file_path.stem,
-                "title": file_path.stem,
-                "content": text.strip(),
-                "source": str(file_path),
-                "type": "image_ocr",
-                "_source_type": "image",
-                "_source_file": str(file_path),
-                "_source_folder": folder_name or "root"
-            }]
-        else:
-            print("    ⚠️ 텍스트를 추출할 수 없습니다")
-            return []
-    except Exception as e:
-        print(f"    ❌ OCR 실패: {str(e)}")
+    # OCR 오류는 process_file에서 실패로 기록 (다음 실행에서 다시 처리)
+    result = get_ocr_pipeline().run(str(file_path))
+    print(f"    ⏱️ {result.summary()}")
+    text = result.text
+    
+    if text.strip():
+        return [{
+            "id": file_path.stem,
+            "title": file_path.stem,
+            "content": text.strip(),
+            "source": str(file_path),
+            "type": "image_ocr",
+            "_source_type": "image",
+            "_source_file": str(file_path),
+            "_source_folder": folder_name or "root"
+        }]
+    else:
+        print("    ⚠️ 텍스트를 추출할 수 없습니다")
         return []
 
 def process_docx_file(file_path: Path, folder_name: str = None) -> List[Dict[str, Any]]:
@@ -157,31 +179,310 @@ def process_docx_file(file_path: Path, folder_name: str = None) -> List[Dict[str
         }]
     return []
 
-def process_excel_file(file_path: Path, folder_name: str = None) -> List[Dict[str, Any]]:
-    """Excel 파일 처리"""
+def iter_spreadsheet_records(file_path: Path, folder_name: str = None,
+                             source_type: str = 'excel') -> Iterator[Dict[str, Any]]:
+    """
+    Excel(모든 시트) / CSV 행을 하나씩 레코드로 반환
+    
+    행을 읽는 대로 내보내므로 시트 크기와 상관없이 메모리 사용량이 일정합니다
+    (spreadsheet_reader 참고).
+    """
+    count = 0
+    sheets = set()
+    for sheet, row_number, record in iter_spreadsheet_rows(str(file_path)):
+        if sheet is not None:
+            record['_sheet'] = sheet
+            sheets.add(sheet)
+        record['_row'] = row_number
+        record['_source_type'] = source_type
+        record['_source_file'] = str(file_path)
+        record['_source_folder'] = folder_name or "root"
+        count += 1
+        yield record
+    
+    sheet_info = f" (시트 {len(sheets)}개)" if sheets else ""
+    print(f"    ✅ {count}개 행 추출됨{sheet_info}")
+
+def process_excel_file(file_path: Path, folder_name: str = None) -> Iterator[Dict[str, Any]]:
+    """Excel 파일 처리 (모든 시트, 읽기 전용 스트리밍)"""
     print(f"  📊 Excel: {file_path.name}")
     
+    module = 'xlrd' if file_path.suffix.lower() == '.xls' else 'openpyxl'
     try:
-        import pandas as pd
+        __import__(module)
     except ImportError:
-        print("    ⚠️ pandas가 설치되지 않았습니다. pip install pandas openpyxl")
+        print(f"    ⚠️ {module}가 설치되지 않았습니다. pip install {module}")
         return []
     
-    df = pd.read_excel(file_path)
-    records = df.to_dict('records')
+    return iter_spreadsheet_records(file_path, folder_name, 'excel')
+
+def process_csv_file(file_path: Path, folder_name: str = None) -> Iterator[Dict[str, Any]]:
+    """CSV 파일 처리 (블록 단위 스트리밍, 인코딩/구분자 자동 감지)"""
+    print(f"  📊 CSV: {file_path.name}")
+    return iter_spreadsheet_records(file_path, folder_name, 'csv')
+
+# 처리 순서 (결과 병합 순서)
+PROCESSOR_ORDER = ['json', 'pdf', 'image', 'word', 'excel', 'csv']
+
+PROCESSORS = {
+    'json': process_json_file,
+    'pdf': process_pdf_file,
+    'image': process_image_file,
+    'word': process_docx_file,
+    'excel': process_excel_file,
+    'csv': process_csv_file,
+}
+
+def part_name(path: str) -> str:
+    """파일별 결과(part) 파일 이름 - 경로로 정해서 다시 처리하면 같은 파일을 덮어씀"""
+    return hashlib.sha1(path.encode('utf-8')).hexdigest()[:16] + '.jsonl'
+
+def process_file(task: Tuple[str, str, str], parts_dir: str) -> Dict[str, Any]:
+    """
+    파일 하나 처리 (작업 프로세스에서 실행)
     
-    # 메타데이터 추가
-    for record in records:
-        record['_source_type'] = 'excel'
-        record['_source_file'] = str(file_path)
-        record['_source_folder'] = folder_name or "root"
+    레코드는 만들어지는 대로 parts_dir의 JSONL 파일에 쓰고 개수만 돌려주므로
+    (프로세스 간에 레코드 목록을 주고받지 않음) 큰 파일도 메모리 사용량이 일정합니다.
+    예외는 여기서 잡아서 결과로 돌려주므로 한 파일이 실패해도 다른 파일에 영향 없음
+    """
+    file_type, path, folder_name = task
+    started = time.perf_counter()
+    part = part_name(path)
+    part_path = Path(parts_dir) / part
+    tmp_path = part_path.with_name(part + '.tmp')
+    try:
+        count = write_records(str(tmp_path), PROCESSORS[file_type](Path(path), folder_name), fmt='jsonl')
+        os.replace(tmp_path, part_path)
+        error = None
+    except Exception as e:
+        count = 0
+        part = None
+        error = str(e)
+        print(f"  ❌ 처리 실패 ({Path(path).name}): {error}")
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return {"count": count, "part": part, "error": error, "elapsed": time.perf_counter() - started}
+
+def build_tasks(files_by_type: Dict[str, List[Dict[str, Any]]]) -> List[Tuple[str, str, str]]:
+    """처리할 파일 목록 (형식 → 경로 순으로 정렬해서 실행마다 같은 순서)"""
+    tasks = []
+    for file_type in PROCESSOR_ORDER:
+        for file_info in sorted(files_by_type.get(file_type, []), key=lambda info: str(info['path'])):
+            tasks.append((file_type, str(file_info['path']), file_info['folder']))
+    return tasks
+
+def is_large_pdf(task: Tuple[str, str, str]) -> bool:
+    """페이지 구간 병렬 추출 대상인 PDF (페이지 수를 알 수 없으면 False - 작업자에서 오류 기록)"""
+    file_type, path, _ = task
+    if file_type != 'pdf':
+        return False
+    try:
+        return page_count(path) >= MIN_PAGES_FOR_PARALLEL
+    except Exception:
+        return False
+
+def run_tasks(tasks: List[Tuple[str, str, str]], workers: int,
+              timeout: float, parts_dir: Path) -> List[Dict[str, Any]]:
+    """
+    파일 처리 (결과는 tasks 순서)
+    
+    풀 작업자(daemon)는 자식 프로세스를 만들 수 없어 큰 PDF의 페이지 병렬 추출이 꺼지므로,
+    큰 PDF는 나머지 파일을 풀에서 처리한 뒤 메인 프로세스에서 하나씩 처리합니다
+    (페이지 구간마다 작업자 사용, 시간 제한 없음).
+    """
+    if workers == 1:
+        return run_sequential(tasks, parts_dir)
     
-    print(f"    ✅ {len(records)}개 행 추출됨")
-    return records
+    large = {index for index, task in enumerate(tasks) if is_large_pdf(task)}
+    small = [index for index in range(len(tasks)) if index not in large]
+    results: List[Dict[str, Any]] = [None] * len(tasks)
+    if small:
+        small_results = run_parallel([tasks[index] for index in small],
+                                     max(1, min(workers, len(small))), timeout, parts_dir)
+        for index, result in zip(small, small_results):
+            results[index] = result
+    for index in sorted(large):
+        results[index] = process_file(tasks[index], str(parts_dir))
+    return results
+
+def run_sequential(tasks: List[Tuple[str, str, str]], parts_dir: Path) -> List[Dict[str, Any]]:
+    return [process_file(task, str(parts_dir)) for task in tasks]
 
-def scan_directory(base_path: Path) -> Dict[str, List[Path]]:
+def run_parallel(tasks: List[Tuple[str, str, str]], workers: int,
+                 timeout: float, parts_dir: Path) -> List[Dict[str, Any]]:
     """
-    디렉토리 스캔
+    프로세스 풀에서 파일 처리
+    
+    - 작업자 수만큼만 제출해서 제출 시점 = 시작 시점 (시간 제한 계산용)
+    - 시간 제한을 넘긴 파일은 실패로 기록하고, 멈춘 작업자를 정리하기 위해
+      풀을 새로 만들어 진행 중이던 다른 파일을 다시 제출
+    - 결과는 tasks 순서 그대로 반환
+    """
+    results: List[Dict[str, Any]] = [None] * len(tasks)
+    queue = list(range(len(tasks)))
+    queue.reverse()  # pop()으로 앞에서부터 꺼냄
+    in_flight: Dict[int, Tuple[Any, float]] = {}
+    
+    def new_pool():
+        # OCR 라이브러리 메모리 누수 대비로 작업자를 주기적으로 교체
+        return multiprocessing.Pool(processes=workers, maxtasksperchild=50)
+    
+    pool = new_pool()
+    try:
+        while queue or in_flight:
+            while queue and len(in_flight) < workers:
+                index = queue.pop()
+                in_flight[index] = (pool.apply_async(process_file, (tasks[index], str(parts_dir))), time.monotonic())
+            
+            time.sleep(0.05)
+            now = time.monotonic()
+            expired = []
+            for index, (async_result, started) in list(in_flight.items()):
+                if async_result.ready():
+                    del in_flight[index]
+                    try:
+                        results[index] = async_result.get()
+                    except Exception as e:
+                        results[index] = {"count": 0, "part": None, "error": str(e), "elapsed": now - started}
+                elif now - started > timeout:
+                    expired.append(index)
+            
+            if expired:
+                for index in expired:
+                    _, started = in_flight.pop(index)
+                    results[index] = {"count": 0, "part": None, "error": f"시간 초과 ({timeout:.0f}초)",
+                                      "elapsed": now - started}
+                    print(f"  ⏱️ 시간 초과: {Path(tasks[index][1]).name}")
+                # 멈춘 작업자 종료 후 진행 중이던 파일은 다시 제출
+                pool.terminate()
+                pool.join()
+                for index in sorted(in_flight, reverse=True):
+                    queue.append(index)
+                in_flight.clear()
+                pool = new_pool()
+    finally:
+        pool.terminate()
+        pool.join()
+    
+    return results
+
+# ==============================================
+# 증분 처리 manifest
+# ==============================================
+
+# 처리 방식이 바뀌면 올려서 기존 manifest 무효화
+MANIFEST_VERSION = 2
+
+def file_hash(file_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path: Path) -> Dict[str, Dict[str, Any]]:
+    """파일 경로 → {size, mtime_ns, sha256, type, folder, count, part, error}"""
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ manifest를 읽을 수 없어 전체 다시 처리합니다: {str(e)}")
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        print("⚠️ manifest 버전이 달라 전체 다시 처리합니다.")
+        return {}
+    return manifest.get('files', {})
+
+def write_json_atomic(path: Path, data: Any, **kwargs):
+    """임시 파일에 쓴 뒤 교체 (중간에 중단돼도 기존 파일 유지)"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=str, **kwargs)
+    os.replace(tmp_path, path)
+
+def write_records_atomic(path: Path, records: Iterable[Any], **kwargs) -> int:
+    """write_records를 임시 파일에 한 뒤 교체 (형식은 원래 경로의 확장자 기준)"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    count = write_records(str(tmp_path), records, fmt=format_for_path(str(path)), **kwargs)
+    os.replace(tmp_path, path)
+    return count
+
+def plan_incremental(tasks: List[Tuple[str, str, str]], manifest: Dict[str, Dict[str, Any]],
+                     parts_dir: Path) -> Tuple[List[int], Dict[str, int]]:
+    """
+    다시 처리할 파일 찾기
+    
+    크기/수정 시각이 같으면 변경 없음으로 보고, 다르면 해시까지 비교합니다
+    (복사/touch로 시각만 바뀐 파일은 다시 처리하지 않음). 지난번 실패한 파일과
+    결과(part) 파일이 없어진 파일은 다시 처리합니다.
+    
+    Returns:
+        (다시 처리할 tasks 인덱스, {"added", "modified", "unchanged", "deleted"})
+    """
+    changed = []
+    counts = {"added": 0, "modified": 0, "unchanged": 0, "deleted": 0}
+    
+    for index, (file_type, path, folder_name) in enumerate(tasks):
+        stat = os.stat(path)
+        entry = manifest.get(path)
+        if entry is None:
+            counts["added"] += 1
+            changed.append(index)
+            continue
+        
+        same_stat = entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+        if not same_stat and entry['size'] == stat.st_size and entry['sha256'] == file_hash(Path(path)):
+            entry['mtime_ns'] = stat.st_mtime_ns
+            same_stat = True
+        
+        if same_stat and not entry.get('error') and entry.get('type') == file_type \
+                and entry.get('folder') == folder_name and (parts_dir / entry['part']).exists():
+            counts["unchanged"] += 1
+        else:
+            counts["modified"] += 1
+            changed.append(index)
+    
+    current = {path for _, path, _ in tasks}
+    counts["deleted"] = sum(1 for path in manifest if path not in current)
+    return changed, counts
+
+def manifest_entry(task: Tuple[str, str, str], result: Dict[str, Any]) -> Dict[str, Any]:
+    file_type, path, folder_name = task
+    stat = os.stat(path)
+    return {
+        'type': file_type,
+        'folder': folder_name,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_hash(Path(path)),
+        'error': result['error'],
+        'count': result['count'],
+        'part': result['part'],
+    }
+
+def iter_merged_records(tasks: List[Tuple[str, str, str]], manifest: Dict[str, Dict[str, Any]],
+                        parts_dir: Path) -> Iterator[Any]:
+    """파일별 결과를 형식 → 경로 순서로 하나씩 읽어서 반환 (전체를 메모리에 올리지 않음)"""
+    for _, path, _ in tasks:
+        part = manifest[path].get('part')
+        if part:
+            yield from iter_records(str(parts_dir / part), fmt='jsonl')
+
+def remove_stale_parts(parts_dir: Path, manifest: Dict[str, Dict[str, Any]]) -> int:
+    """manifest에 없는 결과 파일 삭제 (삭제된 파일, 실패/시간 초과로 남은 임시 파일)"""
+    keep = {entry.get('part') for entry in manifest.values()}
+    removed = 0
+    for part_path in parts_dir.iterdir():
+        if part_path.name not in keep:
+            part_path.unlink()
+            removed += 1
+    return removed
+
+def scan_directory(base_path: Path, exclude: Tuple[Path, ...] = ()) -> Dict[str, List[Path]]:
+    """
+    디렉토리 스캔 (exclude: 제외할 파일 또는 폴더)
     
     Returns:
         {
@@ -192,20 +493,26 @@ def scan_directory(base_path: Path) -> Dict[str, List[Path]]:
     """
     file_handlers = {
         '.json': 'json',
+        '.jsonl': 'json',
+        '.ndjson': 'json',
         '.pdf': 'pdf',
         '.png': 'image',
         '.jpg': 'image',
         '.jpeg': 'image',
         '.docx': 'word',
         '.xlsx': 'excel',
+        '.xlsm': 'excel',
         '.xls': 'excel',
+        '.csv': 'csv',
     }
     
     files_by_type = {}
+    excluded = {path.resolve() for path in exclude}
     
-    # 재귀적으로 모든 파일 찾기
+    # 재귀적으로 모든 파일 찾기 (이 스크립트의 출력 파일은 제외)
     for file_path in base_path.rglob('*'):
-        if file_path.is_file():
+        resolved = file_path.resolve()
+        if file_path.is_file() and resolved not in excluded and excluded.isdisjoint(resolved.parents):
             ext = file_path.suffix.lower()
             file_type = file_handlers.get(ext)
             
@@ -224,7 +531,49 @@ def scan_directory(base_path: Path) -> Dict[str, List[Path]]:
     
     return files_by_type
 
+def print_throughput(tasks: List[Tuple[str, str, str]], results: List[Dict[str, Any]],
+                     wall_seconds: float, workers: int):
+    """처리량 요약 (형식별 파일 수/처리 시간, 실패 목록, 가장 느린 파일)"""
+    by_type: Dict[str, Dict[str, float]] = {}
+    for (file_type, _, _), result in zip(tasks, results):
+        stats = by_type.setdefault(file_type, {"files": 0, "records": 0, "seconds": 0.0})
+        stats["files"] += 1
+        stats["records"] += result["count"]
+        stats["seconds"] += result["elapsed"]
+    
+    busy_seconds = sum(result["elapsed"] for result in results)
+    print("\n" + "=" * 60)
+    print(f"⚡ 처리량 (작업자 {workers}개)")
+    print("=" * 60)
+    print(f"  - 파일 {len(tasks)}개 / {wall_seconds:.1f}초 = {len(tasks) / wall_seconds if wall_seconds else 0:.2f}개/초")
+    print(f"  - 작업 시간 합계 {busy_seconds:.1f}초 (병렬 효율 {busy_seconds / wall_seconds if wall_seconds else 0:.1f}배)")
+    for file_type, stats in by_type.items():
+        print(f"  - {file_type}: 파일 {stats['files']:.0f}개, 레코드 {stats['records']:.0f}개, "
+              f"파일당 평균 {stats['seconds'] / stats['files']:.2f}초")
+    
+    failures = [(task, result) for task, result in zip(tasks, results) if result["error"]]
+    if failures:
+        print(f"\n❌ 실패 {len(failures)}개:")
+        for (_, path, _), result in failures:
+            print(f"  - {path}: {result['error']}")
+    
+    slowest = sorted(zip(tasks, results), key=lambda item: item[1]["elapsed"], reverse=True)[:5]
+    print("\n🐢 가장 느린 파일:")
+    for (_, path, _), result in slowest:
+        print(f"  - {path}: {result['elapsed']:.2f}초")
+
 def main():
+    parser = argparse.ArgumentParser(description="data/ 폴더 파일 처리")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="동시에 처리할 프로세스 수 (기본: CPU 코어 수, 1이면 순차 처리)")
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="파일 하나당 최대 처리 시간 (초, 풀에서 병렬 처리하는 파일에만 적용; 큰 PDF는 메인 프로세스에서 페이지 구간별로 병렬 처리)")
+    parser.add_argument("--output", default="data/processed_data.json",
+                        help="결과 저장 경로 (.json / .jsonl / .parquet - 확장자로 형식 결정)")
+    parser.add_argument("--full", action="store_true",
+                        help="manifest를 무시하고 모든 파일을 다시 처리")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("📁 파일 처리 시작 (v2 - 폴더 구조 지원)")
     print("=" * 60)
@@ -232,66 +581,70 @@ def main():
     data_dir = Path("data")
     if not data_dir.exists():
         print("❌ data/ 폴더가 없습니다.")
-        return
+        return 1
     
-    # 파일 스캔
+    output_path = Path(args.output)
+    manifest_path = output_path.with_name(output_path.stem + ".manifest.json")
+    parts_dir = output_path.with_name(output_path.stem + ".parts")
+    
+    # 파일 스캔 (이 스크립트의 출력은 형식과 상관없이 제외)
     print("\n🔍 파일 스캔 중...\n")
-    files_by_type = scan_directory(data_dir)
+    outputs = tuple(output_path.with_suffix('.' + fmt) for fmt in FORMATS) + (manifest_path, parts_dir)
+    files_by_type = scan_directory(data_dir, exclude=outputs)
     
     if not files_by_type:
         print("⚠️ 처리 가능한 파일이 없습니다.")
-        return
+        if not output_path.exists() and not manifest_path.exists():
+            return
+        # 이전에 처리한 파일이 모두 삭제됨 → 아래에서 빈 결과로 다시 저장
+    else:
+        # 통계 출력
+        print(f"발견된 파일 형식:")
+        for file_type, files in files_by_type.items():
+            print(f"  - {file_type}: {len(files)}개")
+        print()
     
-    # 통계 출력
-    print(f"발견된 파일 형식:")
-    for file_type, files in files_by_type.items():
-        print(f"  - {file_type}: {len(files)}개")
-    print()
-    
-    # 파일 처리
-    all_documents = []
-    
-    processors = {
-        'json': process_json_file,
-        'pdf': process_pdf_file,
-        'image': process_image_file,
-        'word': process_docx_file,
-        'excel': process_excel_file,
-    }
+    # 추가/변경된 파일만 다시 처리
+    tasks = build_tasks(files_by_type)
+    manifest = {} if args.full else load_manifest(manifest_path)
+    changed, counts = plan_incremental(tasks, manifest, parts_dir)
+    print(f"🧾 추가 {counts['added']}개 / 변경 {counts['modified']}개 / "
+          f"변경 없음 {counts['unchanged']}개 / 삭제 {counts['deleted']}개")
     
-    for file_type, files in files_by_type.items():
-        processor = processors.get(file_type)
-        if not processor:
-            continue
+    if changed:
+        changed_tasks = [tasks[index] for index in changed]
+        workers = max(1, min(args.workers, len(changed_tasks)))
         
-        print(f"\n📂 {file_type.upper()} 파일 처리 중...")
+        print(f"\n📂 파일 {len(changed_tasks)}개 처리 중... (작업자 {workers}개)")
         print("-" * 60)
         
-        for file_info in files:
-            file_path = file_info['path']
-            folder_name = file_info['folder']
-            
-            try:
-                docs = processor(file_path, folder_name)
-                all_documents.extend(docs)
-            except Exception as e:
-                print(f"  ❌ 처리 실패 ({file_path.name}): {str(e)}")
-    
-    # 결과 저장
-    if all_documents:
-        output_path = data_dir / "processed_data.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(all_documents, f, ensure_ascii=False, indent=2)
+        parts_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        results = run_tasks(changed_tasks, workers, args.timeout, parts_dir)
+        wall_seconds = time.perf_counter() - started
         
-        # 통계 출력
-        print("\n" + "=" * 60)
-        print(f"✅ 처리 완료!")
-        print("=" * 60)
-        print(f"📊 통계:")
+        print_throughput(changed_tasks, results, wall_seconds, workers)
         
-        by_type = {}
-        by_folder = {}
-        for doc in all_documents:
+        for task, result in zip(changed_tasks, results):
+            manifest[task[1]] = manifest_entry(task, result)
+    elif counts["deleted"] == 0 and output_path.exists():
+        # 수정 시각만 바뀐 파일의 새 시각 기록 (다음 실행에서 해시 계산 생략)
+        write_json_atomic(manifest_path, {'version': MANIFEST_VERSION, 'files': manifest})
+        print("\n✅ 변경된 파일이 없습니다. 기존 결과를 그대로 사용합니다.")
+        return
+    
+    # 현재 파일만 남기고 (삭제된 파일 제외) 형식 → 경로 순서로 병합
+    manifest = {path: manifest[path] for _, path, _ in tasks}
+    write_json_atomic(manifest_path, {'version': MANIFEST_VERSION, 'files': manifest})
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    remove_stale_parts(parts_dir, manifest)
+    
+    # 결과 저장 (파일별 결과를 하나씩 읽으면서 통계 집계)
+    by_type = {}
+    by_folder = {}
+    
+    def counted(documents):
+        for doc in documents:
             # 형식별 통계
             source_type = doc.get('_source_type', 'unknown')
             by_type[source_type] = by_type.get(source_type, 0) + 1
@@ -299,6 +652,17 @@ def main():
             # 폴더별 통계
             source_folder = doc.get('_source_folder', 'root')
             by_folder[source_folder] = by_folder.get(source_folder, 0) + 1
+            yield doc
+    
+    if sum(entry['count'] for entry in manifest.values()):
+        total = write_records_atomic(output_path, counted(iter_merged_records(tasks, manifest, parts_dir)),
+                                     indent=2)
+        
+        # 통계 출력
+        print("\n" + "=" * 60)
+        print(f"✅ 처리 완료!")
+        print("=" * 60)
+        print(f"📊 통계:")
         
         print(f"\n📈 형식별:")
         for ftype, count in by_type.items():
@@ -308,15 +672,22 @@ def main():
         for folder, count in by_folder.items():
             print(f"  - {folder}: {count}개")
         
-        print(f"\n💾 총 {len(all_documents)}개 문서")
+        print(f"\n💾 총 {total}개 문서")
         print(f"📄 저장 위치: {output_path}")
         print("=" * 60)
         print("\n다음 단계:")
         print("  python 1_mysql_data_loader.py")
         print("  python 2_embedding_generator.py")
+    elif any(entry.get('error') for entry in manifest.values()):
+        # 처리 실패만 있으면 기존 결과 유지 (일시적인 오류로 결과를 비우지 않음)
+        print("\n❌ 처리된 문서가 없습니다. 실패한 파일은 다음 실행에서 다시 처리합니다.")
+        return 1
     else:
-        print("\n❌ 처리된 문서가 없습니다.")
+        # 파일이 모두 삭제됐거나 내용이 없음 → 삭제된 파일의 문서가 남지 않도록 빈 결과 저장
+        write_records_atomic(output_path, [], indent=2)
+        print("\n⚠️ 처리된 문서가 없습니다. 결과 파일을 비웠습니다.")
+        print(f"📄 저장 위치: {output_path}")
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
 
@@ -0,0 +1,172 @@
+"""
+스프레드시트 스트리밍 읽기 (Excel 전체 시트 / CSV)
+작성일: 2025-12-07
+
+주요 기능:
+- .xlsx: openpyxl 읽기 전용 모드로 모든 시트의 행을 하나씩 반환 (시트 전체를 메모리에 올리지 않음)
+- .xls: xlrd로 시트를 하나씩 열고 다 읽으면 해제
+- .csv: 블록 단위로 읽으면서 행을 하나씩 반환, 인코딩(UTF-8 / CP949)과 구분자 자동 감지
+- 각 시트의 첫 번째 비어 있지 않은 행을 헤더로 사용, 완전히 빈 행은 건너뜀
+
+행 형식: (시트 이름(CSV는 None), 행 번호(1부터), {헤더: 값})
+"""
+
+import codecs
+import csv
+import os
+from datetime import date, datetime, time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+SPREADSHEET_EXTENSIONS = (".xlsx", ".xlsm", ".xls", ".csv")
+
+# CSV 읽기 블록 크기 (파일 크기와 상관없이 이만큼씩만 읽음)
+CSV_CHUNK_SIZE = 1 << 20
+
+# 한글 Excel에서 저장한 CSV는 대부분 CP949
+CSV_ENCODINGS = ("utf-8-sig", "cp949")
+
+Row = Tuple[Optional[str], int, Dict[str, Any]]
+
+
+def _cell_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    return value
+
+
+def _header(values: Sequence[Any]) -> List[str]:
+    """헤더 이름 정리 (빈 칸은 column_N, 중복은 _2, _3 ...)"""
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+    for index, value in enumerate(values, 1):
+        name = str(value).strip() if value is not None and str(value).strip() else f"column_{index}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 1
+        names.append(name)
+    return names
+
+
+def iter_table(rows: Iterable[Sequence[Any]], sheet: Optional[str] = None) -> Iterator[Row]:
+    """행 값 목록 → (시트, 행 번호, {헤더: 값}) (첫 번째 비어 있지 않은 행이 헤더)"""
+    header: Optional[List[str]] = None
+    for row_number, values in enumerate(rows, 1):
+        values = [_cell_value(value) for value in values]
+        if all(value is None for value in values):
+            continue
+        if header is None:
+            header = _header(values)
+            continue
+        if len(values) > len(header):
+            header.extend(_header([None] * len(values))[len(header):])
+        yield sheet, row_number, dict(zip(header, values))
+
+
+# ==============================================
+# Excel
+# ==============================================
+
+def iter_xlsx_rows(file_path: str) -> Iterator[Row]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("Excel(.xlsx) 파일에는 openpyxl이 필요합니다. pip install openpyxl")
+
+    # read_only: 행을 읽는 대로 버림 / data_only: 수식 대신 저장된 결과 값
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            yield from iter_table(worksheet.iter_rows(values_only=True), sheet=worksheet.title)
+    finally:
+        # 읽기 전용 모드는 파일을 열어 둔 상태라 직접 닫아야 함
+        workbook.close()
+
+
+def iter_xls_rows(file_path: str) -> Iterator[Row]:
+    try:
+        import xlrd
+    except ImportError:
+        raise ImportError("Excel(.xls) 파일에는 xlrd가 필요합니다. pip install xlrd")
+
+    # on_demand: 시트를 요청할 때만 읽고, 다 읽은 시트는 해제
+    workbook = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        for index in range(workbook.nsheets):
+            sheet = workbook.sheet_by_index(index)
+            rows = (_xls_values(workbook, sheet.row(row)) for row in range(sheet.nrows))
+            yield from iter_table(rows, sheet=sheet.name)
+            workbook.unload_sheet(index)
+    finally:
+        workbook.release_resources()
+
+
+def _xls_values(workbook, cells) -> List[Any]:
+    import xlrd
+
+    values = []
+    for cell in cells:
+        if cell.ctype == xlrd.XL_CELL_DATE:
+            values.append(xlrd.xldate.xldate_as_datetime(cell.value, workbook.datemode))
+        elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+            values.append(None)
+        else:
+            values.append(cell.value)
+    return values
+
+
+# ==============================================
+# CSV
+# ==============================================
+
+def detect_csv_encoding(file_path: str, sample_size: int = CSV_CHUNK_SIZE) -> str:
+    """앞부분을 디코딩해 보고 인코딩 결정 (UTF-8 → CP949 순서)"""
+    with open(file_path, "rb") as f:
+        sample = f.read(sample_size)
+    for encoding in CSV_ENCODINGS:
+        try:
+            # final=False: 블록 끝에서 잘린 멀티바이트 문자는 오류로 보지 않음
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return CSV_ENCODINGS[-1]
+
+
+def iter_csv_rows(file_path: str, encoding: Optional[str] = None,
+                  chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[Row]:
+    """
+    CSV 행을 하나씩 반환
+
+    Args:
+        file_path: CSV 경로
+        encoding: 인코딩 (None이면 자동 감지)
+        chunk_size: 파일에서 한 번에 읽는 바이트 수
+    """
+    encoding = encoding or detect_csv_encoding(file_path, chunk_size)
+    with open(file_path, "r", encoding=encoding, newline="", buffering=chunk_size) as f:
+        sample = f.read(min(chunk_size, 64 * 1024))
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        yield from iter_table(csv.reader(f, dialect))
+
+
+def iter_spreadsheet_rows(file_path: str) -> Iterator[Row]:
+    """확장자에 맞는 방식으로 행 읽기"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".csv":
+        return iter_csv_rows(file_path)
+    if ext == ".xls":
+        return iter_xls_rows(file_path)
+    if ext in (".xlsx", ".xlsm"):
+        return iter_xlsx_rows(file_path)
+    raise ValueError(f"지원하지 않는 스프레드시트 형식: {ext} ({', '.join(SPREADSHEET_EXTENSIONS)})")
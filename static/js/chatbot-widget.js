@@ -20,6 +20,9 @@
         cssPath: '/static/css/chatbot-widget.css'
     };
     
+    // 목록 다음 페이지 요청으로 보는 입력
+    const MORE_PATTERN = /^더\s*(보기|보여\s*줘)$/;
+    
     // CSS 로드
     function loadCSS() {
         const link = document.createElement('link');
@@ -112,6 +115,7 @@
             
             this.isOpen = false;
             this.isProcessing = false;
+            this.more = null;  // 목록 다음 페이지 요청 정보 (응답의 more)
             
             this.init();
         }
@@ -167,6 +171,9 @@
                 return;
             }
             
+            // '더 보기'면 이전 목록의 다음 페이지 요청
+            const more = MORE_PATTERN.test(message) ? this.more : null;
+            
             // 사용자 메시지 추가
             this.addMessage(message, 'user');
             
@@ -186,7 +193,7 @@
                     headers: {
                         'Content-Type': 'application/json',
                     },
-                    body: JSON.stringify({ message: message })
+                    body: JSON.stringify(more ? { message: message, more: more } : { message: message })
                 });
                 
                 if (!response.ok) {
@@ -195,8 +202,9 @@
                 
                 const data = await response.json();
                 
-                // 봇 응답 추가
-                this.addMessage(data.answer, 'bot', data.sources);
+                // 봇 응답 추가 (목록이 더 있으면 '더 보기' 버튼)
+                this.more = data.more || null;
+                this.addMessage(data.answer, 'bot', data.sources, this.more !== null);
                 
             } catch (error) {
                 console.error('[챗봇] 오류:', error);
@@ -212,7 +220,7 @@
             }
         }
         
-        addMessage(content, type, sources = null) {
+        addMessage(content, type, sources = null, hasMore = false) {
             const messageDiv = document.createElement('div');
             messageDiv.className = `message ${type}-message`;
             
@@ -253,6 +261,19 @@
                 contentDiv.appendChild(sourcesDiv);
             }
             
+            // 목록 다음 페이지 버튼
+            if (hasMore) {
+                const moreBtn = document.createElement('button');
+                moreBtn.className = 'message-more-btn';
+                moreBtn.textContent = '더 보기';
+                moreBtn.addEventListener('click', () => {
+                    moreBtn.remove();
+                    this.input.value = '더 보기';
+                    this.sendMessage();
+                });
+                contentDiv.appendChild(moreBtn);
+            }
+            
             this.messagesContainer.appendChild(messageDiv);
             
             // 스크롤을 최하단으로
@@ -0,0 +1,33 @@
+"""json_stream 스트리밍 파서: 버퍼 경계에서 잘린 값 처리"""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from json_stream import StreamingJSONReader, _iter_events
+
+
+def read_all(text: str, chunk_size: int):
+    reader = StreamingJSONReader(io.StringIO(text), chunk_size=chunk_size)
+    return [value for _, value in _iter_events(reader)]
+
+
+def test_floats_across_buffer_boundaries():
+    values = [1.5e10, 2.25, -3.75E-2, {"p": 12.5}, 7, True, None, "1.5"] * 10
+    text = json.dumps(values)
+    for chunk_size in range(1, 64):
+        assert read_all(text, chunk_size) == values, chunk_size
+
+
+def test_phpmyadmin_rows_across_buffer_boundaries():
+    rows = [{"id": i, "price": i * 1.25, "rate": -i * 1e-3, "name": f"상품{i}"} for i in range(20)]
+    text = json.dumps([
+        {"type": "header", "version": "5.2"},
+        {"type": "database", "name": "cafe24"},
+        {"type": "table", "name": "products", "data": rows},
+    ], ensure_ascii=False)
+    for chunk_size in (1, 2, 3, 5, 7, 16, 64, 1 << 16):
+        assert read_all(text, chunk_size)[2:-1] == rows, chunk_size